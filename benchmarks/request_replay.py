@@ -0,0 +1,76 @@
+"""
+CPU cost of a retry when the request is rebuilt on every attempt (`AsyncClient.request`)
+compared with building it once and replaying it through `AsyncClient.send`.
+
+Usage: python -m benchmarks.request_replay [--payload-kb 2048] [--attempts 5] [--rounds 20]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+
+def _payload(size_kb: int) -> dict:
+    item = {"id": 0, "name": "x" * 48, "tags": ["a", "b", "c"], "score": 0.5}
+    count = max(1, size_kb * 1024 // len(json.dumps(item)))
+    return {"items": [dict(item, id=i) for i in range(count)]}
+
+
+def _transport() -> httpx.MockTransport:
+    return httpx.MockTransport(lambda _: httpx.Response(httpx.codes.SERVICE_UNAVAILABLE))
+
+
+async def _rebuild(client: httpx.AsyncClient, payload: dict, attempts: int) -> None:
+    for _ in range(attempts):
+        await client.request("POST", "http://bench/items", json=payload)
+
+
+async def _replay(client: httpx.AsyncClient, payload: dict, attempts: int) -> None:
+    request = client.build_request("POST", "http://bench/items", json=payload)
+    for _ in range(attempts):
+        await client.send(request)
+
+
+async def _measure(
+    func: Callable[[httpx.AsyncClient, dict, int], Awaitable[None]], payload: dict, attempts: int, rounds: int
+) -> float:
+    async with httpx.AsyncClient(transport=_transport()) as client:
+        await func(client, payload, attempts)  # warm up
+
+        start = time.process_time()
+        for _ in range(rounds):
+            await func(client, payload, attempts)
+        return (time.process_time() - start) / rounds
+
+
+async def main(payload_kb: int, attempts: int, rounds: int) -> dict:
+    payload = _payload(payload_kb)
+    rebuild = await _measure(_rebuild, payload, attempts, rounds)
+    replay = await _measure(_replay, payload, attempts, rounds)
+    retries = attempts - 1
+
+    return {
+        "benchmark": "request_replay",
+        "payload_kb": payload_kb,
+        "attempts": attempts,
+        "rounds": rounds,
+        "rebuild_cpu_seconds_per_request": rebuild,
+        "replay_cpu_seconds_per_request": replay,
+        "cpu_seconds_saved_per_retry": (rebuild - replay) / retries if retries else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payload-kb", type=int, default=2048)
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    result = asyncio.run(main(args.payload_kb, args.attempts, args.rounds))
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,225 @@
+"""
+Benchmarks of the retry clients against a raw AsyncClient.
+
+The upstream is an in-process `httpx.MockTransport` with a configurable failure
+and latency profile, so results don't depend on the network. Every result is
+printed as a JSON line.
+
+Usage: python -m benchmarks.suite [--requests 2000] [--concurrency 1 100 1000]
+       [--failure-rate 0.0] [--latency 0.0] [--seed 0] [--output results.jsonl]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+URL = "http://upstream/resource"
+
+
+class Profile:
+    """
+    Failure and latency profile of the stand-in upstream
+    """
+
+    def __init__(self, *, failure_rate: float = 0.0, latency: float = 0.0, seed: int = 0):
+        """
+        :param failure_rate: Share of requests which fail, a failure is a 503 response
+            for PredicateClient and a ConnectError for ExceptionClient.
+        :param latency: Seconds every response takes.
+        :param seed: Seed of the failure generator and of the jitter.
+        """
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    def reset(self) -> None:
+        """
+        Restarts the failure and jitter sequences, so every client sees the same ones.
+        """
+        self._random.seed(self.seed)
+        random.seed(self.seed)
+
+    def transport(self, fail_with_exception: bool = False, gate: Optional[asyncio.Event] = None) -> httpx.MockTransport:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if gate is not None:
+                await gate.wait()
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                if fail_with_exception:
+                    raise httpx.ConnectError("refused", request=request)
+                return httpx.Response(httpx.codes.SERVICE_UNAVAILABLE)
+            return httpx.Response(httpx.codes.OK, content=b"ok")
+
+        # MockTransport awaits an async handler although its annotation allows only a sync one
+        return httpx.MockTransport(handler)  # type: ignore[arg-type]
+
+
+def _raw(profile: Profile, gate: Optional[asyncio.Event] = None) -> Any:
+    return httpx.AsyncClient(transport=profile.transport(gate=gate))
+
+
+def _exception(profile: Profile, gate: Optional[asyncio.Event] = None) -> Any:
+    return ExceptionClient(
+        exception=(httpx.ConnectError,),
+        client=httpx.AsyncClient(transport=profile.transport(fail_with_exception=True, gate=gate)),
+        backoff_option=Constant(interval=0),
+        attempts=10,
+    )
+
+
+def _predicate(profile: Profile, gate: Optional[asyncio.Event] = None) -> Any:
+    return PredicateClient(
+        predicate=lambda res: res.status_code != httpx.codes.OK,
+        client=httpx.AsyncClient(transport=profile.transport(gate=gate)),
+        backoff_option=Constant(interval=0),
+        attempts=10,
+    )
+
+
+CLIENTS: Dict[str, Callable[..., Any]] = {
+    "raw": _raw,
+    "exception_client": _exception,
+    "predicate_client": _predicate,
+}
+
+
+async def _get(client: Any) -> None:
+    if isinstance(client, httpx.AsyncClient):
+        await client.get(URL)
+    else:
+        await client.get(url=URL)
+
+
+async def _close(client: Any) -> None:
+    if isinstance(client, httpx.AsyncClient):
+        await client.aclose()
+    else:
+        await client.__aexit__(None, None, None)
+
+
+async def bench_overhead(name: str, profile: Profile, requests: int) -> Dict[str, Any]:
+    """
+    Sequential requests, the cost of one request on the fast path.
+    """
+    client = CLIENTS[name](profile)
+    try:
+        for _ in range(min(100, requests)):
+            await _get(client)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(requests):
+            await _get(client)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    finally:
+        await _close(client)
+
+    return {"us_per_request": wall / requests * 1e6, "cpu_us_per_request": cpu / requests * 1e6}
+
+
+async def bench_throughput(name: str, profile: Profile, requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Requests per second with `concurrency` coroutines sharing one client.
+    """
+    client = CLIENTS[name](profile)
+    per_worker = max(1, requests // concurrency)
+
+    async def worker() -> None:
+        for _ in range(per_worker):
+            await _get(client)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await _close(client)
+
+    return {"concurrency": concurrency, "requests": per_worker * concurrency, "rps": per_worker * concurrency / elapsed}
+
+
+async def bench_memory(name: str, profile: Profile, in_flight: int) -> Dict[str, Any]:
+    """
+    Memory held by one in-flight request, measured with tracemalloc while
+    `in_flight` requests wait for the upstream.
+    """
+    gate = asyncio.Event()
+    client = CLIENTS[name](profile, gate)
+    try:
+        await asyncio.sleep(0)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        tasks = [asyncio.ensure_future(_get(client)) for _ in range(in_flight)]
+        # let every request reach the upstream
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        gate.set()
+        await asyncio.gather(*tasks)
+    finally:
+        await _close(client)
+
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {"in_flight": in_flight, "bytes_per_request": allocated / in_flight}
+
+
+async def run(
+    clients: Iterable[str],
+    profile: Profile,
+    requests: int,
+    concurrency: Iterable[int],
+    in_flight: int,
+) -> List[Dict[str, Any]]:
+    environment = {
+        "python": platform.python_version(),
+        "httpx": httpx.__version__,
+        "platform": platform.platform(),
+        "failure_rate": profile.failure_rate,
+        "latency": profile.latency,
+        "seed": profile.seed,
+    }
+    results = []
+
+    for name in clients:
+        profile.reset()
+        results.append({"benchmark": "overhead", "client": name, **await bench_overhead(name, profile, requests)})
+        for level in concurrency:
+            result = await bench_throughput(name, profile, requests, level)
+            results.append({"benchmark": "throughput", "client": name, **result})
+        results.append({"benchmark": "memory", "client": name, **await bench_memory(name, profile, in_flight)})
+
+    return [{**result, **environment} for result in results]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", nargs="+", choices=sorted(CLIENTS), default=list(CLIENTS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--in-flight", type=int, default=1000)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args()
+
+    profile = Profile(failure_rate=args.failure_rate, latency=args.latency, seed=args.seed)
+    for line in asyncio.run(run(args.clients, profile, args.requests, args.concurrency, args.in_flight)):
+        args.output.write(json.dumps(line) + "\n")
@@ -1,9 +1,117 @@
-from typing import Any, Optional, TypeVar
+import logging
+import math
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar, Union
 
-from httpx_backoff._typing import _BackoffGenerator, _Jitterer
+from httpx import AsyncClient, ByteStream, Client, HTTPStatusError, Request, Response, codes
+from httpx_backoff._typing import _BackoffGenerator, _BackoffOption, _Jitterer
+
+if TYPE_CHECKING:
+    from httpx_backoff.adaptive_timeout import AdaptiveTimeout
+    from httpx_backoff.budget import RetryBudget
+    from httpx_backoff.circuit_breaker import CircuitBreaker, _CircuitKey
+    from httpx_backoff.hedging import HedgePolicy
+    from httpx_backoff.limiter import ConcurrencyLimiter
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
+# keyword arguments of `AsyncClient.request` which belong to `send`, not to `build_request`
+_SEND_KWARGS = frozenset(("auth", "follow_redirects", "stream"))
+_CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since")
+# statuses whose Retry-After pauses all requests to the host
+_PAUSE_STATUSES = frozenset((codes.TOO_MANY_REQUESTS, codes.SERVICE_UNAVAILABLE))
+# delta seconds or a unix timestamp, float() would accept "nan", "inf" and "1e400" as well
+_NUMBER = re.compile(r"[+-]?\d+(\.\d+)?")
+# values bigger than this are unix timestamps, not delta seconds (e.g. X-RateLimit-Reset of GitHub)
+_EPOCH_THRESHOLD = 1_000_000_000
+# methods whose repetition has the effect of a single request, RFC 9110 section 9.2.2
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"))
+
+
+def _init_wait(backoff_option: _BackoffOption) -> _BackoffGenerator:
+    """
+    Returns the backoff generator which is used by a single request.
+
+    A factory is called, a built-in option is cloned, so concurrent requests never
+    advance each other's schedule. Any other generator is shared as is.
+    """
+    if callable(backoff_option):
+        return backoff_option()
+
+    clone = getattr(backoff_option, "clone", None)
+    if clone is not None:
+        return clone()
+
+    return backoff_option
+
+
+def _build_request(
+    client: Union[AsyncClient, Client],
+    url: Any,
+    *,
+    method: str,
+    json: Optional[dict],
+    headers: Optional[dict],
+    data: Optional[dict],
+    params: Optional[dict],
+    **kwargs: Any,
+) -> Tuple[Request, Dict[str, Any]]:
+    """
+    Builds the request once, so URL merging, headers merging and body encoding
+    are not repeated on every attempt.
+
+    :return: the request and keyword arguments for `send` of the client
+    """
+    send_kwargs = {key: kwargs.pop(key) for key in _SEND_KWARGS.intersection(kwargs)}
+    request = client.build_request(
+        method=method,
+        url=url,
+        json=json,
+        headers=headers,
+        data=data,
+        params=params,
+        **kwargs,
+    )
+    return request, send_kwargs
+
+
+def _is_not_modified(request: Request, response: Response) -> bool:
+    """
+    :return: True for 304 to a conditional request, e.g. a revalidation of the cache.
+        It confirms a stored response, so it's a success whatever the predicate says.
+    """
+    return response.status_code == codes.NOT_MODIFIED and any(name in request.headers for name in _CONDITIONAL_HEADERS)
+
+
+def _send(
+    client: AsyncClient,
+    request: Request,
+    send_kwargs: Dict[str, Any],
+    hedge: Optional["HedgePolicy"] = None,
+    adaptive_timeout: Optional["AdaptiveTimeout"] = None,
+    limiter: Optional["ConcurrencyLimiter"] = None,
+    is_failure: Optional[Callable[[Response], bool]] = None,
+) -> Awaitable[Response]:
+    def attempt() -> Awaitable[Response]:
+        # every hedged request holds its own slot of the limiter
+        if limiter is not None:
+            return limiter.send(request, client.send(request, **send_kwargs))
+        return client.send(request, **send_kwargs)
+
+    response: Awaitable[Response]
+    # concurrent attempts would read a streamed body (e.g. a spool or a multipart file) at once
+    if hedge is not None and isinstance(request.stream, ByteStream):
+        response = hedge.send(attempt, request.method)
+    else:
+        response = attempt()
+    if adaptive_timeout is not None:
+        return adaptive_timeout.track(request, response, is_failure)
+    return response
+
 
 def _next_wait(
     wait: _BackoffGenerator,
@@ -14,7 +122,8 @@ def _next_wait(
 ) -> float:
     value = wait.send(send_value)
 
-    if jitter is not None:
+    # a delay requested by the server (see RetryAfter) is taken as is
+    if jitter is not None and not getattr(wait, "exact", False):
         seconds = jitter(value)
     else:
         seconds = value
@@ -24,3 +133,100 @@ def _next_wait(
         seconds = min(seconds, timeout - elapsed)
 
     return seconds
+
+
+def _parse_delay(value: str) -> Optional[float]:
+    """
+    Parses delta seconds, a unix timestamp or an HTTP-date to seconds from now.
+
+    :return: None if the value is neither a plain number nor an HTTP-date.
+    """
+    value = value.strip()
+    if _NUMBER.fullmatch(value):
+        seconds = float(value)
+        # e.g. 400 digits overflow to infinity
+        if not math.isfinite(seconds):
+            return None
+        if seconds > _EPOCH_THRESHOLD:
+            seconds -= time.time()
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+
+    return max(seconds, 0.0)
+
+
+def _requested_pause(failure: Any) -> Optional[float]:
+    """
+    :return: seconds of the Retry-After of a 429 or 503 response or None.
+    """
+    if isinstance(failure, HTTPStatusError):
+        failure = failure.response
+    if not isinstance(failure, Response) or failure.status_code not in _PAUSE_STATUSES:
+        return None
+
+    header = failure.headers.get("retry-after")
+    return None if header is None else _parse_delay(header)
+
+
+def _retry_wait(
+    wait: _BackoffGenerator,
+    send_value: Any,
+    attempts: int,
+    elapsed: float,
+    *,
+    max_attempts: int,
+    timeout: Optional[float | int],
+    jitter: Optional[_Jitterer],
+    budget: Optional["RetryBudget"] = None,
+    circuit_breaker: Optional["CircuitBreaker"] = None,
+    circuit_key: Optional["_CircuitKey"] = None,
+    retryable: bool = True,
+) -> Optional[float]:
+    """
+    Decides whether a failed attempt is retried. The Retry-After of a 429 or 503
+    response pauses the circuit of the host, see `CircuitBreaker.pause`.
+
+    :param retryable: False when the failure isn't safe to retry, see `IdempotencyPolicy`.
+    :return: seconds to sleep before the next attempt or None if the request gives up.
+    """
+    pause = None
+    if circuit_breaker is not None:
+        if circuit_breaker.is_open(circuit_key):  # type: ignore
+            logger.debug("Circuit is open")
+            return None
+
+        # the server asked to slow down, the other requests to the host wait as well
+        pause = _requested_pause(send_value)
+        if pause:
+            circuit_breaker.pause(circuit_key, pause)  # type: ignore
+
+    if not retryable:
+        logger.debug("Failure isn't safe to retry")
+        return None
+
+    if attempts == max_attempts or timeout is not None and elapsed >= timeout:
+        logger.debug("Max attempts: %s, max time: %s", max_attempts, timeout)
+        return None
+
+    try:
+        seconds = _next_wait(wait, send_value, elapsed, jitter, timeout)
+    except StopIteration:
+        return None
+    if pause:
+        # the retry itself would be rejected until the pause ends
+        seconds = max(seconds, pause)
+
+    # an attempt which starts at the deadline has no time to complete
+    if timeout is not None and elapsed + seconds >= timeout:
+        logger.debug("No time is left for the next attempt")
+        return None
+
+    # the token is taken only for a retry which really happens
+    if budget is not None and not budget.try_withdraw():
+        logger.debug("Retry budget is exhausted")
+        return None
+
+    return seconds
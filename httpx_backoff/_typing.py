@@ -3,5 +3,6 @@ from typing import Callable, Generator, Sequence, Type, TypeVar, Union
 T = TypeVar("T")
 
 _ExceptionGroup = Union[BaseException, Sequence[BaseException | Type[BaseException]]]
-_BackoffGenerator = Generator[int, None, None]
+_BackoffGenerator = Generator[float, None, None]
+_BackoffOption = Union[_BackoffGenerator, Callable[[], _BackoffGenerator]]
 _Jitterer = Callable[[float], float]
@@ -0,0 +1,249 @@
+import math
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Sequence
+
+from httpx import URL, ReadTimeout, Request, Response, TimeoutException
+
+_Timeouts = Dict[str, Optional[float]]
+
+# latencies below it are counted as zero
+_MIN_VALUE = 1e-6
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch with logarithmic buckets (DDSketch).
+
+    A quantile is returned with the given relative accuracy, memory is bounded
+    by `max_buckets` and doesn't depend on the number of observations.
+    """
+
+    __slots__ = ("_gamma", "_log_gamma", "_max_buckets", "_buckets", "_zeros", "_count")
+
+    def __init__(self, *, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_buckets = max_buckets
+        self._buckets: Dict[int, int] = {}
+        self._zeros = 0
+        self._count = 0
+
+    def add(self, value: float) -> None:
+        self._count += 1
+        if value < _MIN_VALUE:
+            self._zeros += 1
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        if len(self._buckets) > self._max_buckets:
+            # the lowest buckets are merged, so the accuracy of high quantiles is kept
+            lowest = min(self._buckets)
+            count = self._buckets.pop(lowest)
+            following = min(self._buckets)
+            self._buckets[following] += count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zeros += other._zeros
+        self._count += other._count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        :param q: Quantile in [0, 1].
+        :return: the estimated value or None if the sketch is empty.
+        """
+        if not self._count:
+            return None
+
+        # nearest rank: the smallest value which at least q of the values don't exceed
+        rank = max(q * self._count, 1)
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return 2 * self._gamma**index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+class _HostLatency:
+    __slots__ = ("current", "previous", "observations", "quantile")
+
+    def __init__(self, relative_accuracy: float):
+        self.current = QuantileSketch(relative_accuracy=relative_accuracy)
+        self.previous: Optional[QuantileSketch] = None
+        self.observations = 0
+        self.quantile: Optional[float] = None
+
+    def merged(self, relative_accuracy: float) -> QuantileSketch:
+        sketch = QuantileSketch(relative_accuracy=relative_accuracy)
+        sketch.merge(self.current)
+        if self.previous is not None:
+            sketch.merge(self.previous)
+        return sketch
+
+
+class AdaptiveTimeout:
+    """
+    Per-host read timeout of attempts derived from observed latencies.
+
+    The latency of every response is added to a quantile sketch of its host. The
+    read timeout of the first attempt is the `percentile` of the host multiplied
+    by `multiplier`, every next attempt multiplies it by `escalation`, the result
+    is kept within [`floor`, `ceiling`]. Until `min_samples` latencies of the
+    host are observed the timeouts of the client are used. The sketch covers
+    the last one or two windows of `window` latencies, so it follows changes of
+    the upstream.
+    """
+
+    __slots__ = (
+        "_percentile",
+        "_multiplier",
+        "_escalation",
+        "_floor",
+        "_ceiling",
+        "_min_samples",
+        "_window",
+        "_relative_accuracy",
+        "_hosts",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 99.0,
+        multiplier: float = 2.0,
+        escalation: float = 1.5,
+        floor: float = 0.05,
+        ceiling: float = 30.0,
+        min_samples: int = 20,
+        window: int = 10_000,
+        relative_accuracy: float = 0.01,
+    ):
+        """
+        :param percentile: Percentile (0..100) of the latencies the timeout is based on.
+        :param multiplier: Multiplier of the percentile for the first attempt.
+        :param escalation: Multiplier of the timeout for every next attempt.
+        :param floor: The minimal read timeout in seconds.
+        :param ceiling: The maximal read timeout in seconds.
+        :param min_samples: Number of latencies of a host required to adapt its timeout,
+            the percentile is refreshed every `min_samples` latencies.
+        :param window: Number of latencies after which the sketch of a host is rotated.
+        :param relative_accuracy: Relative accuracy of the percentiles.
+        """
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if floor > ceiling:
+            raise ValueError("floor must not be greater than ceiling")
+
+        self._percentile = percentile
+        self._multiplier = multiplier
+        self._escalation = escalation
+        self._floor = floor
+        self._ceiling = ceiling
+        self._min_samples = min_samples
+        self._window = window
+        self._relative_accuracy = relative_accuracy
+        self._hosts: Dict[str, _HostLatency] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, host: str, latency: float) -> None:
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _HostLatency(self._relative_accuracy)
+
+            state.current.add(latency)
+            state.observations += 1
+            if state.current.count >= self._window:
+                state.previous, state.current = state.current, QuantileSketch(relative_accuracy=self._relative_accuracy)
+
+            # the percentile is refreshed periodically, not on every response
+            if state.observations % self._min_samples == 0:
+                state.quantile = state.merged(self._relative_accuracy).quantile(self._percentile / 100)
+
+    async def track(
+        self,
+        request: Request,
+        response: Awaitable[Response],
+        is_failure: Optional[Callable[[Response], bool]] = None,
+    ) -> Response:
+        """
+        Observes the latency of an attempt.
+
+        :param is_failure: Function of a response which is retried, e.g. a fast 503,
+            latencies of such responses aren't observed.
+        """
+        start = time.monotonic()
+        try:
+            result = await response
+        except TimeoutException as e:
+            # the real latency is unknown but not less than the timeout which expired
+            latency = time.monotonic() - start
+            if isinstance(e, ReadTimeout):
+                latency = max(latency, request.extensions.get("timeout", {}).get("read") or 0.0)
+            self.observe(request.url.host, latency)
+            raise
+
+        if is_failure is None or not is_failure(result):
+            self.observe(request.url.host, time.monotonic() - start)
+        return result
+
+    def timeout(self, host: str, attempt: int = 1) -> Optional[float]:
+        """
+        :return: the read timeout of the attempt or None while the host has too few latencies.
+        """
+        state = self._hosts.get(host)
+        if state is None or state.quantile is None:
+            return None
+
+        value = state.quantile * self._multiplier * self._escalation ** (attempt - 1)
+        return min(max(value, self._floor), self._ceiling)
+
+    def timeouts(self, url: URL, attempt: int, timeouts: _Timeouts) -> _Timeouts:
+        """
+        :param timeouts: Timeouts of the client, see `httpx.Timeout.as_dict`.
+        :return: the timeouts of the attempt with the adapted read timeout.
+        """
+        read = self.timeout(url.host, attempt)
+        if read is None:
+            return timeouts
+        return {**timeouts, "read": read}
+
+    def percentiles(self, host: str, percentiles: Sequence[float] = (50, 90, 99)) -> Dict[float, Optional[float]]:
+        """
+        :return: the given percentiles (0..100) of the latencies of the host.
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return {percentile: None for percentile in percentiles}
+            sketch = state.merged(self._relative_accuracy)
+
+        return {percentile: sketch.quantile(percentile / 100) for percentile in percentiles}
+
+    def snapshot(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        :return: percentiles and the current read timeout of the first attempt of every host,
+            e.g. {"example.com": {"p50": 0.1, "p90": 0.2, "p99": 0.4, "timeout": 0.8}}.
+        """
+        percentiles = tuple(percentiles)
+        snapshot = {}
+        for host in list(self._hosts):
+            values = self.percentiles(host, percentiles)
+            snapshot[host] = {f"p{percentile:g}": value for percentile, value in values.items()}
+            snapshot[host]["timeout"] = self.timeout(host)
+        return snapshot
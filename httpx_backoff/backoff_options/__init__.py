@@ -1,11 +1,13 @@
 from httpx_backoff.backoff_options.constant import Constant
 from httpx_backoff.backoff_options.expo import Expo
 from httpx_backoff.backoff_options.fibo import Fibo
+from httpx_backoff.backoff_options.retry_after import RetryAfter
 from httpx_backoff.backoff_options.runtime import Runtime
 
 __all__ = [
     "Constant",
     "Expo",
     "Fibo",
+    "RetryAfter",
     "Runtime",
 ]
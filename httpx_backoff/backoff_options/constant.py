@@ -1,5 +1,4 @@
-import itertools
-from typing import Any, Generator, Optional
+from typing import Any, Generator, List, Optional
 
 
 class Constant(Generator):
@@ -11,12 +10,38 @@ class Constant(Generator):
 
     def __init__(self, interval: int = 1):
         """
-        :param interval: A constant interval to yield or an iterable of such values.
+        :param interval: A constant interval to yield.
         """
-        self._interval = itertools.repeat(interval)
+        self._interval = interval
+
+    def delay(self, n: int) -> float:
+        """
+        :return: the n-th value of the sequence, the interval.
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        return self._interval
+
+    def preview(self, n: int) -> List[float]:
+        """
+        :return: the first n values of the sequence.
+        """
+        return [self._interval] * max(n, 0)
+
+    def cumulative(self, n: int) -> float:
+        """
+        :return: sum of the first n values, the worst-case total sleep of n retries.
+        """
+        return self._interval * max(n, 0)
 
     def send(self, _: Optional[Any]) -> int:
-        return next(self._interval)
+        return self._interval
+
+    def clone(self) -> "Constant":
+        """
+        Constant keeps no state between calls, so the same instance is returned.
+        """
+        return self
 
     def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
         super().throw(typ, val, tb)
@@ -1,14 +1,23 @@
-from typing import Any, Generator, Optional
+import math
+import sys
+from typing import Any, Generator, List, Optional
+
+# the value of an unbounded sequence once it leaves the float range
+MAX_DELAY = sys.float_info.max
 
 
 class Expo(Generator):
     """
     Generator for exponential decay.
+
+    The delay of every attempt is known in advance: `delay(n)` is computed in
+    closed form with float arithmetic capped at `max_value`, so neither the
+    generator nor a lookup ever grows a big integer.
     """
 
-    __slots__ = ("_base", "_factor", "_max_value", "_attempt", "_value")
+    __slots__ = ("_base", "_factor", "_max_value", "_cap", "_cap_index", "_attempt")
 
-    def __init__(self, *, max_value: Optional[int] = None, base: int = 2, factor: int = 1):
+    def __init__(self, *, max_value: Optional[float] = None, base: float = 2, factor: float = 1):
         """
         :param base: The mathematical base of the exponentiation operation
         :param factor: Factor to multiply the exponentiation by.
@@ -19,16 +28,78 @@ class Expo(Generator):
         self._base = base
         self._factor = factor
         self._max_value = max_value
+        self._cap = float(max_value) if max_value is not None else MAX_DELAY
+        self._cap_index = self._find_cap_index()
         self._attempt = 0
-        self._value: int = 0
 
-    def send(self, _: Optional[Any]) -> int:
-        self._value = self._factor * self._base**self._attempt
-        if self._max_value is None or self._value < self._max_value:
-            self._attempt += 1
-            return self._value
+    def _raw(self, n: int) -> float:
+        try:
+            return self._factor * float(self._base) ** n
+        except OverflowError:
+            return math.inf
+
+    def _find_cap_index(self) -> Optional[int]:
+        """
+        :return: the first attempt whose delay reaches the cap or None if the sequence never does.
+        """
+        if self._factor >= self._cap:
+            return 0
+        if self._base <= 1 or self._factor <= 0:
+            return None
+
+        n = max(math.ceil((math.log(self._cap) - math.log(self._factor)) / math.log(self._base)), 0)
+        # the logarithm may be off by one because of rounding
+        while n > 0 and self._raw(n - 1) >= self._cap:
+            n -= 1
+        while self._raw(n) < self._cap:
+            n += 1
+        return n
+
+    def delay(self, n: int) -> float:
+        """
+        :param n: Number of the value starting from 0, i.e. the delay after the attempt n + 1.
+        :return: the n-th value of the sequence in O(1).
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if self._cap_index is not None and n >= self._cap_index:
+            return self._cap
+        return self._raw(n)
+
+    def preview(self, n: int) -> List[float]:
+        """
+        :return: the first n values of the sequence.
+        """
+        return [self.delay(index) for index in range(n)]
+
+    def cumulative(self, n: int) -> float:
+        """
+        :return: sum of the first n values in O(1), the worst-case total sleep of n retries
+            as jitter only shortens the delays.
+        """
+        if n <= 0:
+            return 0.0
+
+        growing = n if self._cap_index is None else min(n, self._cap_index)
+        if self._base == 1:
+            total = self._factor * growing
         else:
-            return self._max_value
+            total = (self._raw(growing) - self._factor) / (self._base - 1)
+        total += (n - growing) * self._cap
+        return min(total, MAX_DELAY)
+
+    def send(self, _: Optional[Any]) -> float:
+        value = self.delay(self._attempt)
+        # the counter stops at the cap, so it stays small
+        if self._cap_index is None or self._attempt < self._cap_index:
+            self._attempt += 1
+        return value
+
+    def clone(self) -> "Expo":
+        """
+        Fresh generator with the same settings and its own attempt counter.
+        """
+        return Expo(max_value=self._max_value, base=self._base, factor=self._factor)
 
     def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
         super().throw(typ, val, tb)
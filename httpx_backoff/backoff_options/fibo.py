@@ -1,30 +1,89 @@
-from typing import Any, Generator, Optional
+from bisect import bisect_left
+from typing import Any, Generator, List, Optional, Tuple
+
+from httpx_backoff.backoff_options.expo import MAX_DELAY
+
+
+def _fibonacci_table() -> Tuple[Tuple[float, ...], Tuple[float, ...]]:
+    """
+    :return: the Fibonacci numbers 1, 1, 2, 3, ... as floats up to the float range
+        and the prefix sums of them, the sum of the first n values is at index n.
+    """
+    values = [1.0, 1.0]
+    while values[-1] + values[-2] <= MAX_DELAY:
+        values.append(values[-1] + values[-2])
+
+    sums = [0.0]
+    for value in values:
+        sums.append(min(sums[-1] + value, MAX_DELAY))
+    return tuple(values), tuple(sums)
+
+
+_FIBONACCI, _FIBONACCI_SUMS = _fibonacci_table()
 
 
 class Fibo(Generator):
     """
     Generator for fibonaccial decay.
+
+    The values are looked up in a precomputed table of floats, so `delay(n)` and
+    `cumulative(n)` are O(1) and no big integer is ever created.
     """
 
-    __slots__ = ("_a", "_b", "_max_value")
+    __slots__ = ("_max_value", "_cap", "_cap_index", "_attempt")
 
-    def __init__(self, max_value: Optional[int] = None):
+    def __init__(self, max_value: Optional[float] = None):
         """
         :param max_value: The maximum value to yield. Once the value in the
          true fibonacci sequence exceeds this, the value
          of max_value will forever after be yielded.
         """
         self._max_value = max_value
-        self._a = 1
-        self._b = 1
-
-    def send(self, _: Optional[Any] = None) -> int:
-        if self._max_value is None or self._a < self._max_value:
-            return_value = self._a
-            self._a, self._b = self._b, self._a + self._b
-            return return_value
-        else:
-            return self._max_value
+        self._cap = float(max_value) if max_value is not None else MAX_DELAY
+        # the first value which reaches the cap, the table ends before the float range does
+        self._cap_index = bisect_left(_FIBONACCI, self._cap)
+        self._attempt = 0
+
+    def delay(self, n: int) -> float:
+        """
+        :param n: Number of the value starting from 0, i.e. the delay after the attempt n + 1.
+        :return: the n-th value of the sequence in O(1).
+        """
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        if n >= self._cap_index:
+            return self._cap
+        return _FIBONACCI[n]
+
+    def preview(self, n: int) -> List[float]:
+        """
+        :return: the first n values of the sequence.
+        """
+        return [self.delay(index) for index in range(n)]
+
+    def cumulative(self, n: int) -> float:
+        """
+        :return: sum of the first n values in O(1), the worst-case total sleep of n retries
+            as jitter only shortens the delays.
+        """
+        if n <= 0:
+            return 0.0
+
+        growing = min(n, self._cap_index)
+        return min(_FIBONACCI_SUMS[growing] + (n - growing) * self._cap, MAX_DELAY)
+
+    def send(self, _: Optional[Any] = None) -> float:
+        value = self.delay(self._attempt)
+        # the counter stops at the cap, so it stays small
+        if self._attempt < self._cap_index:
+            self._attempt += 1
+        return value
+
+    def clone(self) -> "Fibo":
+        """
+        Fresh generator with the same settings which starts the sequence over.
+        """
+        return Fibo(max_value=self._max_value)
 
     def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
         super().throw(typ, val, tb)
@@ -0,0 +1,71 @@
+from typing import Any, Generator, Optional
+
+from httpx import HTTPStatusError, Response
+from httpx_backoff._common import _init_wait, _parse_delay
+from httpx_backoff._typing import _BackoffOption
+from httpx_backoff.backoff_options.expo import Expo
+
+
+class RetryAfter(Generator):
+    """
+    Generator which honors `Retry-After` and rate limit reset headers of the response
+    and falls back to another backoff option when they are absent.
+
+    The value is taken from the response of `PredicateClient` or from
+    `HTTPStatusError.response` of `ExceptionClient`. A value from a header
+    is not jittered.
+    """
+
+    __slots__ = ("_fallback", "_headers", "_max_value", "_exact")
+
+    HEADERS = ("retry-after", "ratelimit-reset", "x-ratelimit-reset")
+
+    def __init__(
+        self,
+        fallback: Optional[_BackoffOption] = None,
+        *,
+        max_value: Optional[float] = None,
+        headers: tuple = HEADERS,
+    ):
+        """
+        :param fallback: Backoff option (or factory) which is used when there is
+            no header, Expo() by default.
+        :param max_value: The maximum value to take from a header.
+        :param headers: Headers to look up in order of priority.
+        """
+        self._fallback = _init_wait(fallback) if fallback is not None else Expo()
+        self._headers = headers
+        self._max_value = max_value
+        self._exact = False
+
+    @property
+    def exact(self) -> bool:
+        """
+        True if the last value was taken from a header and must not be jittered.
+        """
+        return self._exact
+
+    def send(self, value: Optional[Any]) -> float:
+        if isinstance(value, HTTPStatusError):
+            value = value.response
+
+        if isinstance(value, Response):
+            headers = value.headers
+            for name in self._headers:
+                header = headers.get(name)
+                if header is None:
+                    continue
+
+                seconds = _parse_delay(header)
+                if seconds is not None:
+                    self._exact = True
+                    return seconds if self._max_value is None else min(seconds, self._max_value)
+
+        self._exact = False
+        return self._fallback.send(value)  # type: ignore
+
+    def clone(self) -> "RetryAfter":
+        return RetryAfter(_init_wait(self._fallback), max_value=self._max_value, headers=self._headers)
+
+    def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
+        super().throw(typ, val, tb)
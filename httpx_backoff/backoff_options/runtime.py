@@ -15,5 +15,11 @@ class Runtime(Generator):
     def send(self, value: Any) -> int:
         return self._func(value)
 
+    def clone(self) -> "Runtime":
+        """
+        Runtime keeps no state between calls, so the same instance is returned.
+        """
+        return self
+
     def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
         super().throw(typ, val, tb)
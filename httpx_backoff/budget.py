@@ -0,0 +1,73 @@
+import threading
+
+
+class RetryBudget:
+    """
+    Token bucket which limits retries to a share of successful requests.
+
+    Every successful request deposits `ratio` tokens, every retry withdraws one
+    token, a retry is denied when there is less than one token in the bucket.
+    One budget may be shared by any number of clients talking to the same upstream,
+    so an outage can't multiply the traffic by `attempts`.
+    """
+
+    __slots__ = ("_ratio", "_max_tokens", "_tokens", "_lock", "_deposits", "_withdrawals", "_rejections")
+
+    def __init__(self, *, ratio: float = 0.1, max_tokens: float = 10.0):
+        """
+        :param ratio: Tokens deposited by a successful request. With 0.1 at most one
+            retry per ten successful requests is allowed in the long run.
+        :param max_tokens: Capacity of the bucket. It's the burst of retries which is
+            allowed after a quiet period, the bucket is full at start.
+        """
+        if ratio < 0:
+            raise ValueError("ratio must be non-negative")
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+        self._deposits = 0
+        self._withdrawals = 0
+        self._rejections = 0
+
+    def deposit(self) -> None:
+        """
+        Records a successful request.
+        """
+        with self._lock:
+            self._deposits += 1
+            self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def try_withdraw(self) -> bool:
+        """
+        Asks for a retry.
+
+        :return: True if the retry is allowed and a token was taken.
+        """
+        with self._lock:
+            if self._tokens < 1:
+                self._rejections += 1
+                return False
+
+            self._tokens -= 1
+            self._withdrawals += 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    @property
+    def deposits(self) -> int:
+        return self._deposits
+
+    @property
+    def withdrawals(self) -> int:
+        return self._withdrawals
+
+    @property
+    def rejections(self) -> int:
+        return self._rejections
@@ -0,0 +1,10 @@
+from httpx_backoff.cache.backends import CacheBackend, CacheEntry, MemoryCacheBackend, SQLiteCacheBackend
+from httpx_backoff.cache.http_cache import HTTPCache
+
+__all__ = [
+    "CacheBackend",
+    "CacheEntry",
+    "HTTPCache",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+]
@@ -0,0 +1,208 @@
+import json
+import sqlite3
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class CacheEntry:
+    """
+    Stored response
+    """
+
+    status_code: int
+    headers: Tuple[Tuple[str, str], ...]
+    content: bytes
+    #: unix time when the response was received or revalidated
+    stored_at: float
+    #: request headers named in `Vary` of the response with their values
+    vary: Tuple[Tuple[str, str], ...] = ()
+    #: keys of the stored variants when the entry is the index of a response with `Vary`,
+    #: such an entry holds no response, only the header names in `vary`
+    variants: Tuple[str, ...] = ()
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.content)
+            + sum(len(name) + len(value) for name, value in self.headers)
+            + sum(len(key) for key in self.variants)
+        )
+
+
+class CacheBackend(metaclass=ABCMeta):
+    """
+    Abstract storage of `HTTPCache`
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-memory LRU storage bounded by the total size of the entries
+    """
+
+    __slots__ = ("_max_bytes", "_max_entries", "_entries", "_size", "_lock")
+
+    def __init__(self, *, max_bytes: int = 64 * 1024 * 1024, max_entries: Optional[int] = None):
+        """
+        :param max_bytes: The maximum total size of bodies and headers, the least
+            recently used entries are evicted above it.
+        :param max_entries: The maximum number of entries.
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        size = entry.size
+        with self._lock:
+            self._pop(key)
+            if size > self._max_bytes:
+                return
+
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self._max_bytes or (
+                self._max_entries is not None and len(self._entries) > self._max_entries
+            ):
+                self._pop(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    On-disk LRU storage in a sqlite database, it survives restarts and may be
+    shared by processes on the same host.
+
+    Calls are blocking, they are fast for a local file but run on the event loop.
+    """
+
+    __slots__ = ("_connection", "_max_bytes", "_lock")
+
+    def __init__(self, path: str, *, max_bytes: int = 256 * 1024 * 1024):
+        """
+        :param path: Path of the database file, ":memory:" for a private database.
+        :param max_bytes: The maximum total size of bodies and headers, the least
+            recently used entries are evicted above it.
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive")
+
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, content BLOB, "
+                "stored_at REAL, vary TEXT, variants TEXT, size INTEGER, accessed INTEGER)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT status_code, headers, content, stored_at, vary, variants FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._connection.execute(
+                "UPDATE entries SET accessed = (SELECT MAX(accessed) + 1 FROM entries) WHERE key = ?", (key,)
+            )
+
+        status_code, headers, content, stored_at, vary, variants = row
+        return CacheEntry(
+            status_code=status_code,
+            headers=tuple(tuple(header) for header in json.loads(headers)),
+            content=content,
+            stored_at=stored_at,
+            vary=tuple(tuple(header) for header in json.loads(vary)),
+            variants=tuple(json.loads(variants)),
+        )
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        size = entry.size
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            if size > self._max_bytes:
+                return
+
+            self._connection.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, "
+                "(SELECT COALESCE(MAX(accessed), 0) + 1 FROM entries))",
+                (
+                    key,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.stored_at,
+                    json.dumps(entry.vary),
+                    json.dumps(entry.variants),
+                    size,
+                ),
+            )
+
+            total = self._connection.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+            while total > self._max_bytes:
+                evicted, evicted_size = self._connection.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed LIMIT 1"
+                ).fetchone()
+                self._connection.execute("DELETE FROM entries WHERE key = ?", (evicted,))
+                total -= evicted_size
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
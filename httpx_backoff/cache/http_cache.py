@@ -0,0 +1,298 @@
+import json
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Collection, Dict, Optional, Tuple
+
+from httpx import Headers, Request, Response, codes
+from httpx_backoff.cache.backends import CacheBackend, CacheEntry, MemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+# statuses which may be cached without explicit freshness, RFC 9110 section 15.1
+CACHEABLE_STATUSES = frozenset((200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501))
+# the stored body is decoded, so the framing headers of the original response don't apply
+_FRAMING_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding"))
+_UNSAFE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+def _cache_control(headers: Headers) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for directive in headers.get_list("cache-control", split_commas=True):
+        name, _, argument = directive.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(int(value), 0) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HTTPCache:
+    """
+    Private (or shared) HTTP cache in front of the retry loop.
+
+    Freshness follows `Cache-Control` and `Expires` of the response (with the
+    10% heuristic for `Last-Modified`), `no-store`, `no-cache` and `max-age` of
+    the request are honored. A stale entry is revalidated with `If-None-Match` /
+    `If-Modified-Since` and a 304 refreshes it without a body. Successful
+    unsafe requests invalidate the entries of their URL.
+
+    A response with `Vary` is stored under a key of the method, the URL and the
+    request values of the named headers, so every variant has its own entry. The
+    key of the method and URL then holds an index with the header names and the
+    keys of the variants.
+    """
+
+    __slots__ = ("_backend", "_shared", "_methods", "_lock", "_hits", "_misses", "_revalidations")
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        *,
+        shared: bool = False,
+        methods: Collection[str] = ("GET", "HEAD"),
+    ):
+        """
+        :param backend: Storage of the entries, MemoryCacheBackend() by default.
+        :param shared: Behave as a shared cache: `private` responses and responses
+            to requests with `Authorization` aren't stored, `s-maxage` is honored.
+        :param methods: Methods whose responses are cached.
+        """
+        self._backend = backend if backend is not None else MemoryCacheBackend()
+        self._shared = shared
+        self._methods = frozenset(methods)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+
+    async def send(
+        self,
+        request: Request,
+        send_fn: Callable[[Dict[str, str]], Awaitable[Optional[Response]]],
+    ) -> Optional[Response]:
+        """
+        Answers the request from the cache or sends it.
+
+        :param request: The request, it's only used for its method, URL and headers.
+        :param send_fn: Function which sends the request with the extra (conditional) headers.
+        """
+        if request.method not in self._methods:
+            response = await send_fn({})
+            if request.method in _UNSAFE_METHODS and response is not None and response.status_code < 400:
+                self.invalidate(request)
+            return response
+
+        url_key = self._key(request)
+        directives = _cache_control(request.headers)
+        key, entry = (url_key, None) if "no-store" in directives else self._lookup(request, url_key)
+
+        now = time.time()
+        if entry is not None and self._is_fresh(entry, directives, now):
+            self._count("_hits")
+            logger.debug("Cache hit %s %s", request.method, request.url)
+            return self._response(request, entry)
+
+        response = await send_fn(self._conditional_headers(entry) if entry is not None else {})
+        if response is None:
+            return None
+
+        if entry is not None and response.status_code == codes.NOT_MODIFIED:
+            self._count("_revalidations")
+            logger.debug("Cache revalidated %s %s", request.method, request.url)
+            entry = self._refresh(entry, response)
+            self._backend.set(key, entry)
+            return self._response(request, entry)
+
+        self._count("_misses")
+        if "no-store" not in directives and self._is_storable(request, response):
+            self._store(url_key, self._entry(request, response))
+        return response
+
+    def invalidate(self, request: Request) -> None:
+        """
+        Removes the entries of the URL of the request with all their variants.
+        """
+        for method in self._methods:
+            key = f"{method} {request.url}"
+            index = self._backend.get(key)
+            if index is not None:
+                for variant in index.variants:
+                    self._backend.delete(variant)
+            self._backend.delete(key)
+
+    @property
+    def backend(self) -> CacheBackend:
+        return self._backend
+
+    @property
+    def hits(self) -> int:
+        """
+        Requests answered by a fresh entry without the network.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Requests answered by a full response of the network.
+        """
+        return self._misses
+
+    @property
+    def revalidations(self) -> int:
+        """
+        Requests answered by a stale entry which was confirmed with 304.
+        """
+        return self._revalidations
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        return f"{request.method} {request.url}"
+
+    @staticmethod
+    def _variant_key(url_key: str, vary: Tuple[Tuple[str, str], ...]) -> str:
+        return f"{url_key} {json.dumps(vary)}"
+
+    def _lookup(self, request: Request, url_key: str) -> Tuple[str, Optional[CacheEntry]]:
+        """
+        :return: the key and the entry which answers the request, the entry is None on a miss.
+        """
+        entry = self._backend.get(url_key)
+        if entry is None or not entry.variants:
+            return url_key, entry
+
+        vary = tuple((name, request.headers.get(name, "")) for name, _ in entry.vary)
+        key = self._variant_key(url_key, vary)
+        return key, self._backend.get(key) if key in entry.variants else None
+
+    def _store(self, url_key: str, entry: CacheEntry) -> None:
+        if not entry.vary:
+            self._backend.set(url_key, entry)
+            return
+
+        names = tuple((name, "") for name, _ in entry.vary)
+        index = self._backend.get(url_key)
+        variants: Tuple[str, ...] = ()
+        if index is not None and index.variants:
+            if index.vary == names:
+                variants = index.variants
+            else:
+                # the response varies on other headers now, the old variants can't be found anymore
+                for variant in index.variants:
+                    self._backend.delete(variant)
+
+        key = self._variant_key(url_key, entry.vary)
+        self._backend.set(key, entry)
+        if key not in variants:
+            index = CacheEntry(0, (), b"", entry.stored_at, vary=names, variants=variants + (key,))
+            self._backend.set(url_key, index)
+
+    def _is_storable(self, request: Request, response: Response) -> bool:
+        if response.status_code not in CACHEABLE_STATUSES or response.headers.get("vary", "").strip() == "*":
+            return False
+
+        directives = _cache_control(response.headers)
+        if "no-store" in directives:
+            return False
+        if self._shared and (
+            "private" in directives
+            or (
+                "authorization" in request.headers and not {"public", "s-maxage", "must-revalidate"} & directives.keys()
+            )
+        ):
+            return False
+
+        # without freshness an entry is still useful for revalidation
+        return bool(
+            directives.keys() & {"max-age", "s-maxage", "no-cache", "public"}
+            or {"expires", "last-modified", "etag"} & response.headers.keys()
+        )
+
+    @staticmethod
+    def _entry(request: Request, response: Response) -> CacheEntry:
+        vary = tuple(
+            (name, request.headers.get(name, ""))
+            for name in (name.strip().lower() for name in response.headers.get_list("vary", split_commas=True))
+            if name
+        )
+        return CacheEntry(
+            status_code=response.status_code,
+            headers=tuple(
+                (name, value) for name, value in response.headers.items() if name.lower() not in _FRAMING_HEADERS
+            ),
+            content=response.content,
+            stored_at=time.time(),
+            vary=vary,
+        )
+
+    @staticmethod
+    def _refresh(entry: CacheEntry, response: Response) -> CacheEntry:
+        updated = {name.lower() for name in response.headers if name.lower() not in _FRAMING_HEADERS}
+        headers = tuple(
+            [(name, value) for name, value in entry.headers if name.lower() not in updated]
+            + [(name, value) for name, value in response.headers.items() if name.lower() in updated]
+        )
+        return CacheEntry(entry.status_code, headers, entry.content, time.time(), entry.vary)
+
+    @staticmethod
+    def _conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        headers = Headers(list(entry.headers))
+        conditional = {}
+        if "etag" in headers:
+            conditional["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        return conditional
+
+    def _is_fresh(self, entry: CacheEntry, request_directives: Dict[str, Optional[str]], now: float) -> bool:
+        headers = Headers(list(entry.headers))
+        directives = _cache_control(headers)
+        if "no-cache" in directives or "no-cache" in request_directives:
+            return False
+
+        date = _timestamp(headers.get("date"))
+        if date is None:
+            date = entry.stored_at
+
+        if self._shared and _seconds(directives.get("s-maxage")) is not None:
+            lifetime: float = _seconds(directives["s-maxage"])  # type: ignore[assignment]
+        elif _seconds(directives.get("max-age")) is not None:
+            lifetime = _seconds(directives["max-age"])  # type: ignore[assignment]
+        elif "expires" in headers:
+            expires = _timestamp(headers["expires"])
+            lifetime = expires - date if expires is not None else 0
+        elif "last-modified" in headers:
+            last_modified = _timestamp(headers["last-modified"])
+            lifetime = (date - last_modified) / 10 if last_modified is not None else 0
+        else:
+            lifetime = 0
+
+        max_age = _seconds(request_directives.get("max-age"))
+        if max_age is not None:
+            lifetime = min(lifetime, max_age)
+
+        initial_age = max(entry.stored_at - date, _seconds(headers.get("age")) or 0, 0)
+        return initial_age + (now - entry.stored_at) < lifetime
+
+    @staticmethod
+    def _response(request: Request, entry: CacheEntry) -> Response:
+        return Response(entry.status_code, headers=list(entry.headers), content=entry.content, request=request)
@@ -0,0 +1,252 @@
+import enum
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple, Union
+
+from httpx import URL
+from httpx_backoff.exceptions import CircuitOpenError
+
+_CircuitKey = Tuple[str, str, int]
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def _circuit_key(url: Union[URL, str]) -> _CircuitKey:
+    if not isinstance(url, URL):
+        url = URL(url)
+    return url.scheme, url.host, url.port or _DEFAULT_PORTS.get(url.scheme, 0)
+
+
+class _Circuit:
+    __slots__ = (
+        "state",
+        "consecutive_failures",
+        "outcomes",
+        "failures",
+        "opened_at",
+        "probe_started_at",
+        "paused_until",
+    )
+
+    def __init__(self, window: int):
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        # True is a failure, the deque is used only when failure_rate is set
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+        # monotonic time until which requests are rejected regardless of the state, 0 means no pause
+        self.paused_until = 0.0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with a circuit per scheme, host and port.
+
+    A closed circuit lets requests through and opens after `failure_threshold`
+    consecutive failures or when the failure rate over the last `window` calls
+    reaches `failure_rate`. An open circuit rejects requests with `CircuitOpenError`
+    for `recovery_timeout` seconds, then becomes half-open and lets a single probe
+    through: its success closes the circuit, its failure opens it again.
+
+    A circuit may be paused for a given time as well, e.g. after a `Retry-After`
+    of 429 or 503, it rejects requests like an open one without changing its state.
+    """
+
+    __slots__ = (
+        "_failure_threshold",
+        "_failure_rate",
+        "_window",
+        "_min_calls",
+        "_recovery_timeout",
+        "_circuits",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: Optional[int] = 5,
+        failure_rate: Optional[float] = None,
+        window: int = 20,
+        min_calls: int = 10,
+        recovery_timeout: float = 30.0,
+    ):
+        """
+        :param failure_threshold: Consecutive failures which open the circuit.
+            None disables the check.
+        :param failure_rate: Share of failures in the sliding window (0..1] which
+            opens the circuit. None disables the check.
+        :param window: Size of the sliding window in calls.
+        :param min_calls: Minimal number of calls in the window before the failure
+            rate is taken into account.
+        :param recovery_timeout: Seconds the circuit stays open before a probe
+            request is let through.
+        """
+        if failure_threshold is None and failure_rate is None:
+            raise ValueError("failure_threshold or failure_rate must be set")
+        if failure_rate is not None and not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+
+        self._failure_threshold = failure_threshold
+        self._failure_rate = failure_rate
+        self._window = window
+        self._min_calls = min(min_calls, window)
+        self._recovery_timeout = recovery_timeout
+        self._circuits: Dict[_CircuitKey, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, key: _CircuitKey) -> _Circuit:
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            circuit = self._circuits.setdefault(key, _Circuit(self._window))
+        return circuit
+
+    @contextmanager
+    def _locked(self, key: _CircuitKey) -> Iterator[_Circuit]:
+        """
+        Yields the circuit for a consistent read-modify-write, subclasses may keep circuits elsewhere.
+        """
+        with self._lock:
+            yield self._circuit(key)
+
+    def _peek(self, key: _CircuitKey) -> Optional[_Circuit]:
+        """
+        :return: the circuit without locking or None if it was never used.
+        """
+        return self._circuits.get(key)
+
+    def acquire(self, key: _CircuitKey) -> None:
+        """
+        Checks that a request to the circuit may be sent.
+
+        :raise CircuitOpenError: if the circuit is open or paused, or its probe is in flight
+        """
+        circuit = self._peek(key)
+        if circuit is None or circuit.state is CircuitState.CLOSED and not circuit.paused_until:
+            return
+
+        with self._locked(key) as circuit:
+            now = time.monotonic()
+
+            if circuit.paused_until:
+                if now < circuit.paused_until:
+                    raise CircuitOpenError(key, circuit.paused_until - now)
+                circuit.paused_until = 0.0
+
+            if circuit.state is CircuitState.OPEN:
+                retry_after = circuit.opened_at + self._recovery_timeout - now
+                if retry_after > 0:
+                    raise CircuitOpenError(key, retry_after)
+                circuit.state = CircuitState.HALF_OPEN
+                circuit.probe_started_at = None
+
+            if circuit.state is CircuitState.HALF_OPEN:
+                # a probe which never reported back doesn't block the circuit forever
+                if circuit.probe_started_at is not None and now - circuit.probe_started_at < self._recovery_timeout:
+                    raise CircuitOpenError(key, circuit.probe_started_at + self._recovery_timeout - now)
+                circuit.probe_started_at = now
+
+    def record_success(self, key: _CircuitKey) -> None:
+        with self._locked(key) as circuit:
+            circuit.consecutive_failures = 0
+            if circuit.state is not CircuitState.CLOSED:
+                self._close(circuit)
+            elif self._failure_rate is not None:
+                self._push(circuit, False)
+
+    def record_failure(self, key: _CircuitKey) -> None:
+        with self._locked(key) as circuit:
+            if circuit.state is CircuitState.HALF_OPEN:
+                self._open(circuit)
+                return
+
+            circuit.consecutive_failures += 1
+            if self._failure_threshold is not None and circuit.consecutive_failures >= self._failure_threshold:
+                self._open(circuit)
+                return
+
+            if self._failure_rate is not None:
+                self._push(circuit, True)
+                calls = len(circuit.outcomes)
+                if calls >= self._min_calls and circuit.failures >= self._failure_rate * calls:
+                    self._open(circuit)
+
+    def release(self, key: _CircuitKey) -> None:
+        """
+        Gives back the probe slot of an attempt which ended without an outcome,
+        e.g. it was cancelled or failed with an error which says nothing about the host.
+        """
+        circuit = self._peek(key)
+        if circuit is None or circuit.state is not CircuitState.HALF_OPEN:
+            return
+
+        with self._locked(key) as circuit:
+            if circuit.state is CircuitState.HALF_OPEN:
+                circuit.probe_started_at = None
+
+    def pause(self, url: Union[URL, str, _CircuitKey], seconds: float) -> None:
+        """
+        Rejects requests to the circuit which serves the url for the given seconds.
+        A longer pause which is already set is kept. The clients call it on their own
+        with the Retry-After of a 429 or 503 response.
+
+        :param url: URL of the host or its circuit key.
+        """
+        key = url if isinstance(url, tuple) else _circuit_key(url)
+        with self._locked(key) as circuit:
+            circuit.paused_until = max(circuit.paused_until, time.monotonic() + seconds)
+
+    def is_open(self, key: _CircuitKey) -> bool:
+        """
+        :return: True if a request to the circuit would be rejected right now.
+        """
+        circuit = self._peek(key)
+        if circuit is None:
+            return False
+
+        now = time.monotonic()
+        return (
+            circuit.state is CircuitState.OPEN
+            and now - circuit.opened_at < self._recovery_timeout
+            or now < circuit.paused_until
+        )
+
+    def state(self, url: Union[URL, str]) -> CircuitState:
+        """
+        :return: state of the circuit which serves the url
+        """
+        circuit = self._peek(_circuit_key(url))
+        return circuit.state if circuit is not None else CircuitState.CLOSED
+
+    @staticmethod
+    def _push(circuit: _Circuit, failure: bool) -> None:
+        if len(circuit.outcomes) == circuit.outcomes.maxlen and circuit.outcomes[0]:
+            circuit.failures -= 1
+        circuit.outcomes.append(failure)
+        circuit.failures += failure
+
+    @staticmethod
+    def _close(circuit: _Circuit) -> None:
+        circuit.state = CircuitState.CLOSED
+        circuit.outcomes.clear()
+        circuit.failures = 0
+        circuit.probe_started_at = None
+
+    @staticmethod
+    def _open(circuit: _Circuit) -> None:
+        circuit.state = CircuitState.OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.consecutive_failures = 0
+        circuit.outcomes.clear()
+        circuit.failures = 0
+        circuit.probe_started_at = None
@@ -0,0 +1,253 @@
+"""
+Replays a JSON Lines file of request specs through the retry client and reports
+throughput, latency percentiles, the distribution of attempts and give-ups.
+
+A spec is an object with "url" and optional "method", "headers", "params", "json"
+and "body" (text). Specs are split between worker processes, each one runs an
+asyncio loop with at most --concurrency requests in flight.
+
+With --rate the load is an open model: request i is due at start + i / rate no
+matter how slow the previous ones are, and its latency is counted from that
+moment, so a stalled upstream can't hide its queueing delay (coordinated omission).
+Without --rate every worker sends as fast as its concurrency allows.
+
+Usage: httpx-backoff specs.jsonl [--workers 4] [--concurrency 100] [--rate 500]
+       [--backoff expo] [--jitter full] [--attempts 5] [--output report.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from httpx_backoff._typing import _BackoffOption, _Jitterer
+from httpx_backoff.adaptive_timeout import QuantileSketch
+from httpx_backoff.backoff_options import Constant, Expo, Fibo, RetryAfter
+from httpx_backoff.backoff_options.jitter import use_equal_jitter, use_full_jitter
+from httpx_backoff.clients.on_policy import PolicyClient
+from httpx_backoff.hooks import RetryEvent
+from httpx_backoff.policy import RetryRule
+
+JITTERS: Dict[str, Optional[_Jitterer]] = {"full": use_full_jitter, "equal": use_equal_jitter, "none": None}
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+# worker processes need time to start before the first request is due
+_MULTIPROCESS_DELAY = 0.5
+
+
+def _backoff(options: Dict[str, Any]) -> _BackoffOption:
+    name = options["backoff"]
+    if name == "constant":
+        backoff: _BackoffOption = Constant(interval=options["interval"])
+    elif name == "fibo":
+        backoff = Fibo(max_value=options["max_value"])
+    else:
+        backoff = Expo(max_value=options["max_value"], base=options["base"], factor=options["factor"])
+
+    if options["retry_after"]:
+        return RetryAfter(backoff, max_value=options["max_value"])
+    return backoff
+
+
+def _specs(path: str, worker: int, workers: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    :return: the global index and the spec of every line of the worker
+    """
+    index = 0
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            if index % workers == worker:
+                yield index, json.loads(line)
+            index += 1
+
+
+def _request_kwargs(spec: Dict[str, Any]) -> Dict[str, Any]:
+    kwargs = {
+        "url": spec["url"],
+        "method": spec.get("method", "GET").upper(),
+        "headers": spec.get("headers"),
+        "params": spec.get("params"),
+        "json": spec.get("json"),
+    }
+    if spec.get("body") is not None:
+        kwargs["content"] = spec["body"].encode()
+    return kwargs
+
+
+class _Stats:
+    __slots__ = ("requests", "statuses", "errors", "attempts", "giveups", "latency", "end")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.attempts: Counter = Counter()
+        self.giveups = 0
+        self.latency = QuantileSketch()
+        self.end = 0.0
+
+    def on_success(self, event: RetryEvent) -> None:
+        self.attempts[event.attempt] += 1
+
+    def on_giveup(self, event: RetryEvent) -> None:
+        self.attempts[event.attempt] += 1
+        self.giveups += 1
+
+
+async def _replay(options: Dict[str, Any], worker: int, start_at: float) -> _Stats:
+    stats = _Stats()
+    rate = options["rate"] / options["workers"] if options["rate"] else None
+    semaphore = asyncio.Semaphore(options["concurrency"])
+    loop = asyncio.get_running_loop()
+    # the schedule of all workers starts at the same wall clock time
+    origin = loop.time() + start_at - time.time()
+    tasks = set()
+
+    client = PolicyClient(
+        [RetryRule(exceptions=(httpx.TransportError,)), RetryRule(statuses=options["retry_statuses"])],
+        client=httpx.AsyncClient(
+            timeout=options["http_timeout"],
+            limits=httpx.Limits(max_connections=options["concurrency"]),
+        ),
+        backoff_option=_backoff(options),
+        attempts=options["attempts"],
+        timeout=options["timeout"],
+        jitter=JITTERS[options["jitter"]],
+        on_success=stats.on_success,
+        on_giveup=stats.on_giveup,
+    )
+
+    async def send(spec: Dict[str, Any], due: Optional[float]) -> None:
+        if due is not None:
+            await semaphore.acquire()
+        started = due if due is not None else loop.time()
+        try:
+            response = await client.request(**_request_kwargs(spec))
+        except Exception as e:
+            stats.errors[type(e).__name__] += 1
+        else:
+            assert response is not None
+            stats.statuses[str(response.status_code)] += 1
+        finally:
+            semaphore.release()
+            stats.latency.add(loop.time() - started)
+            stats.requests += 1
+
+    async with client:
+        await asyncio.sleep(max(origin - loop.time(), 0.0))
+        for index, spec in _specs(options["specs"], worker, options["workers"]):
+            if rate is not None:
+                # the global index keeps the workers interleaved at the total rate
+                due = origin + index / options["rate"]
+                await asyncio.sleep(max(due - loop.time(), 0.0))
+            else:
+                due = None
+                await semaphore.acquire()
+
+            task = asyncio.ensure_future(send(spec, due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.wait(tasks)
+
+    stats.end = time.time()
+    return stats
+
+
+def _worker(options: Dict[str, Any], worker: int, start_at: float) -> _Stats:
+    return asyncio.run(_replay(options, worker, start_at))
+
+
+def _report(results: Sequence[_Stats], options: Dict[str, Any], start_at: float) -> Dict[str, Any]:
+    latency = QuantileSketch()
+    statuses: Counter = Counter()
+    errors: Counter = Counter()
+    attempts: Counter = Counter()
+    for stats in results:
+        latency.merge(stats.latency)
+        statuses.update(stats.statuses)
+        errors.update(stats.errors)
+        attempts.update(stats.attempts)
+
+    requests = sum(stats.requests for stats in results)
+    duration = max(max(stats.end for stats in results) - start_at, 1e-9)
+    return {
+        "requests": requests,
+        "duration": duration,
+        "throughput": requests / duration,
+        "latency": {f"p{percentile:g}": latency.quantile(percentile / 100) for percentile in PERCENTILES},
+        "attempts": {str(attempt): attempts[attempt] for attempt in sorted(attempts)},
+        "giveups": sum(stats.giveups for stats in results),
+        "statuses": dict(sorted(statuses.items())),
+        "errors": dict(sorted(errors.items())),
+        "workers": options["workers"],
+        "concurrency": options["concurrency"],
+        "rate": options["rate"],
+    }
+
+
+def _statuses(value: str) -> List[int]:
+    statuses: List[int] = []
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        statuses.extend(range(int(first), int(last or first) + 1))
+    return statuses
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="httpx-backoff", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("specs", help="JSON Lines file of request specs")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight per worker")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second of all workers (open model)")
+    parser.add_argument("--backoff", choices=("expo", "fibo", "constant"), default="expo")
+    parser.add_argument("--max-value", type=float, default=None, help="the maximum delay of expo and fibo")
+    parser.add_argument("--base", type=float, default=2, help="base of expo")
+    parser.add_argument("--factor", type=float, default=1, help="factor of expo")
+    parser.add_argument("--interval", type=float, default=1, help="delay of constant")
+    parser.add_argument("--retry-after", action="store_true", help="honor Retry-After and rate limit headers")
+    parser.add_argument("--jitter", choices=sorted(JITTERS), default="full")
+    parser.add_argument("--attempts", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds for a request with all its attempts")
+    parser.add_argument("--http-timeout", type=float, default=10, help="httpx timeout of an attempt")
+    parser.add_argument(
+        "--retry-statuses", type=_statuses, default="429,502-504", help="retried statuses, e.g. 429,500-599"
+    )
+    parser.add_argument("--output", type=argparse.FileType("w"), default=sys.stdout)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    if args.workers < 1 or args.concurrency < 1:
+        raise SystemExit("--workers and --concurrency must be positive")
+
+    output = args.output
+    options = {name: value for name, value in vars(args).items() if name != "output"}
+
+    if args.workers == 1:
+        start_at = time.time()
+        results = [_worker(options, 0, start_at)]
+    else:
+        start_at = time.time() + _MULTIPROCESS_DELAY
+        with ProcessPoolExecutor(args.workers) as pool:
+            workers = range(args.workers)
+            results = list(pool.map(_worker, [options] * args.workers, workers, [start_at] * args.workers))
+
+    output.write(json.dumps(_report(results, options, start_at)) + "\n")
+    output.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
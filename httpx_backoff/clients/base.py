@@ -1,8 +1,44 @@
+import asyncio
 from abc import ABCMeta, abstractmethod
-from contextlib import AbstractAsyncContextManager
-from typing import Any, Optional
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
 
-from httpx import Response
+from httpx import AsyncClient, Response
+from httpx_backoff.cache import HTTPCache
+from httpx_backoff.single_flight import SingleFlight
+from httpx_backoff.streaming import ResumableResponse
+
+_RequestSpecs = Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+# credentials which httpx applies only in `send`, a request with them is neither cached nor coalesced
+_CREDENTIAL_KWARGS = ("auth", "cookies")
+# other arguments which change a request or its outcome beyond method, URL and headers, it isn't coalesced with them
+_UNCOALESCED_KWARGS = ("content", "files", "extensions", "timeout", "follow_redirects")
+
+
+@dataclass(frozen=True, slots=True)
+class RequestResult:
+    """
+    Outcome of one request of `CustomClient.request_many`
+    """
+
+    #: position of the request in the input
+    index: int
+    #: keyword arguments the request was made with
+    spec: Dict[str, Any]
+    response: Optional[Response] = None
+    exception: Optional[BaseException] = None
+
+
+async def _aiter(items: _RequestSpecs) -> AsyncIterator[Dict[str, Any]]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
 
 
 class CustomClient(AbstractAsyncContextManager, metaclass=ABCMeta):
@@ -230,9 +266,203 @@ class CustomClient(AbstractAsyncContextManager, metaclass=ABCMeta):
             **kwargs,
         )
 
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        max_resumes: int = 3,
+        **kwargs: Any,
+    ) -> AsyncIterator[ResumableResponse]:
+        """
+        Streams a response, establishing of the connection is retried with backoff behavior.
+
+        A body which breaks in the middle is resumed from the last received byte
+        with `Range` and `If-Range` headers when the server supports it, see
+        `ResumableResponse`.
+
+        **Parameters**: See `httpx.request`.
+        :param max_resumes: The maximum number of resumes of the body.
+        """
+        response = await self.request(
+            url=url,
+            method=method,
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            stream=True,
+            **kwargs,
+        )
+        assert response is not None
+
+        resumable = ResumableResponse(
+            self,
+            response,
+            url=url,
+            method=method,
+            headers=headers,
+            kwargs={"params": params, **kwargs},
+            max_resumes=max_resumes,
+        )
+        try:
+            yield resumable
+        finally:
+            await resumable.aclose()
+
+    async def request_many(
+        self,
+        requests: _RequestSpecs,
+        *,
+        concurrency: int = 10,
+        timeout: Optional[float] = None,
+        cancel_on_error: bool = False,
+    ) -> AsyncIterator[RequestResult]:
+        """
+        Sends many requests with backoff behavior and yields results as they complete.
+
+        Requests are taken from the (async) iterable lazily and at most `concurrency`
+        of them are in flight, so memory doesn't depend on the size of the input.
+
+        :param requests: Keyword arguments of `request` for every request, e.g.
+            {"url": "https://example.org", "method": "POST", "json": {}}
+        :param concurrency: The maximum number of requests in flight.
+        :param timeout: Deadline in seconds for the whole batch. When it expires the
+            requests in flight are cancelled and `asyncio.TimeoutError` is raised.
+        :param cancel_on_error: Cancel the requests in flight and raise the exception
+            of the first failed request instead of yielding it.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        specs = _aiter(requests)
+        pending: Dict["asyncio.Task[Optional[Response]]", Tuple[int, Dict[str, Any]]] = {}
+        index = 0
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        spec = await specs.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+
+                    pending[asyncio.ensure_future(self.request(**spec))] = (index, spec)
+                    index += 1
+
+                if not pending:
+                    return
+
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    raise asyncio.TimeoutError()
+
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+
+                for task in done:
+                    position, spec = pending.pop(task)
+                    exception = task.exception()
+                    if exception is not None:
+                        if cancel_on_error:
+                            raise exception
+                        yield RequestResult(position, spec, exception=exception)
+                    else:
+                        yield RequestResult(position, spec, response=task.result())
+        finally:
+            for task in pending:
+                task.cancel()
+            # requests in flight are finished before returning and exceptions of
+            # the completed ones which weren't yielded are retrieved
+            await asyncio.gather(*pending, return_exceptions=True)
+
     @abstractmethod
     def is_closed(self) -> bool:
         ...
 
     async def __aenter__(self) -> "CustomClient":
         return self
+
+
+class _CachingClient(CustomClient):
+    """
+    Base of the built-in clients which puts the HTTP cache and single flight in front of the retry loop
+    """
+
+    _cache: Optional[HTTPCache]
+    _single_flight: Optional[SingleFlight]
+
+    @property
+    @abstractmethod
+    def client(self) -> AsyncClient:
+        ...
+
+    async def request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        It's a custom public request which encapsulates request with backoff behavior.
+
+        With a cache a fresh stored response is returned without sending the request
+        and a stale one is revalidated. With single flight identical concurrent requests
+        share one retried request. Streamed requests and requests with `auth` or `cookies`
+        bypass both, their responses may belong to one user only.
+
+        **Parameters**: See `httpx.request`.
+        """
+        if (
+            (self._cache is None and self._single_flight is None)
+            or kwargs.get("stream")
+            or any(kwargs.get(name) is not None for name in _CREDENTIAL_KWARGS)
+        ):
+            return await self._request(
+                url=url,
+                method=method,
+                json=json,
+                headers=headers,
+                data=data,
+                params=params,
+                **kwargs,
+            )
+
+        async def send(conditional_headers: Dict[str, str]) -> Optional[Response]:
+            send_headers = {**(headers or {}), **conditional_headers} if conditional_headers else headers
+            send_request = partial(
+                self._request,
+                url=url,
+                method=method,
+                json=json,
+                headers=send_headers,
+                data=data,
+                params=params,
+                **kwargs,
+            )
+            if (
+                self._single_flight is None
+                or json is not None
+                or data is not None
+                or any(kwargs.get(name) is not None for name in _UNCOALESCED_KWARGS)
+            ):
+                return await send_request()
+
+            request = self.client.build_request(method, url, params=params, headers=send_headers)
+            return await self._single_flight.send(request, send_request)
+
+        if self._cache is None:
+            return await send({})
+        return await self._cache.send(self.client.build_request(method, url, params=params, headers=headers), send)
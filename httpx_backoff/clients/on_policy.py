@@ -0,0 +1,296 @@
+import asyncio
+import logging
+from typing import Any, List, Optional, Sequence, Union
+
+from httpx import AsyncClient, Response, TransportError
+from httpx_backoff._common import _build_request, _init_wait, _is_not_modified, _retry_wait, _send
+from httpx_backoff._typing import _BackoffGenerator, _BackoffOption, _Jitterer
+from httpx_backoff.adaptive_timeout import AdaptiveTimeout
+from httpx_backoff.backoff_options.jitter import use_full_jitter
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.cache import HTTPCache
+from httpx_backoff.circuit_breaker import CircuitBreaker, _circuit_key
+from httpx_backoff.clients.base import _CachingClient
+from httpx_backoff.deadline import Deadline
+from httpx_backoff.hedging import HedgePolicy
+from httpx_backoff.hooks import RetryEvent, _call_hooks, _hooks, _Hooks
+from httpx_backoff.idempotency import IdempotencyPolicy
+from httpx_backoff.limiter import ConcurrencyLimiter
+from httpx_backoff.policy import RetryPolicy, RetryRule
+from httpx_backoff.single_flight import SingleFlight
+from httpx_backoff.spooling import DEFAULT_SPOOL_THRESHOLD, _spool_request
+
+logger = logging.getLogger(__name__)
+
+
+class PolicyClient(_CachingClient):
+    """
+    Client which retries on exceptions and on responses by the rules of a policy
+    """
+
+    __slots__ = (
+        "_policy",
+        "_client",
+        "_backoff_option",
+        "_attempts",
+        "_timeout",
+        "_jitter",
+        "_budget",
+        "_circuit_breaker",
+        "_idempotency",
+        "_spool_threshold",
+        "_hedge",
+        "_adaptive_timeout",
+        "_limiter",
+        "_cache",
+        "_single_flight",
+        "_on_attempt",
+        "_on_backoff",
+        "_on_giveup",
+        "_on_success",
+    )
+
+    def __init__(
+        self,
+        policy: Union[RetryPolicy, Sequence[RetryRule]],
+        *,
+        client: AsyncClient,
+        backoff_option: _BackoffOption,
+        attempts: int = 5,
+        timeout: Optional[float] = None,
+        jitter: Optional[_Jitterer] = use_full_jitter,
+        budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        idempotency: Optional[IdempotencyPolicy] = None,
+        spool_threshold: Optional[int] = DEFAULT_SPOOL_THRESHOLD,
+        hedge: Optional[HedgePolicy] = None,
+        adaptive_timeout: Optional[AdaptiveTimeout] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        cache: Optional[HTTPCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        on_attempt: _Hooks = None,
+        on_backoff: _Hooks = None,
+        on_giveup: _Hooks = None,
+        on_success: _Hooks = None,
+    ):
+        """
+        Constructor
+        :param policy: Retry policy or its rules. Every outcome is classified by the
+            first matching rule: an exception by its type, a response by its status
+            code or by a predicate. A response which no rule matches is a success,
+            an exception which no rule matches is raised.
+        :param client: AsyncClient from httpx
+        :param backoff_option: Backoff option of the rules which don't have their own.
+            Every request works with its own copy of the options.
+        :param attempts: The maximum number of attempts of all rules together.
+        :param timeout: The maximum total amount of time to try for before giving up.
+        :param jitter: A function of the value yielded by a backoff option returning
+            the actual time to wait. Jittering may be disabled by passing jitter=None.
+        :param budget: Retry budget which may be shared between clients.
+        :param circuit_breaker: Circuit breaker which may be shared between clients.
+        :param idempotency: Idempotency policy which decides whether a non-idempotent
+            request may be retried.
+        :param spool_threshold: Bytes of a request body which can be read only once (a generator
+            or a file) kept in memory, the rest is spooled to a temporary file, so retries send the
+            whole body again without holding it in memory. None disables spooling.
+        :param hedge: Hedging policy of slow attempts of idempotent requests.
+        :param adaptive_timeout: Per-host read timeouts of attempts derived from the observed latencies.
+        :param limiter: Adaptive per-host limit of concurrent attempts.
+        :param cache: HTTP cache in front of the retry loop.
+        :param single_flight: Coalescing of identical concurrent GET and HEAD requests.
+        :param on_attempt: Hook or hooks called with `RetryEvent` before every attempt.
+        :param on_backoff: Hooks called before sleeping, the event has `wait`.
+        :param on_giveup: Hooks called when the request gives up.
+        :param on_success: Hooks called when the request succeeds.
+        """
+        self._policy = policy if isinstance(policy, RetryPolicy) else RetryPolicy(policy)
+        self._client = client
+        self._backoff_option = backoff_option
+        self._attempts = attempts
+        self._timeout = timeout
+        self._jitter = jitter
+        self._budget = budget
+        self._circuit_breaker = circuit_breaker
+        self._idempotency = idempotency
+        self._spool_threshold = spool_threshold
+        self._hedge = hedge
+        self._adaptive_timeout = adaptive_timeout
+        self._limiter = limiter
+        self._cache = cache
+        self._single_flight = single_flight
+        self._on_attempt = _hooks(on_attempt)
+        self._on_backoff = _hooks(on_backoff)
+        self._on_giveup = _hooks(on_giveup)
+        self._on_success = _hooks(on_success)
+
+    @property
+    def client(self) -> AsyncClient:
+        return self._client
+
+    @property
+    def policy(self) -> RetryPolicy:
+        return self._policy
+
+    async def _request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Response:
+        rules = self._policy.rules
+        attempts = 0
+        # failed attempts and schedule of every rule, a schedule is created on the first failure
+        failures = [0] * len(rules)
+        waits: List[Optional[_BackoffGenerator]] = [None] * len(rules)
+        request, send_kwargs = _build_request(
+            self._client,
+            url,
+            method=method,
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+        circuit_key = _circuit_key(request.url)
+        if self._idempotency is not None:
+            self._idempotency.prepare(request)
+        spool = _spool_request(request, self._spool_threshold)
+        deadline = Deadline(self._timeout)
+        # timeouts of the client, every attempt gets them clamped to the deadline
+        timeouts = dict(request.extensions.get("timeout", {}))
+
+        def is_failure(response: Response) -> bool:
+            return not _is_not_modified(request, response) and self._policy.classify_response(response) is not None
+
+        logger.info("Starting request %s %s", method, url)
+
+        try:
+            while True:
+                attempts += 1
+                elapsed_time = deadline.elapsed()
+                logger.debug("Attempts: %s, elapsed time: %s", attempts, elapsed_time)
+
+                if self._on_attempt:
+                    await _call_hooks(self._on_attempt, RetryEvent(attempts, elapsed_time, request.method, request.url))
+
+                attempt_timeouts = timeouts
+                if self._adaptive_timeout is not None:
+                    attempt_timeouts = self._adaptive_timeout.timeouts(request.url, attempts, timeouts)
+                deadline.apply(request, attempt_timeouts)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.acquire(circuit_key)
+
+                failure: Union[BaseException, Response]
+                try:
+                    response = await _send(
+                        self._client,
+                        request,
+                        send_kwargs,
+                        self._hedge,
+                        self._adaptive_timeout,
+                        self._limiter,
+                        is_failure,
+                    )
+                except self._policy.exceptions as e:
+                    failure, rule = e, self._policy.classify_exception(e)
+                except TransportError:
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_failure(circuit_key)
+                    raise
+                except BaseException:
+                    # a cancellation or an error which isn't retried says nothing about the host
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.release(circuit_key)
+                    raise
+                else:
+                    rule = None if _is_not_modified(request, response) else self._policy.classify_response(response)
+                    if rule is None:
+                        if self._circuit_breaker is not None:
+                            self._circuit_breaker.record_success(circuit_key)
+                        if self._budget is not None:
+                            self._budget.deposit()
+                        if self._on_success:
+                            event = RetryEvent(
+                                attempts, deadline.elapsed(), request.method, request.url, response=response
+                            )
+                            await _call_hooks(self._on_success, event)
+                        return response
+                    failure = response
+
+                assert rule is not None
+                logger.info("Attempt failed by rule %s: %r", rule, failure)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_failure(circuit_key)
+
+                failures[rule] += 1
+                wait = waits[rule]
+                if wait is None:
+                    wait = waits[rule] = _init_wait(rules[rule].backoff_option or self._backoff_option)
+                rule_attempts = rules[rule].attempts
+
+                seconds = _retry_wait(
+                    wait,
+                    failure,
+                    attempts,
+                    deadline.elapsed(),
+                    max_attempts=self._attempts,
+                    timeout=self._timeout,
+                    jitter=self._jitter,
+                    budget=self._budget,
+                    circuit_breaker=self._circuit_breaker,
+                    circuit_key=circuit_key,
+                    retryable=(rule_attempts is None or failures[rule] < rule_attempts)
+                    and (self._idempotency is None or self._idempotency.is_retryable(request, failure)),
+                )
+                exception = failure if isinstance(failure, BaseException) else None
+                failed_response = failure if isinstance(failure, Response) else None
+
+                if seconds is None:
+                    if self._on_giveup:
+                        event = RetryEvent(
+                            attempts,
+                            deadline.elapsed(),
+                            request.method,
+                            request.url,
+                            exception=exception,
+                            response=failed_response,
+                        )
+                        await _call_hooks(self._on_giveup, event)
+                    if failed_response is not None:
+                        return failed_response
+                    raise failure  # type: ignore[misc]
+
+                if failed_response is not None:
+                    # a streamed response still holds its connection
+                    await failed_response.aclose()
+
+                logger.debug("Seconds for retry: %s", seconds)
+                if self._on_backoff:
+                    event = RetryEvent(
+                        attempts,
+                        deadline.elapsed(),
+                        request.method,
+                        request.url,
+                        seconds,
+                        exception=exception,
+                        response=failed_response,
+                    )
+                    await _call_hooks(self._on_backoff, event)
+
+                await asyncio.sleep(seconds)
+        finally:
+            # the spooled body is deleted as soon as the request is done
+            if spool is not None:
+                spool.close()
+
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self._client.aclose()
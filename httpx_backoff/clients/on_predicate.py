@@ -1,18 +1,28 @@
 import asyncio
-import datetime
 import logging
 from typing import Any, Callable, Optional
 
-from httpx import AsyncClient, Response
-from httpx_backoff._common import _next_wait
-from httpx_backoff._typing import _BackoffGenerator, _Jitterer
+from httpx import AsyncClient, Response, TransportError
+from httpx_backoff._common import _build_request, _init_wait, _is_not_modified, _retry_wait, _send
+from httpx_backoff._typing import _BackoffOption, _Jitterer
+from httpx_backoff.adaptive_timeout import AdaptiveTimeout
 from httpx_backoff.backoff_options.jitter import use_full_jitter
-from httpx_backoff.clients.base import CustomClient
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.cache import HTTPCache
+from httpx_backoff.circuit_breaker import CircuitBreaker, _circuit_key
+from httpx_backoff.clients.base import _CachingClient
+from httpx_backoff.deadline import Deadline
+from httpx_backoff.hedging import HedgePolicy
+from httpx_backoff.hooks import RetryEvent, _call_hooks, _hooks, _Hooks
+from httpx_backoff.idempotency import IdempotencyPolicy
+from httpx_backoff.limiter import ConcurrencyLimiter
+from httpx_backoff.single_flight import SingleFlight
+from httpx_backoff.spooling import DEFAULT_SPOOL_THRESHOLD, _spool_request
 
 logger = logging.getLogger(__name__)
 
 
-class PredicateClient(CustomClient):
+class PredicateClient(_CachingClient):
     """
     Client bases on a retry way on predicate
     """
@@ -23,6 +33,19 @@ class PredicateClient(CustomClient):
         "_backoff_option",
         "_timeout",
         "_jitter",
+        "_budget",
+        "_circuit_breaker",
+        "_idempotency",
+        "_spool_threshold",
+        "_hedge",
+        "_adaptive_timeout",
+        "_limiter",
+        "_cache",
+        "_single_flight",
+        "_on_attempt",
+        "_on_backoff",
+        "_on_giveup",
+        "_on_success",
     )
 
     def __init__(
@@ -30,10 +53,23 @@ class PredicateClient(CustomClient):
         predicate: Callable[[Response], bool],
         *,
         client: AsyncClient,
-        backoff_option: _BackoffGenerator,
+        backoff_option: _BackoffOption,
         attempts: int = 5,
         timeout: Optional[float] = None,
         jitter: Optional[_Jitterer] = use_full_jitter,
+        budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        idempotency: Optional[IdempotencyPolicy] = None,
+        spool_threshold: Optional[int] = DEFAULT_SPOOL_THRESHOLD,
+        hedge: Optional[HedgePolicy] = None,
+        adaptive_timeout: Optional[AdaptiveTimeout] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        cache: Optional[HTTPCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        on_attempt: _Hooks = None,
+        on_backoff: _Hooks = None,
+        on_giveup: _Hooks = None,
+        on_success: _Hooks = None,
     ):
         """
         Constructor
@@ -42,7 +78,10 @@ class PredicateClient(CustomClient):
             the target function will trigger backoff when considered
             truthfully. If not specified, the default behavior is to
             backoff on falsely return values.
-        :param backoff_option: Your backoff option which influences to retrying behaviour
+        :param backoff_option: Your backoff option which influences to retrying behaviour.
+            Every request works with its own copy of the option (or with a new
+            generator when a factory is passed), so concurrent requests don't
+            share the attempt counter.
         :param attempts: The maximum number of attempts to make before giving
             up. In the case of failure, the result of the last attempt
             will be returned. The default func of None means there
@@ -58,6 +97,34 @@ class PredicateClient(CustomClient):
             concurrent clients. Wait times are jittered by default
             using the full_jitter function. Jittering may be disabled
             altogether by passing jitter=None.
+        :param budget: Retry budget which may be shared between clients. Successful
+            requests deposit to it and every retry has to withdraw from it, the
+            request gives up when the budget is exhausted.
+        :param circuit_breaker: Circuit breaker which may be shared between clients.
+            While the circuit of the host is open requests fail fast with
+            `CircuitOpenError` and a running request gives up instead of sleeping.
+        :param idempotency: Idempotency policy. Non-idempotent requests are retried only
+            after connect phase failures or when they carry an idempotency key, which
+            the policy may generate once per request.
+        :param spool_threshold: Bytes of a request body which can be read only once (a generator
+            or a file) kept in memory, the rest is spooled to a temporary file, so retries send the
+            whole body again without holding it in memory. None disables spooling.
+        :param hedge: Hedging policy. A slow attempt of an idempotent request is
+            duplicated after the hedge delay and the first response wins.
+        :param adaptive_timeout: Per-host read timeouts of attempts derived from the
+            observed latency percentiles, it may be shared between clients.
+        :param limiter: Adaptive per-host limit of concurrent attempts, an attempt above the
+            limit waits for a slot and fails fast with `ConcurrencyLimitError` after the
+            allowed wait. It may be shared between clients of one event loop.
+        :param cache: HTTP cache which answers fresh requests without the network and
+            revalidates stale entries, it may be shared between clients.
+        :param single_flight: Coalescing of identical concurrent GET and HEAD requests, they
+            share one retried request and get the same response.
+        :param on_attempt: Hook or hooks called with `RetryEvent` before every attempt.
+        :param on_backoff: Hooks called before sleeping, the event has `wait`.
+        :param on_giveup: Hooks called when the request gives up.
+        :param on_success: Hooks called when the request succeeds.
+            Hooks may be coroutine functions. Without hooks no event is created.
         """
         self._predicate = predicate
         self._client = client
@@ -65,9 +132,22 @@ class PredicateClient(CustomClient):
         self._timeout = timeout
         self._attempts = attempts
         self._jitter = jitter
+        self._budget = budget
+        self._circuit_breaker = circuit_breaker
+        self._idempotency = idempotency
+        self._spool_threshold = spool_threshold
+        self._hedge = hedge
+        self._adaptive_timeout = adaptive_timeout
+        self._limiter = limiter
+        self._cache = cache
+        self._single_flight = single_flight
+        self._on_attempt = _hooks(on_attempt)
+        self._on_backoff = _hooks(on_backoff)
+        self._on_giveup = _hooks(on_giveup)
+        self._on_success = _hooks(on_success)
 
     @property
-    def client(self):
+    def client(self) -> AsyncClient:
         return self._client
 
     async def _request(
@@ -82,53 +162,124 @@ class PredicateClient(CustomClient):
         **kwargs: Any,
     ) -> Response:
         attempts = 0
-        start = datetime.datetime.now()
+        wait = _init_wait(self._backoff_option)
+        request, send_kwargs = _build_request(
+            self._client,
+            url,
+            method=method,
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+        circuit_key = _circuit_key(request.url)
+        if self._idempotency is not None:
+            self._idempotency.prepare(request)
+        spool = _spool_request(request, self._spool_threshold)
+        deadline = Deadline(self._timeout)
+        # timeouts of the client, every attempt gets them clamped to the deadline
+        timeouts = dict(request.extensions.get("timeout", {}))
 
-        logger.info(f"Starting request on {start.isoformat()}")
+        def is_failure(response: Response) -> bool:
+            return not _is_not_modified(request, response) and self._predicate(response)
 
-        while True:
-            attempts += 1
-            logger.debug(f"Attempts: {attempts}")
+        logger.info("Starting request %s %s", method, url)
 
-            elapsed_time = datetime.timedelta.total_seconds(datetime.datetime.now() - start)
-            logger.debug(f"Elapsed time: {elapsed_time}")
+        try:
+            while True:
+                attempts += 1
+                elapsed_time = deadline.elapsed()
+                logger.debug("Attempts: %s, elapsed time: %s", attempts, elapsed_time)
 
-            response = await self._client.request(
-                url=url,
-                method=method,
-                json=json,
-                headers=headers,
-                data=data,
-                params=params,
-                **kwargs,
-            )
+                if self._on_attempt:
+                    await _call_hooks(self._on_attempt, RetryEvent(attempts, elapsed_time, request.method, request.url))
 
-            if self._predicate(response):
-                max_attempts_exceeded = attempts == self._attempts
-                max_time_exceeded = self._timeout is not None and elapsed_time >= self._timeout
+                attempt_timeouts = timeouts
+                if self._adaptive_timeout is not None:
+                    attempt_timeouts = self._adaptive_timeout.timeouts(request.url, attempts, timeouts)
+                deadline.apply(request, attempt_timeouts)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.acquire(circuit_key)
+                    try:
+                        response = await _send(
+                            self._client,
+                            request,
+                            send_kwargs,
+                            self._hedge,
+                            self._adaptive_timeout,
+                            self._limiter,
+                            is_failure,
+                        )
+                    except TransportError:
+                        self._circuit_breaker.record_failure(circuit_key)
+                        raise
+                    except BaseException:
+                        # a cancellation or an error which isn't retried says nothing about the host
+                        self._circuit_breaker.release(circuit_key)
+                        raise
+                else:
+                    response = await _send(
+                        self._client,
+                        request,
+                        send_kwargs,
+                        self._hedge,
+                        self._adaptive_timeout,
+                        self._limiter,
+                        is_failure,
+                    )
 
-                if max_attempts_exceeded or max_time_exceeded:
-                    logger.debug(f"Max attempts: {self._attempts}\nMax time: {self._timeout}")
+                if not is_failure(response):
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_success(circuit_key)
+                    if self._budget is not None:
+                        self._budget.deposit()
+                    if self._on_success:
+                        elapsed_time = deadline.elapsed()
+                        event = RetryEvent(attempts, elapsed_time, request.method, request.url, response=response)
+                        await _call_hooks(self._on_success, event)
                     break
 
-                try:
-                    seconds = _next_wait(
-                        self._backoff_option,
-                        response,
-                        elapsed_time,
-                        self._jitter,
-                        self._timeout,
-                    )
-                    logger.debug(f"Seconds for retry: {seconds}")
-                except StopIteration:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_failure(circuit_key)
+
+                seconds = _retry_wait(
+                    wait,
+                    response,
+                    attempts,
+                    deadline.elapsed(),
+                    max_attempts=self._attempts,
+                    timeout=self._timeout,
+                    jitter=self._jitter,
+                    budget=self._budget,
+                    circuit_breaker=self._circuit_breaker,
+                    circuit_key=circuit_key,
+                    retryable=self._idempotency is None or self._idempotency.is_retryable(request, response),
+                )
+
+                if seconds is None:
+                    if self._on_giveup:
+                        elapsed_time = deadline.elapsed()
+                        event = RetryEvent(attempts, elapsed_time, request.method, request.url, response=response)
+                        await _call_hooks(self._on_giveup, event)
                     break
 
+                # a streamed response still holds its connection
+                await response.aclose()
+
+                logger.debug("Seconds for retry: %s", seconds)
+                if self._on_backoff:
+                    elapsed_time = deadline.elapsed()
+                    event = RetryEvent(attempts, elapsed_time, request.method, request.url, seconds, response=response)
+                    await _call_hooks(self._on_backoff, event)
+
                 await asyncio.sleep(seconds)
-                continue
-            else:
-                break
 
-        return response
+            return response
+        finally:
+            # the spooled body is deleted as soon as the request is done
+            if spool is not None:
+                spool.close()
 
     def is_closed(self) -> bool:
         return self._client.is_closed
@@ -0,0 +1,284 @@
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from functools import partial
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional, Union
+
+from httpx import Response
+
+
+class SyncCustomClient(AbstractContextManager, metaclass=ABCMeta):
+    """
+    Abstract class for synchronous backoff clients
+    """
+
+    @abstractmethod
+    def _request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        It's a custom protected request which encapsulates request with backoff behavior.
+
+        **Parameters**: See `httpx.request`.
+        """
+        ...
+
+    def request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        It's a custom public request which encapsulates request with backoff behavior.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self._request(
+            url=url,
+            method=method,
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def get(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `GET` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="GET",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def post(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `POST` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="POST",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def patch(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `PATCH` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="PATCH",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def put(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `PUT` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="PUT",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def delete(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `DELETE` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="DELETE",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def options(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `OPTIONS` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="OPTIONS",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def head(
+        self,
+        url: str,
+        *,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        """
+        Send a custom `HEAD` request.
+
+        **Parameters**: See `httpx.request`.
+        """
+        return self.request(
+            url=url,
+            method="HEAD",
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+
+    def map(
+        self,
+        requests: Iterable[Dict[str, Any]],
+        *,
+        max_workers: int = 10,
+        return_exceptions: bool = False,
+    ) -> Iterator[Union[Optional[Response], BaseException]]:
+        """
+        Sends many requests with backoff behavior across a bounded thread pool.
+
+        All threads share the connection pool of the client. Requests are taken
+        from the iterable lazily, at most `max_workers` are in flight and results
+        are yielded in the order of the requests.
+
+        :param requests: Keyword arguments of `request` for every request, e.g.
+            {"url": "https://example.org", "method": "POST", "json": {}}
+        :param max_workers: The maximum number of threads.
+        :param return_exceptions: Yield exceptions instead of raising the first one.
+        """
+        pending: Deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for spec in requests:
+                    pending.append(executor.submit(partial(self.request, **spec)))
+                    # keep a second portion queued, so the threads don't idle behind a slow head
+                    if len(pending) >= 2 * max_workers:
+                        yield self._map_result(pending.popleft(), return_exceptions)
+
+                while pending:
+                    yield self._map_result(pending.popleft(), return_exceptions)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _map_result(future: Future, return_exceptions: bool) -> Union[Optional[Response], BaseException]:
+        if return_exceptions:
+            exception = future.exception()
+            if exception is not None:
+                return exception
+        return future.result()
+
+    @abstractmethod
+    def is_closed(self) -> bool:
+        ...
+
+    def __enter__(self) -> "SyncCustomClient":
+        return self
@@ -0,0 +1,235 @@
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from httpx import Client, Response, TransportError
+from httpx_backoff._common import _build_request, _init_wait, _is_not_modified, _retry_wait
+from httpx_backoff._typing import _BackoffOption, _Jitterer
+from httpx_backoff.backoff_options.jitter import use_full_jitter
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.circuit_breaker import CircuitBreaker, _circuit_key
+from httpx_backoff.clients.sync_base import SyncCustomClient
+from httpx_backoff.deadline import Deadline
+from httpx_backoff.hooks import RetryEvent, _call_hooks_sync, _hooks, _Hooks
+from httpx_backoff.idempotency import IdempotencyPolicy
+from httpx_backoff.spooling import DEFAULT_SPOOL_THRESHOLD, _spool_request
+
+logger = logging.getLogger(__name__)
+
+
+class SyncPredicateClient(SyncCustomClient):
+    """
+    Synchronous client bases on a retry way on predicate
+    """
+
+    __slots__ = (
+        "_predicate",
+        "_client",
+        "_backoff_option",
+        "_timeout",
+        "_jitter",
+        "_budget",
+        "_circuit_breaker",
+        "_idempotency",
+        "_spool_threshold",
+        "_on_attempt",
+        "_on_backoff",
+        "_on_giveup",
+        "_on_success",
+    )
+
+    def __init__(
+        self,
+        predicate: Callable[[Response], bool],
+        *,
+        client: Client,
+        backoff_option: _BackoffOption,
+        attempts: int = 5,
+        timeout: Optional[float] = None,
+        jitter: Optional[_Jitterer] = use_full_jitter,
+        budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        idempotency: Optional[IdempotencyPolicy] = None,
+        spool_threshold: Optional[int] = DEFAULT_SPOOL_THRESHOLD,
+        on_attempt: _Hooks = None,
+        on_backoff: _Hooks = None,
+        on_giveup: _Hooks = None,
+        on_success: _Hooks = None,
+    ):
+        """
+        Constructor
+        :param client: Client from httpx, its connection pool is shared by all threads
+        :param predicate: A function which when called on the return func of
+            the target function will trigger backoff when considered
+            truthfully. If not specified, the default behavior is to
+            backoff on falsely return values.
+        :param backoff_option: Your backoff option which influences to retrying behaviour.
+            Every request works with its own copy of the option (or with a new
+            generator when a factory is passed), so concurrent requests don't
+            share the attempt counter.
+        :param attempts: The maximum number of attempts to make before giving
+            up. In the case of failure, the result of the last attempt
+            will be returned. The default func of None means there
+            is no limit to the number of tries. If a callable is passed,
+            it will be evaluated at runtime and its return func used.
+        :param timeout: The maximum total amount of time to try for before
+            giving up. If this time expires, the result of the last
+            attempt will be returned. If a callable is passed, it will
+            be evaluated at runtime and its return func used.
+        :param jitter: A function of the func yielded by backoff_option returning
+            the actual time to wait. This distributes wait times
+            stochastically in order to avoid timing collisions across
+            concurrent clients. Wait times are jittered by default
+            using the full_jitter function. Jittering may be disabled
+            altogether by passing jitter=None.
+        :param budget: Retry budget which may be shared between clients. Successful
+            requests deposit to it and every retry has to withdraw from it, the
+            request gives up when the budget is exhausted.
+        :param circuit_breaker: Circuit breaker which may be shared between clients.
+            While the circuit of the host is open requests fail fast with
+            `CircuitOpenError` and a running request gives up instead of sleeping.
+        :param idempotency: Idempotency policy. Non-idempotent requests are retried only
+            after connect phase failures or when they carry an idempotency key, which
+            the policy may generate once per request.
+        :param spool_threshold: Bytes of a request body which can be read only once (a generator
+            or a file) kept in memory, the rest is spooled to a temporary file, so retries send the
+            whole body again without holding it in memory. None disables spooling.
+        :param on_attempt: Hook or hooks called with `RetryEvent` before every attempt.
+        :param on_backoff: Hooks called before sleeping, the event has `wait`.
+        :param on_giveup: Hooks called when the request gives up.
+        :param on_success: Hooks called when the request succeeds.
+            Without hooks no event is created.
+        """
+        self._predicate = predicate
+        self._client = client
+        self._backoff_option = backoff_option
+        self._timeout = timeout
+        self._attempts = attempts
+        self._jitter = jitter
+        self._budget = budget
+        self._circuit_breaker = circuit_breaker
+        self._idempotency = idempotency
+        self._spool_threshold = spool_threshold
+        self._on_attempt = _hooks(on_attempt)
+        self._on_backoff = _hooks(on_backoff)
+        self._on_giveup = _hooks(on_giveup)
+        self._on_success = _hooks(on_success)
+
+    @property
+    def client(self) -> Client:
+        return self._client
+
+    def _request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Response:
+        attempts = 0
+        wait = _init_wait(self._backoff_option)
+        request, send_kwargs = _build_request(
+            self._client,
+            url,
+            method=method,
+            json=json,
+            headers=headers,
+            data=data,
+            params=params,
+            **kwargs,
+        )
+        circuit_key = _circuit_key(request.url)
+        if self._idempotency is not None:
+            self._idempotency.prepare(request)
+        spool = _spool_request(request, self._spool_threshold)
+        deadline = Deadline(self._timeout)
+        # timeouts of the client, every attempt gets them clamped to the deadline
+        timeouts = dict(request.extensions.get("timeout", {}))
+
+        logger.info("Starting request %s %s", method, url)
+
+        try:
+            while True:
+                attempts += 1
+                elapsed_time = deadline.elapsed()
+                logger.debug("Attempts: %s, elapsed time: %s", attempts, elapsed_time)
+
+                if self._on_attempt:
+                    _call_hooks_sync(self._on_attempt, RetryEvent(attempts, elapsed_time, request.method, request.url))
+
+                deadline.apply(request, timeouts)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.acquire(circuit_key)
+                    try:
+                        response = self._client.send(request, **send_kwargs)
+                    except TransportError:
+                        self._circuit_breaker.record_failure(circuit_key)
+                        raise
+                    except BaseException:
+                        # an interruption or an error which isn't retried says nothing about the host
+                        self._circuit_breaker.release(circuit_key)
+                        raise
+                else:
+                    response = self._client.send(request, **send_kwargs)
+
+                if _is_not_modified(request, response) or not self._predicate(response):
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_success(circuit_key)
+                    if self._budget is not None:
+                        self._budget.deposit()
+                    if self._on_success:
+                        elapsed_time = deadline.elapsed()
+                        event = RetryEvent(attempts, elapsed_time, request.method, request.url, response=response)
+                        _call_hooks_sync(self._on_success, event)
+                    break
+
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_failure(circuit_key)
+
+                seconds = _retry_wait(
+                    wait,
+                    response,
+                    attempts,
+                    deadline.elapsed(),
+                    max_attempts=self._attempts,
+                    timeout=self._timeout,
+                    jitter=self._jitter,
+                    budget=self._budget,
+                    circuit_breaker=self._circuit_breaker,
+                    circuit_key=circuit_key,
+                    retryable=self._idempotency is None or self._idempotency.is_retryable(request, response),
+                )
+
+                if seconds is None:
+                    if self._on_giveup:
+                        elapsed_time = deadline.elapsed()
+                        event = RetryEvent(attempts, elapsed_time, request.method, request.url, response=response)
+                        _call_hooks_sync(self._on_giveup, event)
+                    break
+
+                # a streamed response still holds its connection
+                response.close()
+
+                logger.debug("Seconds for retry: %s", seconds)
+                if self._on_backoff:
+                    elapsed_time = deadline.elapsed()
+                    event = RetryEvent(attempts, elapsed_time, request.method, request.url, seconds, response=response)
+                    _call_hooks_sync(self._on_backoff, event)
+
+                time.sleep(seconds)
+
+            return response
+        finally:
+            # the spooled body is deleted as soon as the request is done
+            if spool is not None:
+                spool.close()
+
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    def __exit__(self, *_: Any) -> None:
+        self._client.close()
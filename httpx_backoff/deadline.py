@@ -0,0 +1,64 @@
+import time
+from typing import Dict, Optional
+
+from httpx import Request, Timeout
+
+_Timeouts = Dict[str, Optional[float]]
+
+_NO_TIMEOUTS = Timeout(None).as_dict()
+
+
+class Deadline:
+    """
+    Monotonic deadline of a request with all its attempts and sleeps.
+
+    It's created at the start of the request and every elapsed time check uses
+    it, so a jump of the wall clock doesn't shorten or extend the request. The
+    httpx timeouts of an attempt are clamped to the remaining time, so an
+    attempt in flight can't overrun the deadline.
+    """
+
+    __slots__ = ("_timeout", "_start")
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        :param timeout: Seconds for the whole request, None means no deadline.
+        """
+        self._timeout = timeout
+        self._start = time.monotonic()
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self._timeout
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def remaining(self) -> Optional[float]:
+        """
+        :return: seconds left before the deadline or None if there is no deadline.
+        """
+        if self._timeout is None:
+            return None
+        return max(self._timeout - self.elapsed(), 0.0)
+
+    def expired(self) -> bool:
+        return self._timeout is not None and self.elapsed() >= self._timeout
+
+    def apply(self, request: Request, timeouts: _Timeouts) -> None:
+        """
+        Sets the timeouts of the next attempt of the request clamped to the remaining time.
+
+        :param timeouts: The timeouts the request was built with, see `httpx.Timeout.as_dict`.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            if timeouts:
+                request.extensions = {**request.extensions, "timeout": timeouts}
+            return
+
+        clamped = {
+            name: remaining if value is None else min(value, remaining)
+            for name, value in (timeouts or _NO_TIMEOUTS).items()
+        }
+        request.extensions = {**request.extensions, "timeout": clamped}
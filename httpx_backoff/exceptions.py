@@ -0,0 +1,34 @@
+from typing import Tuple
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit of its host is open
+    """
+
+    def __init__(self, key: Tuple[str, str, int], retry_after: float):
+        """
+        :param key: scheme, host and port of the circuit
+        :param retry_after: seconds until the circuit lets a probe request through
+        """
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"Circuit for {key[0]}://{key[1]}:{key[2]} is open, retry after {retry_after:.3f}s")
+
+
+class ConcurrencyLimitError(Exception):
+    """
+    Raised instead of sending a request when the concurrency limit of its host is
+    reached and no slot is freed within the allowed wait
+    """
+
+    def __init__(self, host: str, limit: int, waited: float):
+        """
+        :param host: host of the request
+        :param limit: the concurrency limit of the host at the moment of the rejection
+        :param waited: seconds the request waited in the queue
+        """
+        self.host = host
+        self.limit = limit
+        self.waited = waited
+        super().__init__(f"Concurrency limit {limit} of {host} is reached, waited {waited:.3f}s")
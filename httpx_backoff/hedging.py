@@ -0,0 +1,194 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Collection, List, Optional
+
+from httpx import Response
+from httpx_backoff._common import IDEMPOTENT_METHODS
+
+
+class HedgePolicy:
+    """
+    Hedging of slow attempts.
+
+    If an attempt isn't completed after the hedge delay, the same request is sent
+    once more concurrently, the first successful response wins and the other
+    attempt is cancelled. The delay is either static or the given percentile of
+    the observed latencies. Only idempotent methods are hedged and the share of
+    hedged requests is capped by a token bucket: every request deposits `max_ratio`
+    tokens up to `max_burst`, every hedge takes one token.
+    """
+
+    __slots__ = (
+        "_delay",
+        "_percentile",
+        "_max_ratio",
+        "_max_burst",
+        "_tokens",
+        "_methods",
+        "_window",
+        "_latencies",
+        "_samples",
+        "_min_samples",
+        "_percentile_delay",
+        "_requests",
+        "_hedges",
+        "_wins",
+    )
+
+    def __init__(
+        self,
+        *,
+        delay: Optional[float] = None,
+        percentile: Optional[float] = None,
+        max_ratio: float = 0.1,
+        max_burst: float = 10.0,
+        methods: Collection[str] = IDEMPOTENT_METHODS,
+        window: int = 1000,
+        min_samples: int = 20,
+    ):
+        """
+        :param delay: Static hedge delay in seconds. When percentile is set too,
+            it's used until enough latencies are observed.
+        :param percentile: Percentile (0..100) of the observed latencies used as
+            the hedge delay, e.g. 95.
+        :param max_ratio: The maximum share of requests which may be hedged.
+        :param max_burst: Capacity of the token bucket. It's the burst of hedges which is
+            allowed after a quiet period, the bucket is full at start.
+        :param methods: Methods which are allowed to be hedged.
+        :param window: Number of the latest latencies the percentile is computed over.
+        :param min_samples: Number of observed latencies required to use the percentile.
+        """
+        if delay is None and percentile is None:
+            raise ValueError("delay or percentile must be set")
+        if percentile is not None and not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        if max_burst < 1:
+            raise ValueError("max_burst must be at least 1")
+
+        self._delay = delay
+        self._percentile = percentile
+        self._max_ratio = max_ratio
+        self._max_burst = max_burst
+        self._tokens = max_burst
+        self._methods = frozenset(method.upper() for method in methods)
+        self._window = window
+        self._latencies: List[float] = []
+        self._samples = 0
+        self._min_samples = min_samples
+        self._percentile_delay: Optional[float] = None
+        self._requests = 0
+        self._hedges = 0
+        self._wins = 0
+
+    def _observe(self, latency: float) -> None:
+        if self._percentile is None:
+            return
+
+        if len(self._latencies) < self._window:
+            self._latencies.append(latency)
+        else:
+            self._latencies[self._samples % self._window] = latency
+        self._samples += 1
+
+        # the percentile is refreshed periodically, not on every response
+        if self._samples % self._min_samples == 0:
+            ordered = sorted(self._latencies)
+            self._percentile_delay = ordered[min(len(ordered) - 1, int(len(ordered) * self._percentile / 100))]
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self._percentile_delay is not None:
+            return self._percentile_delay
+        return self._delay
+
+    async def send(self, send: Callable[[], Awaitable[Response]], method: str) -> Response:
+        """
+        Runs an attempt with hedging.
+
+        :param send: A function which starts a new attempt.
+        :param method: Method of the request.
+        """
+        if method not in self._methods:
+            return await send()
+
+        self._requests += 1
+        self._tokens = min(self._max_burst, self._tokens + self._max_ratio)
+        delay = self._hedge_delay()
+        start = time.monotonic()
+
+        if delay is None or self._tokens < 1:
+            response = await send()
+            self._observe(time.monotonic() - start)
+            return response
+
+        # the token is reserved for the hedge, so concurrent slow requests can't overdraw the bucket
+        self._tokens -= 1
+        first = asyncio.ensure_future(send())
+        tasks = [first]
+        winner: Optional["asyncio.Future[Response]"] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                response = first.result()
+                winner = first
+                self._observe(time.monotonic() - start)
+                return response
+
+            self._hedges += 1
+            hedge = asyncio.ensure_future(send())
+            tasks.append(hedge)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+
+                    winner = task
+                    self._wins += task is hedge
+                    # a winning hedge says nothing about the latency of the original attempt
+                    if task is first:
+                        self._observe(time.monotonic() - start)
+                    return task.result()
+
+            assert error is not None
+            raise error
+        finally:
+            if len(tasks) == 1:
+                # no hedge was sent, the reserved token is returned
+                self._tokens = min(self._max_burst, self._tokens + 1)
+            for task in tasks:
+                task.cancel()
+            # the losers are awaited, so they don't outlive the request with half-closed connections
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await _discard([task for task in tasks if task is not winner and not task.cancelled()])
+
+    @property
+    def requests(self) -> int:
+        """
+        Number of requests which were eligible for hedging.
+        """
+        return self._requests
+
+    @property
+    def hedges(self) -> int:
+        """
+        Number of sent hedge attempts.
+        """
+        return self._hedges
+
+    @property
+    def wins(self) -> int:
+        """
+        Number of hedge attempts which completed before the original one.
+        """
+        return self._wins
+
+
+async def _discard(tasks: Collection["asyncio.Future[Response]"]) -> None:
+    # a loser which completed at the same time still holds a connection
+    for task in tasks:
+        if task.exception() is None:
+            await task.result().aclose()
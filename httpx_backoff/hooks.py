@@ -0,0 +1,53 @@
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+from httpx import URL, Response
+
+
+@dataclass(frozen=True, slots=True)
+class RetryEvent:
+    """
+    Event which is passed to the hooks of a client
+    """
+
+    #: number of the attempt, starting from 1
+    attempt: int
+    #: seconds since the start of the request
+    elapsed: float
+    method: str
+    url: URL
+    #: seconds to sleep before the next attempt, only for on_backoff
+    wait: Optional[float] = None
+    #: exception of the attempt if it raised
+    exception: Optional[BaseException] = None
+    #: response of the attempt if it returned
+    response: Optional[Response] = None
+
+    @property
+    def status_code(self) -> Optional[int]:
+        return self.response.status_code if self.response is not None else None
+
+
+_Hook = Callable[[RetryEvent], Any]
+_Hooks = Union[None, _Hook, Iterable[_Hook]]
+
+
+def _hooks(hooks: _Hooks) -> Tuple[_Hook, ...]:
+    if hooks is None:
+        return ()
+    if callable(hooks):
+        return (hooks,)
+    return tuple(hooks)
+
+
+async def _call_hooks(hooks: Tuple[_Hook, ...], event: RetryEvent) -> None:
+    for hook in hooks:
+        result = hook(event)
+        if inspect.isawaitable(result):
+            await result
+
+
+def _call_hooks_sync(hooks: Tuple[_Hook, ...], event: RetryEvent) -> None:
+    for hook in hooks:
+        hook(event)
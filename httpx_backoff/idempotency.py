@@ -0,0 +1,63 @@
+import uuid
+from typing import Any, Callable, Collection
+
+from httpx import ConnectError, ConnectTimeout, PoolTimeout, Request
+from httpx_backoff._common import IDEMPOTENT_METHODS
+
+# the request has never left the client, so it's safe to repeat it with any method
+CONNECT_PHASE_ERRORS = (ConnectError, ConnectTimeout, PoolTimeout)
+
+
+def _new_key() -> str:
+    return str(uuid.uuid4())
+
+
+class IdempotencyPolicy:
+    """
+    Method and failure phase aware retry policy.
+
+    Idempotent methods are retried on any failure. A non-idempotent request
+    (POST, PATCH) is retried after a connect phase failure, when the request
+    never reached the server, and after other failures only when it carries
+    the idempotency key header, so the server can deduplicate it.
+    """
+
+    __slots__ = ("_methods", "_header", "_generate_key", "_key_factory")
+
+    def __init__(
+        self,
+        *,
+        methods: Collection[str] = IDEMPOTENT_METHODS,
+        header: str = "Idempotency-Key",
+        generate_key: bool = False,
+        key_factory: Callable[[], str] = _new_key,
+    ):
+        """
+        :param methods: Methods which are retried on any failure.
+        :param header: Name of the idempotency key header.
+        :param generate_key: Add the header with a new key to non-idempotent requests
+            which don't have it. The key is generated once per request and is the same
+            in all its attempts.
+        :param key_factory: Function which returns a new key, uuid4 by default.
+        """
+        self._methods = frozenset(method.upper() for method in methods)
+        self._header = header
+        self._generate_key = generate_key
+        self._key_factory = key_factory
+
+    def prepare(self, request: Request) -> None:
+        """
+        Adds the idempotency key to the request before the first attempt.
+        """
+        if self._generate_key and request.method not in self._methods and self._header not in request.headers:
+            request.headers[self._header] = self._key_factory()
+
+    def is_retryable(self, request: Request, failure: Any) -> bool:
+        """
+        :param failure: The exception of the attempt or the rejected response.
+        """
+        return (
+            request.method in self._methods
+            or isinstance(failure, CONNECT_PHASE_ERRORS)
+            or self._header in request.headers
+        )
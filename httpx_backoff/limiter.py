@@ -0,0 +1,270 @@
+import asyncio
+import enum
+import inspect
+import math
+import time
+from collections import deque
+from typing import Awaitable, Collection, Deque, Dict, Optional, Union
+
+from httpx import Request, Response, TimeoutException, codes
+from httpx_backoff._typing import _ExceptionGroup
+from httpx_backoff.exceptions import ConcurrencyLimitError
+
+OVERLOAD_STATUSES = frozenset((codes.TOO_MANY_REQUESTS, codes.SERVICE_UNAVAILABLE))
+
+# smoothing of the short-term latency of the gradient algorithm
+_SHORT_SMOOTHING = 0.1
+
+
+class LimitAlgorithm(str, enum.Enum):
+    AIMD = "aimd"
+    GRADIENT = "gradient"
+
+
+class _HostLimit:
+    __slots__ = (
+        "limit",
+        "in_flight",
+        "waiters",
+        "short_latency",
+        "long_latency",
+        "accepted",
+        "rejected",
+        "overloads",
+    )
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+        self.short_latency: Optional[float] = None
+        self.long_latency: Optional[float] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.overloads = 0
+
+
+class ConcurrencyLimiter:
+    """
+    Adaptive per-host limit of concurrent attempts.
+
+    Every attempt takes a slot of its host and gives it back with its outcome.
+    A response with an overload status or an overload exception (429, 503 and
+    timeouts by default) multiplies the limit by `decrease`. Otherwise the limit
+    grows while at least half of it is used: with the AIMD algorithm by
+    `increase` per limit's worth of responses, with the gradient algorithm by the
+    ratio of the long-term to the short-term latency, so the limit shrinks as soon
+    as a queue builds up at the upstream, before it starts to fail.
+
+    An attempt above the limit waits for a slot in a FIFO queue for at most
+    `max_wait` seconds and fails fast with `ConcurrencyLimitError` afterwards.
+    The limiter belongs to one event loop.
+    """
+
+    __slots__ = (
+        "_algorithm",
+        "_initial_limit",
+        "_min_limit",
+        "_max_limit",
+        "_increase",
+        "_decrease",
+        "_tolerance",
+        "_smoothing",
+        "_long_window",
+        "_max_wait",
+        "_max_queue",
+        "_overload_statuses",
+        "_overload_exceptions",
+        "_hosts",
+    )
+
+    def __init__(
+        self,
+        *,
+        algorithm: Union[LimitAlgorithm, str] = LimitAlgorithm.AIMD,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        increase: float = 1.0,
+        decrease: float = 0.9,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        long_window: int = 500,
+        max_wait: float = 1.0,
+        max_queue: Optional[int] = None,
+        overload_statuses: Collection[int] = OVERLOAD_STATUSES,
+        overload_exceptions: _ExceptionGroup = (TimeoutException,),
+    ):
+        """
+        :param algorithm: "aimd" (additive increase, multiplicative decrease) or "gradient"
+            which follows the latency as well.
+        :param initial_limit: The limit of a host before any response is observed.
+        :param min_limit: The minimal limit.
+        :param max_limit: The maximal limit.
+        :param increase: AIMD growth of the limit per limit's worth of successful responses.
+        :param decrease: Multiplier of the limit on an overload response or exception.
+        :param tolerance: Gradient only, the short-term latency may exceed the long-term one
+            this many times before the limit shrinks.
+        :param smoothing: Gradient only, the weight of a new estimate of the limit.
+        :param long_window: Gradient only, number of latencies the long-term latency is averaged over.
+        :param max_wait: Seconds an attempt waits for a slot, 0 means no waiting at all.
+        :param max_queue: The maximal number of waiting attempts per host, None means no limit.
+        :param overload_statuses: Response statuses which signal an overload.
+        :param overload_exceptions: Exceptions which signal an overload.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("min_limit <= initial_limit <= max_limit must hold and min_limit must be positive")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be in (0, 1)")
+
+        self._algorithm = LimitAlgorithm(algorithm)
+        self._initial_limit = initial_limit
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._increase = increase
+        self._decrease = decrease
+        self._tolerance = tolerance
+        self._smoothing = smoothing
+        self._long_window = long_window
+        self._max_wait = max_wait
+        self._max_queue = max_queue
+        self._overload_statuses = frozenset(overload_statuses)
+        self._overload_exceptions = overload_exceptions
+        self._hosts: Dict[str, _HostLimit] = {}
+
+    def _host(self, host: str) -> _HostLimit:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostLimit(float(self._initial_limit))
+        return state
+
+    async def send(self, request: Request, response: Awaitable[Response]) -> Response:
+        """
+        Awaits the attempt within a slot of its host and learns from its outcome.
+
+        :param response: The attempt, it's closed without being awaited when it's rejected.
+        :raise ConcurrencyLimitError: if no slot is freed within `max_wait`
+        """
+        host = request.url.host
+        state = self._host(host)
+        try:
+            await self._acquire(host, state)
+        except BaseException:
+            if inspect.iscoroutine(response):
+                response.close()
+            raise
+
+        start = time.monotonic()
+        try:
+            result = await response
+        except self._overload_exceptions:  # type: ignore
+            self._release(state, time.monotonic() - start, overloaded=True)
+            raise
+        except BaseException:
+            # e.g. a refused connection or a cancelled hedge, they say nothing about the load
+            self._release(state)
+            raise
+
+        self._release(state, time.monotonic() - start, overloaded=result.status_code in self._overload_statuses)
+        return result
+
+    async def _acquire(self, host: str, state: _HostLimit) -> None:
+        if not state.waiters and state.in_flight < int(state.limit):
+            state.in_flight += 1
+            state.accepted += 1
+            return
+
+        if self._max_wait <= 0 or (self._max_queue is not None and len(state.waiters) >= self._max_queue):
+            state.rejected += 1
+            raise ConcurrencyLimitError(host, int(state.limit), 0.0)
+
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        start = time.monotonic()
+        try:
+            # a released slot is handed over to the first waiter by `_release`
+            await asyncio.wait_for(future, self._max_wait)
+        except asyncio.TimeoutError:
+            state.rejected += 1
+            raise ConcurrencyLimitError(host, int(state.limit), time.monotonic() - start) from None
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # the slot was handed over at the moment of the cancellation
+                self._release(state)
+            raise
+        finally:
+            if future.cancelled():
+                try:
+                    state.waiters.remove(future)
+                except ValueError:
+                    pass
+
+    def _release(self, state: _HostLimit, latency: Optional[float] = None, overloaded: bool = False) -> None:
+        # the limit is compared with the number of attempts in flight together with this one
+        if overloaded:
+            state.overloads += 1
+            state.limit = max(state.limit * self._decrease, self._min_limit)
+        elif latency is not None:
+            if self._algorithm is LimitAlgorithm.AIMD:
+                self._aimd(state)
+            else:
+                self._gradient(state, latency)
+
+        state.in_flight -= 1
+        while state.waiters and state.in_flight < int(state.limit):
+            future = state.waiters.popleft()
+            if future.done():
+                continue
+            future.set_result(None)
+            state.in_flight += 1
+            state.accepted += 1
+
+    def _aimd(self, state: _HostLimit) -> None:
+        # an idle host doesn't prove that a higher limit is safe
+        if state.in_flight * 2 >= state.limit:
+            state.limit = min(state.limit + self._increase / state.limit, self._max_limit)
+
+    def _gradient(self, state: _HostLimit, latency: float) -> None:
+        if state.short_latency is None or state.long_latency is None:
+            state.short_latency = state.long_latency = latency
+        else:
+            state.short_latency += (latency - state.short_latency) * _SHORT_SMOOTHING
+            state.long_latency += (latency - state.long_latency) / self._long_window
+            # the upstream has recovered, the long-term latency catches up faster
+            if state.long_latency > 2 * state.short_latency:
+                state.long_latency *= 0.95
+
+        if state.in_flight * 2 < state.limit:
+            return
+
+        gradient = max(0.5, min(1.0, self._tolerance * state.long_latency / max(state.short_latency, 1e-9)))
+        # the square root of the limit is the allowed queue at the upstream, it lets the limit grow
+        estimate = state.limit * gradient + math.sqrt(state.limit)
+        limit = state.limit * (1 - self._smoothing) + estimate * self._smoothing
+        state.limit = min(max(limit, self._min_limit), self._max_limit)
+
+    def limit(self, host: str) -> int:
+        """
+        :return: the current concurrency limit of the host
+        """
+        state = self._hosts.get(host)
+        return int(state.limit) if state is not None else self._initial_limit
+
+    def snapshot(self) -> Dict[str, Dict[str, Union[int, float, None]]]:
+        """
+        :return: the state of every host, e.g. {"example.com": {"limit": 20, "in_flight": 3,
+            "queued": 0, "accepted": 120, "rejected": 0, "overloads": 1, "latency": 0.05}}.
+            The latency is the short-term latency of the gradient algorithm.
+        """
+        return {
+            host: {
+                "limit": int(state.limit),
+                "in_flight": state.in_flight,
+                "queued": sum(not future.done() for future in state.waiters),
+                "accepted": state.accepted,
+                "rejected": state.rejected,
+                "overloads": state.overloads,
+                "latency": state.short_latency,
+            }
+            for host, state in list(self._hosts.items())
+        }
@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+from httpx_backoff.hooks import RetryEvent
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DEFAULT_ATTEMPTS_BUCKETS = (1, 2, 3, 4, 5, 7, 10)
+
+_Key = Tuple[str, str]
+
+
+class Histogram:
+    """
+    Histogram with fixed upper bounds, its memory doesn't depend on the number of observations
+    """
+
+    __slots__ = ("_bounds", "_counts", "_sum", "_count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self._bounds = tuple(sorted(bounds))
+        # the last bucket is +Inf
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = []
+        total = 0
+        for count in self._counts:
+            total += count
+            cumulative.append(total)
+
+        return {
+            "buckets": dict(zip((*self._bounds, float("inf")), cumulative)),
+            "sum": self._sum,
+            "count": self._count,
+        }
+
+
+class _Stats:
+    __slots__ = ("requests", "attempts", "retries", "giveups", "sleep_seconds", "latency")
+
+    def __init__(self, latency_buckets: Sequence[float], attempts_buckets: Sequence[float]):
+        self.requests = 0
+        self.attempts = Histogram(attempts_buckets)
+        self.retries: Dict[str, int] = {}
+        self.giveups = 0
+        self.sleep_seconds = 0.0
+        self.latency = Histogram(latency_buckets)
+
+
+def _cause(event: RetryEvent) -> str:
+    if event.exception is not None:
+        return type(event.exception).__name__
+    return str(event.status_code)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RetryMetrics:
+    """
+    In-process metrics of the retry loop per host and method.
+
+    It's fed by the hooks of the clients and `RetryTransport`:
+
+        metrics = RetryMetrics()
+        ExceptionClient(..., **metrics.hooks())
+
+    Latency is the end-to-end time of a request including backoff sleeps,
+    `sleep_seconds` shows how much of it was spent sleeping.
+    """
+
+    __slots__ = ("_latency_buckets", "_attempts_buckets", "_stats", "_lock")
+
+    def __init__(
+        self,
+        *,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        attempts_buckets: Sequence[float] = DEFAULT_ATTEMPTS_BUCKETS,
+    ):
+        self._latency_buckets = latency_buckets
+        self._attempts_buckets = attempts_buckets
+        self._stats: Dict[_Key, _Stats] = {}
+        self._lock = threading.Lock()
+
+    def hooks(self) -> Dict[str, Any]:
+        """
+        :return: keyword arguments with hooks for a client or `RetryTransport`.
+        """
+        return {"on_backoff": self.on_backoff, "on_giveup": self.on_giveup, "on_success": self.on_success}
+
+    def _get(self, event: RetryEvent) -> _Stats:
+        key = (event.url.host, event.method)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats.setdefault(key, _Stats(self._latency_buckets, self._attempts_buckets))
+        return stats
+
+    def on_backoff(self, event: RetryEvent) -> None:
+        cause = _cause(event)
+        with self._lock:
+            stats = self._get(event)
+            stats.retries[cause] = stats.retries.get(cause, 0) + 1
+            stats.sleep_seconds += event.wait or 0.0
+
+    def on_giveup(self, event: RetryEvent) -> None:
+        with self._lock:
+            stats = self._get(event)
+            stats.giveups += 1
+            self._finish(stats, event)
+
+    def on_success(self, event: RetryEvent) -> None:
+        with self._lock:
+            self._finish(self._get(event), event)
+
+    @staticmethod
+    def _finish(stats: _Stats, event: RetryEvent) -> None:
+        stats.requests += 1
+        stats.attempts.observe(event.attempt)
+        stats.latency.observe(event.elapsed)
+
+    def snapshot(self) -> Dict[_Key, Dict[str, Any]]:
+        """
+        :return: a copy of the metrics keyed by (host, method).
+        """
+        with self._lock:
+            return {
+                key: {
+                    "requests": stats.requests,
+                    "attempts": stats.attempts.snapshot(),
+                    "retries": dict(stats.retries),
+                    "giveups": stats.giveups,
+                    "sleep_seconds": stats.sleep_seconds,
+                    "latency": stats.latency.snapshot(),
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def render_prometheus(self, prefix: str = "httpx_backoff") -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def counter(name: str, help_: str, field: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for (host, method), stats in snapshot.items():
+                lines.append(f'{prefix}_{name}{{host="{_escape(host)}",method="{method}"}} {stats[field]}')
+
+        def histogram(name: str, help_: str, field: str) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for (host, method), stats in snapshot.items():
+                labels = f'host="{_escape(host)}",method="{method}"'
+                for bound, count in stats[field]["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{prefix}_{name}_sum{{{labels}}} {stats[field]['sum']}")
+                lines.append(f"{prefix}_{name}_count{{{labels}}} {stats[field]['count']}")
+
+        counter("requests_total", "Finished requests.", "requests")
+        counter("giveups_total", "Requests which gave up.", "giveups")
+        counter("sleep_seconds_total", "Time spent in backoff sleeps.", "sleep_seconds")
+
+        lines.append(f"# HELP {prefix}_retries_total Retries by cause.")
+        lines.append(f"# TYPE {prefix}_retries_total counter")
+        for (host, method), stats in snapshot.items():
+            for cause, count in stats["retries"].items():
+                labels = f'host="{_escape(host)}",method="{method}",cause="{_escape(cause)}"'
+                lines.append(f"{prefix}_retries_total{{{labels}}} {count}")
+
+        histogram("attempts", "Attempts per request.", "attempts")
+        histogram("request_duration_seconds", "End-to-end request latency including backoff.", "latency")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from typing import Callable, Collection, Optional, Sequence, Tuple, Type
+
+from httpx import Response
+from httpx_backoff._typing import _BackoffOption
+
+# status codes are three-digit numbers
+_STATUS_TABLE_SIZE = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class RetryRule:
+    """
+    Kind of failure which is retried with its own schedule and attempt limit
+    """
+
+    #: exception types which are retried
+    exceptions: Tuple[Type[BaseException], ...] = ()
+    #: status codes of responses which are retried, e.g. range(500, 600)
+    statuses: Collection[int] = ()
+    #: function of a response which is retried when it's truthfully, it's checked
+    #: after statuses only for responses which no status rule matched
+    predicate: Optional[Callable[[Response], bool]] = None
+    #: backoff option of the rule, the one of the client by default
+    backoff_option: Optional[_BackoffOption] = None
+    #: the maximum number of attempts which failed with this rule, the limit of the client by default
+    attempts: Optional[int] = None
+
+
+class RetryPolicy:
+    """
+    Ordered retry rules compiled for classification of outcomes.
+
+    Exceptions are caught by one tuple of all types and matched to the first
+    rule by isinstance, statuses are looked up in a table of rule indexes,
+    predicates are only called for responses which no status matched.
+    """
+
+    __slots__ = ("_rules", "_exceptions", "_exception_rules", "_status_rules", "_predicate_rules")
+
+    def __init__(self, rules: Sequence[RetryRule]):
+        if not rules:
+            raise ValueError("at least one rule is required")
+        if len(rules) > 255:
+            raise ValueError("at most 255 rules are supported")
+        for rule in rules:
+            for status in rule.statuses:
+                if not 0 <= status < _STATUS_TABLE_SIZE:
+                    raise ValueError(f"status {status} must be in [0, {_STATUS_TABLE_SIZE - 1}]")
+
+        self._rules = tuple(rules)
+        self._exceptions = tuple({exception: None for rule in self._rules for exception in rule.exceptions})
+        self._exception_rules = tuple(
+            (index, rule.exceptions) for index, rule in enumerate(self._rules) if rule.exceptions
+        )
+        self._predicate_rules = tuple(
+            (index, rule.predicate) for index, rule in enumerate(self._rules) if rule.predicate
+        )
+
+        # rule index + 1 for every status, 0 means no rule; the first rule wins
+        self._status_rules = bytearray(_STATUS_TABLE_SIZE)
+        for index in reversed(range(len(self._rules))):
+            for status in self._rules[index].statuses:
+                self._status_rules[status] = index + 1
+
+    @property
+    def rules(self) -> Tuple[RetryRule, ...]:
+        return self._rules
+
+    @property
+    def exceptions(self) -> Tuple[Type[BaseException], ...]:
+        """
+        All exception types of the rules, for an except clause.
+        """
+        return self._exceptions
+
+    def classify_exception(self, exception: BaseException) -> Optional[int]:
+        """
+        :return: index of the first rule which matches the exception or None.
+        """
+        for index, exceptions in self._exception_rules:
+            if isinstance(exception, exceptions):
+                return index
+        return None
+
+    def classify_response(self, response: Response) -> Optional[int]:
+        """
+        Status rules are matched first, so a rule with the status of the response wins
+        over a predicate rule declared before it; predicates are called in rule order
+        only when no status rule matched.
+
+        :return: index of the matched rule or None if it's a success.
+        """
+        status = response.status_code
+        if 0 <= status < _STATUS_TABLE_SIZE and self._status_rules[status]:
+            return self._status_rules[status] - 1
+
+        for index, predicate in self._predicate_rules:
+            if predicate(response):  # type: ignore[misc]
+                return index
+        return None
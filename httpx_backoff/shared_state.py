@@ -0,0 +1,311 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.circuit_breaker import CircuitBreaker, CircuitState, _Circuit, _CircuitKey
+
+_MAGIC = b"HXBSTATE"
+_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+# the header is padded, so records are aligned to their size
+_HEADER_SIZE = 128
+_KEY = struct.Struct("<Q")
+# 7 floats and 8 unsigned integers after the key
+_FIELDS = struct.Struct("<7d8Q")
+_RECORD_SIZE = _KEY.size + _FIELDS.size
+
+# fcntl locks belong to a process, threads of one process are serialized by these locks
+_PROCESS_LOCKS: Dict[str, threading.Lock] = {}
+_PROCESS_LOCKS_LOCK = threading.Lock()
+
+_Values = List[Union[float, int]]
+
+
+def _process_lock(path: str) -> threading.Lock:
+    with _PROCESS_LOCKS_LOCK:
+        return _PROCESS_LOCKS.setdefault(path, threading.Lock())
+
+
+class SharedState:
+    """
+    State shared by all processes of one machine through a memory-mapped file.
+
+    The file holds a fixed number of fixed-size records addressed by the hash of
+    their names. A record is read without locking and is updated under an `fcntl`
+    lock of its byte range, so concurrent updates from different processes are
+    atomic. The file is created on first use, the processes which open it later
+    take its size from the header. Put it on tmpfs (e.g. /dev/shm) to keep it in memory.
+
+    Open a path once per process: `fcntl` locks of a process are released when any
+    descriptor of the file is closed.
+    """
+
+    __slots__ = ("_path", "_slots", "_fd", "_mmap", "_lock", "_offsets")
+
+    def __init__(self, path: Union[str, os.PathLike], *, slots: int = 1024):
+        """
+        :param path: Path of the file, it's created if it doesn't exist.
+        :param slots: Number of records (hosts and budgets) of a new file.
+        """
+        if slots < 1:
+            raise ValueError("slots must be positive")
+
+        self._path = os.path.realpath(path)
+        self._lock = _process_lock(self._path)
+        self._offsets: Dict[str, int] = {}
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._locked(0, _HEADER_SIZE):
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd, _HEADER_SIZE + slots * _RECORD_SIZE)
+                    os.pwrite(self._fd, _HEADER.pack(_MAGIC, _VERSION, slots), 0)
+                else:
+                    header = os.pread(self._fd, _HEADER.size, 0)
+                    if len(header) < _HEADER.size or _HEADER.unpack(header)[:2] != (_MAGIC, _VERSION):
+                        raise ValueError(f"{self._path} isn't a shared state file")
+                    slots = _HEADER.unpack(header)[2]
+            self._slots = slots
+            self._mmap = mmap.mmap(self._fd, _HEADER_SIZE + slots * _RECORD_SIZE)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def close(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
+
+    @contextmanager
+    def _locked(self, offset: int, length: int = _RECORD_SIZE) -> Iterator[None]:
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, offset)
+
+    def _probe(self, digest: int) -> Iterator[int]:
+        start = digest % self._slots
+        for index in range(self._slots):
+            yield _HEADER_SIZE + (start + index) % self._slots * _RECORD_SIZE
+
+    def _find(self, name: str) -> Optional[int]:
+        """
+        :return: offset of the record or None if there is no record with the name.
+        """
+        offset = self._offsets.get(name)
+        if offset is not None:
+            return offset
+
+        digest = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little") or 1
+        for offset in self._probe(digest):
+            stored = _KEY.unpack_from(self._mmap, offset)[0]
+            if stored == digest:
+                self._offsets[name] = offset
+                return offset
+            if not stored:
+                return None
+        return None
+
+    def _record(self, name: str, default: Sequence[Union[float, int]]) -> int:
+        """
+        :param default: Values of a new record, see `_read`.
+        :return: offset of the record, it's created if it doesn't exist.
+        """
+        offset = self._find(name)
+        if offset is not None:
+            return offset
+
+        digest = int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), "little") or 1
+        # records are inserted under the lock of the header, they are never removed
+        with self._locked(0, _HEADER_SIZE):
+            for offset in self._probe(digest):
+                stored = _KEY.unpack_from(self._mmap, offset)[0]
+                if not stored:
+                    _FIELDS.pack_into(self._mmap, offset + _KEY.size, *default)
+                    # the key is written last, so readers never see a half-written record
+                    _KEY.pack_into(self._mmap, offset, digest)
+                if not stored or stored == digest:
+                    self._offsets[name] = offset
+                    return offset
+        raise RuntimeError(f"Shared state {self._path} is full")
+
+    def _read(self, offset: int) -> _Values:
+        """
+        :return: 7 floats followed by 8 unsigned integers of the record.
+        """
+        return list(_FIELDS.unpack_from(self._mmap, offset + _KEY.size))
+
+    def _write(self, offset: int, values: Sequence[Union[float, int]]) -> None:
+        _FIELDS.pack_into(self._mmap, offset + _KEY.size, *values)
+
+
+class SharedRetryBudget(RetryBudget):
+    """
+    Retry budget shared by all processes which open the same `SharedState`.
+    Budgets with different names are independent.
+    """
+
+    __slots__ = ("_state", "_offset")
+
+    def __init__(self, state: SharedState, *, name: str = "default", ratio: float = 0.1, max_tokens: float = 10.0):
+        """
+        :param state: Shared state of the machine.
+        :param name: Name of the budget, e.g. the name of the upstream.
+        :param ratio: See `RetryBudget`.
+        :param max_tokens: See `RetryBudget`.
+        """
+        super().__init__(ratio=ratio, max_tokens=max_tokens)
+        self._state = state
+        # floats: tokens; integers: deposits, withdrawals, rejections
+        self._offset = state._record(f"budget:{name}", [max_tokens] + [0.0] * 6 + [0] * 8)
+
+    def deposit(self) -> None:
+        with self._state._locked(self._offset):
+            values = self._state._read(self._offset)
+            values[0] = min(self._max_tokens, values[0] + self._ratio)
+            values[7] += 1
+            self._state._write(self._offset, values)
+
+    def try_withdraw(self) -> bool:
+        with self._state._locked(self._offset):
+            values = self._state._read(self._offset)
+            if values[0] < 1:
+                values[9] += 1
+                self._state._write(self._offset, values)
+                return False
+
+            values[0] -= 1
+            values[8] += 1
+            self._state._write(self._offset, values)
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._state._read(self._offset)[0]
+
+    @property
+    def deposits(self) -> int:
+        return int(self._state._read(self._offset)[7])
+
+    @property
+    def withdrawals(self) -> int:
+        return int(self._state._read(self._offset)[8])
+
+    @property
+    def rejections(self) -> int:
+        return int(self._state._read(self._offset)[9])
+
+
+_STATES = tuple(CircuitState)
+
+
+class SharedCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker whose circuits and pauses are shared by all processes which open
+    the same `SharedState`, so a circuit opened by one worker rejects requests of all
+    workers of the machine. The sliding window of `failure_rate` is limited to 64 calls.
+
+    Times are compared across processes, it relies on the system-wide monotonic clock.
+    """
+
+    __slots__ = ("_state",)
+
+    def __init__(
+        self,
+        state: SharedState,
+        *,
+        failure_threshold: Optional[int] = 5,
+        failure_rate: Optional[float] = None,
+        window: int = 20,
+        min_calls: int = 10,
+        recovery_timeout: float = 30.0,
+    ):
+        """
+        :param state: Shared state of the machine.
+        :param failure_threshold: See `CircuitBreaker`.
+        :param failure_rate: See `CircuitBreaker`.
+        :param window: See `CircuitBreaker`, at most 64.
+        :param min_calls: See `CircuitBreaker`.
+        :param recovery_timeout: See `CircuitBreaker`.
+        """
+        if not 0 < window <= 64:
+            raise ValueError("window must be in [1, 64]")
+
+        super().__init__(
+            failure_threshold=failure_threshold,
+            failure_rate=failure_rate,
+            window=window,
+            min_calls=min_calls,
+            recovery_timeout=recovery_timeout,
+        )
+        self._state = state
+
+    @staticmethod
+    def _name(key: _CircuitKey) -> str:
+        return f"circuit:{key[0]}://{key[1]}:{key[2]}"
+
+    def _load(self, values: _Values) -> _Circuit:
+        # floats: opened_at, probe_started_at (NaN is None), paused_until;
+        # integers: state, consecutive_failures, outcomes (the newest is the lowest bit), calls, failures
+        circuit = _Circuit(self._window)
+        circuit.opened_at = values[0]
+        circuit.probe_started_at = None if math.isnan(values[1]) else values[1]
+        circuit.paused_until = values[2]
+        circuit.state = _STATES[int(values[7])]
+        circuit.consecutive_failures = int(values[8])
+        mask, calls = int(values[9]), int(values[10])
+        circuit.outcomes.extend(bool(mask >> bit & 1) for bit in reversed(range(calls)))
+        circuit.failures = int(values[11])
+        return circuit
+
+    @staticmethod
+    def _dump(circuit: _Circuit) -> _Values:
+        mask = 0
+        for failure in circuit.outcomes:
+            mask = mask << 1 | failure
+        probe_started_at = math.nan if circuit.probe_started_at is None else circuit.probe_started_at
+        return [
+            circuit.opened_at,
+            probe_started_at,
+            circuit.paused_until,
+            0.0,
+            0.0,
+            0.0,
+            0.0,
+            _STATES.index(circuit.state),
+            circuit.consecutive_failures,
+            mask,
+            len(circuit.outcomes),
+            circuit.failures,
+            0,
+            0,
+            0,
+        ]
+
+    @contextmanager
+    def _locked(self, key: _CircuitKey) -> Iterator[_Circuit]:
+        offset = self._state._record(self._name(key), self._dump(_Circuit(self._window)))
+        with self._state._locked(offset):
+            circuit = self._load(self._state._read(offset))
+            try:
+                yield circuit
+            finally:
+                # `acquire` moves an open circuit to half-open before it raises
+                self._state._write(offset, self._dump(circuit))
+
+    def _peek(self, key: _CircuitKey) -> Optional[_Circuit]:
+        offset = self._state._find(self._name(key))
+        if offset is None:
+            return None
+        return self._load(self._state._read(offset))
@@ -0,0 +1,217 @@
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from httpx_backoff._common import _init_wait
+from httpx_backoff._typing import _BackoffOption, _Jitterer
+from httpx_backoff.backoff_options.jitter import use_equal_jitter, use_full_jitter
+
+if TYPE_CHECKING:
+    import numpy
+
+# draws the outage durations of the given number of runs from the numpy random generator
+_OutageDistribution = Callable[["numpy.random.Generator", int], Any]
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("The simulation requires numpy, install httpx-backoff[simulation]") from e
+    return numpy
+
+
+@dataclass(frozen=True, slots=True)
+class FailureModel:
+    """
+    Synthetic behaviour of the upstream on a virtual clock which starts with an outage
+    """
+
+    #: seconds the upstream fails every attempt, or a function of the numpy random generator
+    #: and the number of runs which draws a duration for every run
+    outage: Union[float, _OutageDistribution] = 0.0
+    #: probability that an attempt fails after the outage
+    failure_probability: float = 0.0
+    #: seconds an attempt takes
+    latency: float = 0.05
+    #: first attempts of the clients are spread uniformly over these seconds
+    arrival: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+    """
+    Outcome of `simulate`, times are in seconds from the first attempt of a client
+    """
+
+    clients: int
+    #: share of clients which got a successful response
+    success_rate: float
+    #: expected time until a client succeeds or gives up
+    mean_completion: float
+    p50_completion: float
+    p99_completion: float
+    p999_completion: float
+    #: attempts per client, 1.0 means no retries at all
+    amplification: float
+    #: the highest number of attempts per second the upstream receives, averaged over runs
+    peak_rate: float
+
+
+def _schedule(backoff_option: _BackoffOption, attempts: int) -> List[float]:
+    """
+    :return: the delays before the 2nd, 3rd, ... attempts, a generator which stops early shortens it.
+    """
+    wait = _init_wait(backoff_option)
+    delays = []
+    for _ in range(attempts - 1):
+        try:
+            delays.append(float(wait.send(None)))
+        except StopIteration:
+            break
+    return delays
+
+
+def _jitter(jitter: Optional[_Jitterer], value: float, size: int, generator: "numpy.random.Generator") -> Any:
+    np = _numpy()
+    if jitter is None:
+        return np.full(size, value)
+    if jitter is use_full_jitter:
+        return generator.uniform(0, value, size)
+    if jitter is use_equal_jitter:
+        return value / 2 + generator.uniform(0, value / 2, size)
+    # a custom jitter is called for every client, it's much slower
+    return np.fromiter((jitter(value) for _ in range(size)), dtype=float, count=size)
+
+
+def simulate(
+    backoff_option: _BackoffOption,
+    model: FailureModel,
+    *,
+    jitter: Optional[_Jitterer] = use_full_jitter,
+    clients: int = 10_000,
+    runs: int = 1,
+    attempts: int = 5,
+    timeout: Optional[float] = None,
+    resolution: float = 0.1,
+    seed: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Monte Carlo simulation of clients which retry with the given schedule against the failure model.
+
+    Every run has its own outage and `clients` clients, all clients of all runs are
+    simulated at once: the loop goes over attempts, each step handles every client
+    with vectorized numpy operations, so millions of clients take seconds. Delays are
+    taken from the backoff option like the clients take them, except that `Runtime`
+    and `RetryAfter` get None, and a client gives up when its next attempt would
+    start after `timeout`.
+
+    :param backoff_option: Backoff option (or factory) to evaluate.
+    :param model: Behaviour of the upstream.
+    :param jitter: Jitter function, `use_full_jitter` and `use_equal_jitter` are vectorized.
+    :param clients: Number of clients in a run.
+    :param runs: Number of runs, every run draws its own outage duration.
+    :param attempts: The maximum number of attempts of a client.
+    :param timeout: The maximum total time of a client.
+    :param resolution: Width in seconds of the time buckets the peak rate is measured in.
+    :param seed: Seed of the random generator for reproducible results.
+    """
+    if clients < 1 or runs < 1 or attempts < 1:
+        raise ValueError("clients, runs and attempts must be positive")
+
+    np = _numpy()
+    generator = np.random.default_rng(seed)
+    delays = _schedule(backoff_option, attempts)
+    size = clients * runs
+
+    if callable(model.outage):
+        outages = np.asarray(model.outage(generator, runs), dtype=float)
+    else:
+        outages = np.full(runs, float(model.outage))
+    outage_end = np.repeat(outages, clients)
+    run = np.repeat(np.arange(runs), clients)
+
+    start = generator.uniform(0, model.arrival, size) if model.arrival else np.zeros(size)
+    attempt_at = start.copy()
+    finished = np.full(size, np.nan)
+    succeeded = np.zeros(size, dtype=bool)
+    active = np.ones(size, dtype=bool)
+    total_attempts = 0
+
+    # every attempt is counted in a time bucket of its run
+    horizon = model.arrival + sum(delays) + (len(delays) + 1) * model.latency
+    if timeout is not None:
+        horizon = min(horizon, model.arrival + timeout + model.latency)
+    buckets = int(horizon / resolution) + 1
+    counts = np.zeros(runs * buckets, dtype=np.int64)
+
+    for attempt in range(len(delays) + 1):
+        index = np.flatnonzero(active)
+        if not index.size:
+            break
+        now = attempt_at[index]
+        total_attempts += index.size
+        bucket = np.minimum((now / resolution).astype(np.int64), buckets - 1)
+        counts += np.bincount(run[index] * buckets + bucket, minlength=runs * buckets)
+
+        failed = now < outage_end[index]
+        if model.failure_probability:
+            failed |= generator.random(index.size) < model.failure_probability
+        done = now + model.latency
+
+        ok = index[~failed]
+        succeeded[ok] = True
+        finished[ok] = done[~failed]
+
+        retry = index[failed]
+        done = done[failed]
+        if attempt == len(delays):
+            finished[retry] = done
+            break
+
+        following = done + _jitter(jitter, delays[attempt], retry.size, generator)
+        give_up = np.zeros(retry.size, dtype=bool)
+        if timeout is not None:
+            give_up = following - start[retry] >= timeout
+        finished[retry[give_up]] = done[give_up]
+        active[retry[give_up]] = False
+        active[ok] = False
+        attempt_at[retry[~give_up]] = following[~give_up]
+
+    completion = finished - start
+    p50, p99, p999 = np.percentile(completion, [50, 99, 99.9])
+    peak = counts.reshape(runs, buckets).max(axis=1).mean() / resolution
+    return SimulationResult(
+        clients=size,
+        success_rate=float(succeeded.mean()),
+        mean_completion=float(completion.mean()),
+        p50_completion=float(p50),
+        p99_completion=float(p99),
+        p999_completion=float(p999),
+        amplification=total_attempts / size,
+        peak_rate=float(peak),
+    )
+
+
+def compare(
+    strategies: Mapping[str, Tuple[_BackoffOption, Optional[_Jitterer]]],
+    model: FailureModel,
+    **kwargs: Any,
+) -> Dict[str, SimulationResult]:
+    """
+    Simulates every strategy against the same model, pass `seed` to use the same random draws.
+
+    :param strategies: Name to the backoff option (or factory) and jitter,
+        e.g. {"expo": (Expo(max_value=30), use_full_jitter)}.
+    :param kwargs: Keyword arguments of `simulate`.
+    """
+    return {name: simulate(option, model, jitter=jitter, **kwargs) for name, (option, jitter) in strategies.items()}
+
+
+def lognormal_outage(mean: float, sigma: float = 1.0) -> _OutageDistribution:
+    """
+    :return: log-normal distribution of outage durations with the given mean in seconds
+        for `FailureModel.outage`, most outages are short and a few are very long.
+    """
+    mu = math.log(mean) - sigma**2 / 2
+    return lambda generator, runs: generator.lognormal(mu, sigma, runs)
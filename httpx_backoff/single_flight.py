@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Collection, Dict, Optional, Tuple
+
+from httpx import Request, Response
+
+logger = logging.getLogger(__name__)
+
+COALESCED_HEADERS = ("accept", "accept-encoding", "accept-language", "authorization", "cookie")
+
+_Key = Tuple[str, str, Tuple[Optional[str], ...]]
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Optional[Response]]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalescing of identical concurrent requests.
+
+    Requests with the same method, URL (with params) and values of the selected
+    headers which arrive while one of them is in flight wait for it instead of
+    running their own retry loops, every waiter gets the same response object
+    or exception. A waiter which is cancelled leaves the flight, the shared
+    request is cancelled only when no waiters are left.
+    """
+
+    __slots__ = ("_methods", "_headers", "_flights", "_requests", "_coalesced")
+
+    def __init__(self, *, methods: Collection[str] = ("GET", "HEAD"), headers: Collection[str] = COALESCED_HEADERS):
+        """
+        :param methods: Methods which are coalesced, only safe methods make sense.
+        :param headers: Request headers whose values are a part of the key, requests
+            which differ in other headers are coalesced.
+        """
+        self._methods = frozenset(method.upper() for method in methods)
+        self._headers = tuple(header.lower() for header in headers)
+        self._flights: Dict[_Key, _Flight] = {}
+        self._requests = 0
+        self._coalesced = 0
+
+    async def send(self, request: Request, send_fn: Callable[[], Awaitable[Optional[Response]]]) -> Optional[Response]:
+        """
+        Joins the flight of an identical request or starts a new one.
+
+        :param request: The request, it's only used for its method, URL and headers.
+        :param send_fn: Function which sends the request with backoff behavior.
+        """
+        if request.method not in self._methods:
+            return await send_fn()
+
+        key = (request.method, str(request.url), tuple(request.headers.get(header) for header in self._headers))
+        self._requests += 1
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(send_fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            self._coalesced += 1
+            logger.debug("Coalesced %s %s", request.method, request.url)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # the last waiter has gone away, nobody needs the response
+                self._land(key, flight)
+                flight.task.cancel()
+
+    def _land(self, key: _Key, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    @property
+    def requests(self) -> int:
+        """
+        Requests of the coalesced methods.
+        """
+        return self._requests
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Requests which joined a flight of an identical request.
+        """
+        return self._coalesced
@@ -0,0 +1,114 @@
+import io
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Iterator, Optional, Union
+
+from httpx import AsyncByteStream, Request, SyncByteStream
+from httpx._content import AsyncIteratorByteStream, IteratorByteStream
+
+# bytes of a request body kept in memory before the spool moves to a temporary file
+DEFAULT_SPOOL_THRESHOLD = 1024 * 1024
+
+_CHUNK_SIZE = 65_536
+
+
+class SpooledByteStream(SyncByteStream, AsyncByteStream):
+    """
+    Request body which can be sent by every attempt although its source can be read only once.
+
+    The first attempt reads the source (an iterator, an async generator or a file)
+    and copies every chunk to a `SpooledTemporaryFile`, which stays in memory up to
+    the threshold and moves to disk above it. The next attempts replay the spool in
+    chunks and then continue the source where the previous attempt stopped, so an
+    attempt which failed in the middle of the upload is handled too. The upload is
+    never held in memory as a whole, the clients close the spool after the last attempt.
+    """
+
+    __slots__ = ("_stream", "_spool", "_size", "_source", "_async_source", "_exhausted")
+
+    def __init__(
+        self,
+        stream: Union[IteratorByteStream, AsyncIteratorByteStream],
+        *,
+        threshold: int = DEFAULT_SPOOL_THRESHOLD,
+    ):
+        """
+        :param stream: Stream of the request which can be iterated only once.
+        :param threshold: Bytes kept in memory, a bigger body is spooled to a temporary file.
+        """
+        self._stream = stream
+        self._spool = SpooledTemporaryFile(max_size=threshold)
+        self._size = 0
+        # the source where the next attempt continues, one of them is used by a sync or an async client
+        self._source: Optional[Iterator[bytes]] = None
+        self._async_source: Optional[AsyncIterator[bytes]] = None
+        self._exhausted = False
+
+    @property
+    def size(self) -> int:
+        """
+        :return: bytes read from the source so far.
+        """
+        return self._size
+
+    def _replay(self) -> Iterator[bytes]:
+        # the position is kept here, the file is shared with the chunks being appended
+        position = 0
+        while position < self._size:
+            self._spool.seek(position)
+            chunk = self._spool.read(min(_CHUNK_SIZE, self._size - position))
+            position += len(chunk)
+            yield chunk
+
+    def _keep(self, chunk: bytes) -> None:
+        self._spool.seek(0, io.SEEK_END)
+        self._spool.write(chunk)
+        self._size += len(chunk)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._replay()
+        if self._exhausted:
+            return
+
+        if self._source is None:
+            assert isinstance(self._stream, IteratorByteStream)
+            self._source = iter(self._stream)
+        for chunk in self._source:
+            self._keep(chunk)
+            yield chunk
+        self._exhausted = True
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._replay():
+            yield chunk
+        if self._exhausted:
+            return
+
+        if self._async_source is None:
+            assert isinstance(self._stream, AsyncIteratorByteStream)
+            self._async_source = self._stream.__aiter__()
+        async for chunk in self._async_source:
+            self._keep(chunk)
+            yield chunk
+        self._exhausted = True
+
+    def close(self) -> None:
+        self._spool.close()
+
+    async def aclose(self) -> None:
+        self._spool.close()
+
+
+def _spool_request(request: Request, threshold: Optional[int]) -> Optional[SpooledByteStream]:
+    """
+    Replaces a body which can't be read twice with a `SpooledByteStream`. Bytes, forms
+    and JSON are kept by httpx in memory and multipart files are rewound, they are left as is.
+
+    :param threshold: See `SpooledByteStream`, None disables spooling.
+    :return: the spool which the caller closes after the last attempt or None.
+    """
+    if threshold is None or not isinstance(request.stream, (IteratorByteStream, AsyncIteratorByteStream)):
+        return None
+
+    spool = SpooledByteStream(request.stream, threshold=threshold)
+    request.stream = spool
+    return spool
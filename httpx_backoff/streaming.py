@@ -0,0 +1,139 @@
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from httpx import Headers, Response, TransportError, codes
+
+if TYPE_CHECKING:
+    from httpx_backoff.clients.base import CustomClient
+
+logger = logging.getLogger(__name__)
+
+
+def _content_range_start(response: Response) -> Optional[int]:
+    # Content-Range: bytes 100-999/1000
+    value = response.headers.get("content-range", "")
+    unit, _, spec = value.partition(" ")
+    if unit.strip().lower() != "bytes":
+        return None
+    start, _, _ = spec.partition("-")
+    try:
+        return int(start)
+    except ValueError:
+        return None
+
+
+class ResumableResponse:
+    """
+    Streaming response which resumes a broken body with a `Range` request.
+
+    The body is resumed when the request is GET and the first response is 200,
+    advertises `Accept-Ranges: bytes`, has no `Content-Encoding` and has a strong `ETag`
+    or `Last-Modified` validator which is sent in `If-Range`. The caller sees one
+    contiguous iterator of bytes.
+    """
+
+    __slots__ = (
+        "_client",
+        "_url",
+        "_method",
+        "_headers",
+        "_kwargs",
+        "_response",
+        "_max_resumes",
+        "_resumes",
+        "_offset",
+    )
+
+    def __init__(
+        self,
+        client: "CustomClient",
+        response: Response,
+        *,
+        url: Any,
+        method: str,
+        headers: Optional[Dict[str, str]],
+        kwargs: Dict[str, Any],
+        max_resumes: int,
+    ):
+        self._client = client
+        self._response = response
+        self._url = url
+        self._method = method
+        self._headers = headers
+        self._kwargs = kwargs
+        self._max_resumes = max_resumes
+        self._resumes = 0
+        self._offset = 0
+
+    @property
+    def response(self) -> Response:
+        """
+        The current underlying response, it changes after a resume.
+        """
+        return self._response
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> Headers:
+        return self._response.headers
+
+    @property
+    def resumes(self) -> int:
+        return self._resumes
+
+    def _validator(self) -> Optional[str]:
+        headers = self._response.headers
+        if (
+            self._method != "GET"
+            or self._response.status_code != codes.OK
+            or headers.get("accept-ranges", "").lower() != "bytes"
+            or headers.get("content-encoding", "identity").lower() != "identity"
+        ):
+            return None
+
+        etag = headers.get("etag")
+        # If-Range requires a strong validator, a weak ETag doesn't promise identical bytes
+        if etag is not None and not etag.startswith("W/"):
+            return etag
+        return headers.get("last-modified")
+
+    async def aiter_bytes(self) -> AsyncIterator[bytes]:
+        validator = self._validator()
+
+        while True:
+            try:
+                async for chunk in self._response.aiter_bytes():
+                    self._offset += len(chunk)
+                    yield chunk
+                return
+            except TransportError as e:
+                if validator is None or self._resumes >= self._max_resumes:
+                    raise
+
+                logger.debug("Body is broken at %s bytes: %r, resuming", self._offset, e)
+                await self._response.aclose()
+                self._resumes += 1
+
+                headers = dict(self._headers or {})
+                headers["Range"] = f"bytes={self._offset}-"
+                headers["If-Range"] = validator
+                response = await self._client.request(
+                    self._url, method=self._method, headers=headers, stream=True, **self._kwargs
+                )
+                assert response is not None
+
+                if response.status_code != codes.PARTIAL_CONTENT or _content_range_start(response) != self._offset:
+                    # the resource has changed or the server ignored the range
+                    await response.aclose()
+                    raise e
+
+                self._response = response
+
+    async def aread(self) -> bytes:
+        return b"".join([chunk async for chunk in self.aiter_bytes()])
+
+    async def aclose(self) -> None:
+        await self._response.aclose()
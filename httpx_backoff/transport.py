@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from httpx import AsyncBaseTransport, AsyncHTTPTransport, Request, Response, TransportError
+from httpx_backoff._common import _init_wait, _is_not_modified, _retry_wait
+from httpx_backoff._typing import _BackoffGenerator, _BackoffOption, _ExceptionGroup, _Jitterer
+from httpx_backoff.adaptive_timeout import AdaptiveTimeout
+from httpx_backoff.backoff_options.jitter import use_full_jitter
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.circuit_breaker import CircuitBreaker, _circuit_key, _CircuitKey
+from httpx_backoff.deadline import Deadline
+from httpx_backoff.hooks import RetryEvent, _call_hooks, _hooks, _Hooks
+from httpx_backoff.idempotency import IdempotencyPolicy
+from httpx_backoff.limiter import ConcurrencyLimiter
+from httpx_backoff.spooling import DEFAULT_SPOOL_THRESHOLD, _spool_request
+
+logger = logging.getLogger(__name__)
+
+
+class RetryTransport(AsyncBaseTransport):
+    """
+    Transport which retries requests below `AsyncClient`, so `send`, `stream`,
+    event hooks and third-party SDKs get the backoff behaviour as well
+    """
+
+    __slots__ = (
+        "_transport",
+        "_exception",
+        "_predicate",
+        "_backoff_option",
+        "_attempts",
+        "_timeout",
+        "_jitter",
+        "_budget",
+        "_circuit_breaker",
+        "_adaptive_timeout",
+        "_limiter",
+        "_idempotency",
+        "_spool_threshold",
+        "_on_attempt",
+        "_on_backoff",
+        "_on_giveup",
+        "_on_success",
+    )
+
+    def __init__(
+        self,
+        transport: Optional[AsyncBaseTransport] = None,
+        *,
+        backoff_option: _BackoffOption,
+        exception: _ExceptionGroup = (),
+        predicate: Optional[Callable[[Response], bool]] = None,
+        attempts: int = 5,
+        timeout: Optional[float] = None,
+        jitter: Optional[_Jitterer] = use_full_jitter,
+        budget: Optional[RetryBudget] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        adaptive_timeout: Optional[AdaptiveTimeout] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        idempotency: Optional[IdempotencyPolicy] = None,
+        spool_threshold: Optional[int] = DEFAULT_SPOOL_THRESHOLD,
+        on_attempt: _Hooks = None,
+        on_backoff: _Hooks = None,
+        on_giveup: _Hooks = None,
+        on_success: _Hooks = None,
+    ):
+        """
+        Constructor
+        :param transport: Wrapped transport which does the real work. By default
+            a new `AsyncHTTPTransport` (connection pool) is created.
+        :param backoff_option: Your backoff option which influences to retrying behaviour.
+        :param exception: An exception type (or tuple of types) which triggers backoff.
+        :param predicate: A function which triggers backoff when it's truthfully for
+            a response. Only the status line and headers are available to it, the
+            body is not read yet.
+        :param attempts: The maximum number of attempts to make before giving up.
+        :param timeout: The maximum total amount of time to try for before giving up.
+        :param jitter: A function of the value yielded by backoff_option returning
+            the actual time to wait. Jittering may be disabled by passing jitter=None.
+        :param budget: Retry budget which may be shared with other transports and clients.
+        :param circuit_breaker: Circuit breaker which may be shared with other transports and clients.
+        :param adaptive_timeout: Per-host read timeouts of attempts derived from the observed latencies.
+        :param limiter: Adaptive per-host limit of concurrent attempts.
+        :param idempotency: Idempotency policy which decides whether a non-idempotent request
+            may be retried and may add an idempotency key to it.
+        :param spool_threshold: Bytes of a request body which can be read only once (a generator
+            or a file) kept in memory, the rest is spooled to a temporary file, so retries send the
+            whole body again without holding it in memory. None disables spooling.
+        :param on_attempt: Hooks called with `RetryEvent` before every attempt.
+        :param on_backoff: Hooks called before sleeping.
+        :param on_giveup: Hooks called when the request gives up.
+        :param on_success: Hooks called when the request succeeds.
+        """
+        self._transport = transport if transport is not None else AsyncHTTPTransport()
+        self._exception = exception
+        self._predicate = predicate
+        self._backoff_option = backoff_option
+        self._attempts = attempts
+        self._timeout = timeout
+        self._jitter = jitter
+        self._budget = budget
+        self._circuit_breaker = circuit_breaker
+        self._adaptive_timeout = adaptive_timeout
+        self._limiter = limiter
+        self._idempotency = idempotency
+        self._spool_threshold = spool_threshold
+        self._on_attempt = _hooks(on_attempt)
+        self._on_backoff = _hooks(on_backoff)
+        self._on_giveup = _hooks(on_giveup)
+        self._on_success = _hooks(on_success)
+
+    def _is_failure(self, request: Request, response: Response) -> bool:
+        return self._predicate is not None and not _is_not_modified(request, response) and self._predicate(response)
+
+    def _send(self, request: Request) -> Awaitable[Response]:
+        response = self._transport.handle_async_request(request)
+        if self._adaptive_timeout is not None:
+            response = self._adaptive_timeout.track(request, response, lambda result: self._is_failure(request, result))
+        if self._limiter is not None:
+            return self._limiter.send(request, response)
+        return response
+
+    async def handle_async_request(self, request: Request) -> Response:
+        attempts = 0
+        wait = _init_wait(self._backoff_option)
+        circuit_key = _circuit_key(request.url)
+        if self._idempotency is not None:
+            self._idempotency.prepare(request)
+        spool = _spool_request(request, self._spool_threshold)
+        deadline = Deadline(self._timeout)
+        # timeouts of the client, every attempt gets them clamped to the deadline
+        timeouts = dict(request.extensions.get("timeout", {}))
+
+        try:
+            while True:
+                attempts += 1
+                elapsed_time = deadline.elapsed()
+
+                if self._on_attempt:
+                    await _call_hooks(self._on_attempt, RetryEvent(attempts, elapsed_time, request.method, request.url))
+
+                attempt_timeouts = timeouts
+                if self._adaptive_timeout is not None:
+                    attempt_timeouts = self._adaptive_timeout.timeouts(request.url, attempts, timeouts)
+                deadline.apply(request, attempt_timeouts)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.acquire(circuit_key)
+
+                try:
+                    response = await self._send(request)
+                except self._exception as e:  # type: ignore
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_failure(circuit_key)
+
+                    seconds = self._retry_wait(wait, e, attempts, deadline.elapsed(), circuit_key, request)
+                    if seconds is None:
+                        if self._on_giveup:
+                            event = RetryEvent(attempts, deadline.elapsed(), request.method, request.url, exception=e)
+                            await _call_hooks(self._on_giveup, event)
+                        raise e
+
+                    logger.debug("Caught %r, retrying in %s seconds", e, seconds)
+                    if self._on_backoff:
+                        event = RetryEvent(
+                            attempts, deadline.elapsed(), request.method, request.url, seconds, exception=e
+                        )
+                        await _call_hooks(self._on_backoff, event)
+                except TransportError:
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_failure(circuit_key)
+                    raise
+                except BaseException:
+                    # a cancellation or an error which isn't retried says nothing about the host
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.release(circuit_key)
+                    raise
+                else:
+                    if not self._is_failure(request, response):
+                        if self._circuit_breaker is not None:
+                            self._circuit_breaker.record_success(circuit_key)
+                        if self._budget is not None:
+                            self._budget.deposit()
+                        if self._on_success:
+                            event = RetryEvent(
+                                attempts, deadline.elapsed(), request.method, request.url, response=response
+                            )
+                            await _call_hooks(self._on_success, event)
+                        return response
+
+                    if self._circuit_breaker is not None:
+                        self._circuit_breaker.record_failure(circuit_key)
+
+                    seconds = self._retry_wait(wait, response, attempts, deadline.elapsed(), circuit_key, request)
+                    if seconds is None:
+                        if self._on_giveup:
+                            event = RetryEvent(
+                                attempts, deadline.elapsed(), request.method, request.url, response=response
+                            )
+                            await _call_hooks(self._on_giveup, event)
+                        return response
+
+                    # release the connection before sleeping
+                    await response.aclose()
+                    logger.debug("Got %s, retrying in %s seconds", response.status_code, seconds)
+                    if self._on_backoff:
+                        event = RetryEvent(
+                            attempts, deadline.elapsed(), request.method, request.url, seconds, response=response
+                        )
+                        await _call_hooks(self._on_backoff, event)
+
+                await asyncio.sleep(seconds)
+        finally:
+            # the spooled body is deleted as soon as the request is done
+            if spool is not None:
+                spool.close()
+
+    def _retry_wait(
+        self,
+        wait: _BackoffGenerator,
+        send_value: Any,
+        attempts: int,
+        elapsed: float,
+        circuit_key: _CircuitKey,
+        request: Request,
+    ) -> Optional[float]:
+        return _retry_wait(
+            wait,
+            send_value,
+            attempts,
+            elapsed,
+            max_attempts=self._attempts,
+            timeout=self._timeout,
+            jitter=self._jitter,
+            budget=self._budget,
+            circuit_breaker=self._circuit_breaker,
+            circuit_key=circuit_key,
+            retryable=self._idempotency is None or self._idempotency.is_retryable(request, send_value),
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
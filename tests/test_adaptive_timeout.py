@@ -0,0 +1,170 @@
+import asyncio
+import random
+
+import pytest
+from httpx import AsyncClient, MockTransport, ReadTimeout, Response, codes
+from httpx_backoff.adaptive_timeout import AdaptiveTimeout, QuantileSketch
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.transport import RetryTransport
+
+
+class TestQuantileSketch:
+    def test_relative_accuracy(self):
+        generator = random.Random(0)
+        values = [generator.lognormvariate(-3, 1) for _ in range(10_000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_bounded_memory(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=50)
+        for exponent in range(-6, 4):
+            for value in range(1, 100):
+                sketch.add(value * 10.0**exponent)
+
+        assert len(sketch._buckets) <= 50
+        assert sketch.count == 990
+        assert sketch.quantile(1.0) == pytest.approx(99_000, rel=0.02)
+
+    def test_empty_and_zeros(self):
+        sketch = QuantileSketch()
+        assert sketch.quantile(0.5) is None
+
+        sketch.add(0.0)
+        sketch.add(0.0)
+        sketch.add(1.0)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(1.0, rel=0.01)
+
+
+class TestAdaptiveTimeout:
+    def test_timeout(self):
+        adaptive = AdaptiveTimeout(percentile=99, multiplier=2, escalation=2, floor=0.01, ceiling=1, min_samples=10)
+        for _ in range(9):
+            adaptive.observe("example.com", 0.1)
+        assert adaptive.timeout("example.com") is None
+
+        adaptive.observe("example.com", 0.1)
+        assert adaptive.timeout("example.com") == pytest.approx(0.2, rel=0.02)
+        assert adaptive.timeout("example.com", 2) == pytest.approx(0.4, rel=0.02)
+        assert adaptive.timeout("example.com", 5) == 1
+        assert adaptive.timeout("other.com") is None
+
+    def test_floor(self):
+        adaptive = AdaptiveTimeout(floor=0.05, min_samples=1)
+        adaptive.observe("example.com", 0.001)
+
+        assert adaptive.timeout("example.com") == 0.05
+
+    def test_window(self):
+        adaptive = AdaptiveTimeout(percentile=50, multiplier=1, min_samples=10, window=10)
+        for _ in range(20):
+            adaptive.observe("example.com", 1.0)
+        for _ in range(20):
+            adaptive.observe("example.com", 0.1)
+
+        assert adaptive.timeout("example.com") == pytest.approx(0.1, rel=0.02)
+
+    def test_snapshot(self):
+        adaptive = AdaptiveTimeout(min_samples=1, multiplier=1)
+        for latency in (0.1, 0.2, 0.3):
+            adaptive.observe("example.com", latency)
+
+        snapshot = adaptive.snapshot(percentiles=(50, 99.9))
+        assert set(snapshot["example.com"]) == {"p50", "p99.9", "timeout"}
+        assert snapshot["example.com"]["p50"] == pytest.approx(0.2, rel=0.02)
+        assert snapshot["example.com"]["timeout"] == pytest.approx(0.3, rel=0.02)
+
+
+def latency_transport(calls, latencies):
+    async def handler(request):
+        read_timeout = request.extensions["timeout"]["read"]
+        calls.append(read_timeout)
+        latency = latencies.pop(0) if latencies else 0.01
+        if latency > read_timeout:
+            await asyncio.sleep(read_timeout)
+            raise ReadTimeout("timed out", request=request)
+        await asyncio.sleep(latency)
+        return Response(codes.OK)
+
+    return MockTransport(handler)
+
+
+@pytest.mark.asyncio
+class TestAdaptiveTimeoutClients:
+    async def test_slow_attempt_is_retried_early(self):
+        calls = []
+        adaptive = AdaptiveTimeout(multiplier=2, escalation=2, floor=0.01, min_samples=5)
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=latency_transport(calls, [0.01] * 5 + [5.0]), timeout=10),
+            backoff_option=Constant(interval=0),
+            adaptive_timeout=adaptive,
+        ) as client:
+            for _ in range(5):
+                await client.get(url="http://test/")
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.OK
+        assert calls[:5] == [10] * 5
+        # the stuck attempt timed out after about 2 * p99 instead of 10 seconds
+        assert calls[5] < 1
+        assert calls[6] == pytest.approx(calls[5] * 2)
+
+    async def test_transport(self):
+        calls = []
+        adaptive = AdaptiveTimeout(min_samples=2)
+        transport = RetryTransport(
+            latency_transport(calls, []),
+            exception=(ReadTimeout,),
+            backoff_option=Constant(interval=0),
+            adaptive_timeout=adaptive,
+        )
+        async with AsyncClient(transport=transport, timeout=10) as client:
+            for _ in range(3):
+                await client.get("http://test/")
+
+        assert calls[:2] == [10, 10]
+        assert calls[2] < 10
+        assert 0.01 <= adaptive.percentiles("test")[50] < 10
+
+    async def test_timeout_is_observed_as_lower_bound(self):
+        adaptive = AdaptiveTimeout(min_samples=1)
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=latency_transport([], [5.0]), timeout=0.05),
+            backoff_option=Constant(interval=0),
+            adaptive_timeout=adaptive,
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert adaptive.percentiles("test", (100,))[100] >= 0.05 * 0.99
+
+    async def test_rejected_responses_are_not_observed(self):
+        statuses = [codes.SERVICE_UNAVAILABLE, codes.SERVICE_UNAVAILABLE, codes.OK]
+
+        async def handler(request):
+            status = statuses.pop(0)
+            if status == codes.OK:
+                await asyncio.sleep(0.05)
+            return Response(status)
+
+        adaptive = AdaptiveTimeout(min_samples=1)
+        async with PredicateClient(
+            predicate=lambda response: response.status_code == codes.SERVICE_UNAVAILABLE,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            adaptive_timeout=adaptive,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.OK
+        # fast 503s would drag the percentile down
+        assert adaptive.percentiles("test", (0,))[0] >= 0.05 * 0.99
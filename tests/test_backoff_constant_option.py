@@ -9,3 +9,15 @@ class TestBackoffConstantOption:
 
         for i in range(9):
             assert interval == next(constant_gen)
+
+    def test_backoff_constant_clone(self):
+        constant_gen = Constant(interval=3)
+
+        assert 3 == next(constant_gen.clone())
+
+    def test_backoff_constant_schedule(self):
+        constant_gen = Constant(interval=3)
+
+        assert constant_gen.delay(100) == 3
+        assert constant_gen.preview(3) == [3, 3, 3]
+        assert constant_gen.cumulative(10) == 30
@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 from httpx_backoff.backoff_options import Expo
 
@@ -31,3 +33,44 @@ class TestBackoffExpoOption:
 
         for expect in expected:
             assert expect == next(expo_gen)
+
+    def test_expo_clone_starts_over(self):
+        expo_gen = Expo(max_value=8, base=3)
+        for _ in range(5):
+            next(expo_gen)
+
+        clone = expo_gen.clone()
+
+        assert clone is not expo_gen
+        assert [1, 3, 8, 8] == [next(clone) for _ in range(4)]
+
+    @pytest.mark.parametrize(
+        "max_value,base,factor",
+        [(None, 2, 1), (None, 2, 0.1), (16, 2, 1), (100, 3, 2), (10, 1, 3), (0.5, 2, 1)],
+    )
+    def test_delay_matches_sequence(self, max_value, base, factor):
+        expo_gen = Expo(max_value=max_value, base=base, factor=factor)
+        expected = [next(expo_gen) for _ in range(30)]
+        schedule = Expo(max_value=max_value, base=base, factor=factor)
+
+        assert schedule.preview(30) == expected
+        assert [schedule.delay(n) for n in range(30)] == expected
+        assert [schedule.cumulative(n) for n in range(31)] == pytest.approx([sum(expected[:n]) for n in range(31)])
+
+    def test_no_big_integers(self):
+        expo_gen = Expo()
+        for _ in range(5000):
+            value = next(expo_gen)
+
+        assert value == sys.float_info.max
+        assert expo_gen._attempt < 1100
+        assert Expo().delay(10**18) == sys.float_info.max
+        assert Expo().cumulative(10**18) == sys.float_info.max
+
+    def test_worst_case_total_sleep(self):
+        assert Expo(max_value=30).cumulative(10) == 1 + 2 + 4 + 8 + 16 + 30 * 5
+        assert Expo(max_value=30).cumulative(10**12) == 31 + 30 * (10**12 - 5)
+
+    def test_negative_index(self):
+        with pytest.raises(ValueError):
+            Expo().delay(-1)
@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 from httpx_backoff.backoff_options import Fibo
 
@@ -22,3 +24,35 @@ class TestBackoffFiboOption:
 
         for expect in expected:
             assert expect == next(fibo_gen)
+
+    def test_fibo_clone_starts_over(self):
+        fibo_gen = Fibo(max_value=4)
+        for _ in range(5):
+            next(fibo_gen)
+
+        clone = fibo_gen.clone()
+
+        assert clone is not fibo_gen
+        assert [1, 1, 2, 3, 4] == [next(clone) for _ in range(5)]
+
+    @pytest.mark.parametrize("max_value", [None, 8, 9, 100, 0.5])
+    def test_delay_matches_sequence(self, max_value):
+        fibo_gen = Fibo(max_value=max_value)
+        expected = [next(fibo_gen) for _ in range(40)]
+        schedule = Fibo(max_value=max_value)
+
+        assert schedule.preview(40) == expected
+        assert [schedule.delay(n) for n in range(40)] == expected
+        assert [schedule.cumulative(n) for n in range(41)] == [sum(expected[:n]) for n in range(41)]
+
+    def test_no_big_integers(self):
+        fibo_gen = Fibo()
+        for _ in range(3000):
+            value = next(fibo_gen)
+
+        assert value == sys.float_info.max
+        assert Fibo().delay(10**18) == sys.float_info.max
+        assert Fibo().cumulative(10**18) == sys.float_info.max
+
+    def test_worst_case_total_sleep(self):
+        assert Fibo(max_value=10).cumulative(1000) == 1 + 1 + 2 + 3 + 5 + 8 + 10 * 994
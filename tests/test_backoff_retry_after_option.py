@@ -0,0 +1,75 @@
+import time
+from email.utils import formatdate
+
+import pytest
+from httpx import HTTPStatusError, Request, Response, codes
+from httpx_backoff.backoff_options import Constant, Expo, RetryAfter
+
+
+def response(headers=None):
+    return Response(codes.TOO_MANY_REQUESTS, headers=headers, request=Request("GET", "http://test/"))
+
+
+class TestBackoffRetryAfterOption:
+    @pytest.mark.parametrize(
+        "headers,expected",
+        [
+            ({"Retry-After": "7"}, 7),
+            ({"RateLimit-Reset": "3"}, 3),
+            ({"Retry-After": "2", "RateLimit-Reset": "3"}, 2),
+            ({"Retry-After": "-1"}, 0),
+        ],
+    )
+    def test_delta_seconds(self, headers, expected):
+        retry_after = RetryAfter()
+
+        assert expected == retry_after.send(response(headers))
+        assert retry_after.exact
+
+    @pytest.mark.parametrize(
+        "value",
+        ["nan", "inf", "-inf", "1e400", pytest.param("9" * 400, id="overflow"), "0x10", "1_000"],
+    )
+    def test_invalid_delay_falls_back(self, value):
+        retry_after = RetryAfter(Constant(interval=1))
+
+        assert 1 == retry_after.send(response({"Retry-After": value}))
+        assert not retry_after.exact
+
+    def test_http_date(self):
+        retry_after = RetryAfter()
+
+        seconds = retry_after.send(response({"Retry-After": formatdate(time.time() + 30, usegmt=True)}))
+
+        assert 28 <= seconds <= 30
+
+    def test_unix_timestamp(self):
+        retry_after = RetryAfter()
+
+        seconds = retry_after.send(response({"X-RateLimit-Reset": str(int(time.time()) + 10)}))
+
+        assert 8 <= seconds <= 10
+
+    def test_fallback_without_header(self):
+        retry_after = RetryAfter(Expo())
+
+        assert [1, 2, 4] == [retry_after.send(response({"Retry-After": "soon"})) for _ in range(3)]
+        assert not retry_after.exact
+
+    def test_header_from_http_status_error(self):
+        retry_after = RetryAfter(Constant(interval=5))
+        res = response({"Retry-After": "1"})
+
+        assert 1 == retry_after.send(HTTPStatusError("error", request=res.request, response=res))
+        assert 5 == retry_after.send(None)
+
+    def test_max_value(self):
+        retry_after = RetryAfter(max_value=10)
+
+        assert 10 == retry_after.send(response({"Retry-After": "3600"}))
+
+    def test_clone_clones_fallback(self):
+        retry_after = RetryAfter(Expo())
+        retry_after.send(None)
+
+        assert 1 == retry_after.clone().send(None)
@@ -0,0 +1,12 @@
+import pytest
+from benchmarks.suite import CLIENTS, Profile, run
+
+
+@pytest.mark.asyncio
+class TestBenchmarkSuite:
+    async def test_smoke(self):
+        results = await run(CLIENTS, Profile(failure_rate=0.2), requests=20, concurrency=[1, 5], in_flight=5)
+
+        assert {result["client"] for result in results} == set(CLIENTS)
+        assert {result["benchmark"] for result in results} == {"overhead", "throughput", "memory"}
+        assert all(result["failure_rate"] == 0.2 for result in results)
@@ -0,0 +1,201 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.circuit_breaker import CircuitBreaker, CircuitState, _circuit_key
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.exceptions import CircuitOpenError
+
+KEY = ("http", "test", 80)
+
+
+class TestCircuitBreaker:
+    def test_circuit_key(self):
+        assert _circuit_key("http://test/path?q=1") == KEY
+        assert _circuit_key("https://test:8443/") == ("https", "test", 8443)
+
+    def test_opens_on_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+
+        for _ in range(2):
+            breaker.acquire(KEY)
+            breaker.record_failure(KEY)
+        breaker.record_success(KEY)
+        for _ in range(2):
+            breaker.record_failure(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+
+        breaker.record_failure(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.OPEN
+        assert breaker.is_open(KEY)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.acquire(KEY)
+        assert exc_info.value.key == KEY
+
+    def test_opens_on_failure_rate(self):
+        breaker = CircuitBreaker(failure_threshold=None, failure_rate=0.5, window=4, min_calls=4)
+
+        for failure in (True, False, True):
+            breaker.record_failure(KEY) if failure else breaker.record_success(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+
+        breaker.record_failure(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.OPEN
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(KEY)
+        time.sleep(0.06)
+
+        breaker.acquire(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire(KEY)
+
+        breaker.record_success(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+        breaker.acquire(KEY)
+
+    def test_failed_probe_opens_again(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(KEY)
+        time.sleep(0.06)
+        breaker.acquire(KEY)
+
+        breaker.record_failure(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.OPEN
+
+    def test_released_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(KEY)
+        time.sleep(0.06)
+        breaker.acquire(KEY)
+
+        breaker.release(KEY)
+
+        assert breaker.state("http://test/") == CircuitState.HALF_OPEN
+        breaker.acquire(KEY)
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=None)
+
+
+@pytest.mark.asyncio
+class TestCircuitBreakerClients:
+    async def test_exception_client_fails_fast(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise ConnectError("refused", request=request)
+
+        breaker = CircuitBreaker(failure_threshold=2)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            with pytest.raises(ConnectError):
+                await client.get(url="http://test/")
+            with pytest.raises(CircuitOpenError):
+                await client.get(url="http://test/")
+
+        assert len(calls) == 2
+
+    async def test_predicate_client_fails_fast(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return Response(codes.SERVICE_UNAVAILABLE)
+
+        breaker = CircuitBreaker(failure_threshold=3)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            response = await client.get(url="http://test/")
+            assert response.status_code == codes.SERVICE_UNAVAILABLE
+
+            with pytest.raises(CircuitOpenError):
+                await client.get(url="http://test/")
+
+            # other hosts are not affected
+            await client.get(url="http://other/")
+
+        assert len(calls) == 3 + 3
+
+    async def test_success_keeps_circuit_closed(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(lambda _: Response(codes.OK))),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+
+    async def test_retry_after_pauses_host(self):
+        statuses = [codes.TOO_MANY_REQUESTS, codes.OK, codes.OK]
+
+        def handler(request):
+            return Response(statuses.pop(0), headers={"Retry-After": "0.1"})
+
+        breaker = CircuitBreaker()
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            start = time.monotonic()
+            response = asyncio.ensure_future(client.get(url="http://test/"))
+            await asyncio.sleep(0.02)
+
+            # the other requests to the host are rejected while the server asked to wait
+            assert breaker.is_open(KEY)
+            with pytest.raises(CircuitOpenError):
+                await client.get(url="http://test/")
+
+            # the request itself waits for the pause instead of its shorter backoff
+            assert (await response).status_code == codes.OK
+            assert time.monotonic() - start >= 0.1
+
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+
+    @pytest.mark.parametrize("error", [ValueError, asyncio.CancelledError])
+    async def test_probe_is_released_on_unexpected_error(self, error):
+        def handler(request):
+            raise error()
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(KEY)
+        time.sleep(0.06)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            with pytest.raises(error):
+                await client.get(url="http://test/")
+
+        assert breaker.state("http://test/") == CircuitState.HALF_OPEN
+        # the next request may probe right away
+        breaker.acquire(KEY)
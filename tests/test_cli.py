@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from httpx_backoff.cli import _statuses, main
+
+
+def write_specs(path, specs):
+    path.write_text("\n".join(json.dumps(spec) for spec in specs) + "\n\n")
+    return str(path)
+
+
+def run(capsys, *argv):
+    assert main([str(arg) for arg in argv]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+class TestCli:
+    def test_statuses(self):
+        assert _statuses("429,502-504") == [429, 502, 503, 504]
+
+    def test_replay(self, server, tmp_path, capsys):
+        specs = write_specs(
+            tmp_path / "specs.jsonl",
+            [{"url": str(server.url.join("/ping"))}] * 20
+            + [{"url": str(server.url.join("/bad_request")), "method": "post", "json": {"a": 1}}] * 5,
+        )
+
+        report = run(
+            capsys, specs, "--concurrency", 4, "--backoff", "constant", "--interval", 0, "--retry-statuses", "400"
+        )
+
+        assert report["requests"] == 25
+        assert report["statuses"] == {"200": 20, "400": 5}
+        assert report["giveups"] == 5
+        assert report["attempts"] == {"1": 20, "5": 5}
+        assert report["errors"] == {}
+        assert 0 < report["latency"]["p50"] <= report["latency"]["p99.9"]
+        assert report["throughput"] > 0
+
+    def test_open_model_with_workers(self, server, tmp_path, capsys):
+        specs = write_specs(tmp_path / "specs.jsonl", [{"url": str(server.url.join("/ping"))}] * 20)
+
+        report = run(capsys, specs, "--workers", 2, "--rate", 100, "--concurrency", 2)
+
+        assert report["requests"] == 20
+        assert report["statuses"] == {"200": 20}
+        assert report["workers"] == 2
+        # 20 requests at 100 per second take at least 0.19 seconds
+        assert report["duration"] >= 0.19
+        assert report["throughput"] <= 110
+
+    def test_errors(self, tmp_path, capsys):
+        specs = write_specs(tmp_path / "specs.jsonl", [{"url": "http://127.0.0.1:1/"}] * 3)
+
+        report = run(capsys, specs, "--attempts", 2, "--backoff", "constant", "--interval", 0)
+
+        assert report["errors"] == {"ConnectError": 3}
+        assert report["giveups"] == 3
+        assert report["attempts"] == {"2": 3}
+
+    def test_validation(self, tmp_path):
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "specs.jsonl"), "--workers", "0"])
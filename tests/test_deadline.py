@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, MockTransport, ReadTimeout, Request, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.deadline import Deadline
+from httpx_backoff.transport import RetryTransport
+
+
+def timeout_honoring_transport(calls, latency=1.0):
+    """
+    Stand-in of a slow upstream which raises ReadTimeout after the read timeout of the attempt
+    """
+
+    async def handler(request):
+        read_timeout = request.extensions["timeout"]["read"]
+        calls.append(read_timeout)
+        await asyncio.sleep(min(latency, read_timeout))
+        raise ReadTimeout("timed out", request=request)
+
+    return MockTransport(handler)
+
+
+class TestDeadline:
+    def test_without_timeout(self):
+        deadline = Deadline()
+        request = Request("GET", "http://test/", extensions={"timeout": {"read": 5.0}})
+        deadline.apply(request, request.extensions["timeout"])
+
+        assert deadline.remaining() is None
+        assert not deadline.expired()
+        assert request.extensions["timeout"] == {"read": 5.0}
+
+    def test_apply(self):
+        deadline = Deadline(2.0)
+        request = Request("GET", "http://test/")
+        deadline.apply(request, {"connect": 5.0, "read": 1.0, "write": None, "pool": 5.0})
+
+        timeouts = request.extensions["timeout"]
+        assert timeouts["read"] == 1.0
+        assert 1.9 < timeouts["connect"] <= 2.0
+        assert timeouts["write"] == timeouts["pool"] == timeouts["connect"]
+
+    def test_expired(self):
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+
+        assert deadline.expired()
+        assert deadline.remaining() == 0.0
+
+
+@pytest.mark.asyncio
+class TestDeadlineClients:
+    async def test_attempt_is_clamped_to_deadline(self):
+        calls = []
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=timeout_honoring_transport(calls), timeout=5),
+            backoff_option=Constant(interval=0),
+            attempts=10,
+            timeout=0.3,
+        ) as client:
+            start = time.monotonic()
+            with pytest.raises(ReadTimeout):
+                await client.get(url="http://test/")
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 0.45
+        assert len(calls) == 1
+        assert calls[0] <= 0.3
+
+    async def test_attempts_share_deadline(self):
+        calls = []
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=timeout_honoring_transport(calls), timeout=0.1),
+            backoff_option=Constant(interval=0),
+            attempts=10,
+            timeout=0.25,
+        ) as client:
+            with pytest.raises(ReadTimeout):
+                await client.get(url="http://test/")
+
+        assert len(calls) == 3
+        assert calls[:2] == [0.1, 0.1]
+        assert calls[2] < 0.1
+
+    async def test_sleep_beyond_deadline_gives_up(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return Response(codes.SERVICE_UNAVAILABLE)
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=1),
+            jitter=None,
+            timeout=0.5,
+        ) as client:
+            start = time.monotonic()
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.SERVICE_UNAVAILABLE
+        assert len(calls) == 1
+        assert time.monotonic() - start < 0.1
+
+    async def test_transport(self):
+        calls = []
+        transport = RetryTransport(
+            timeout_honoring_transport(calls),
+            exception=(ReadTimeout,),
+            backoff_option=Constant(interval=0),
+            timeout=0.2,
+        )
+        async with AsyncClient(transport=transport, timeout=5) as client:
+            with pytest.raises(ReadTimeout):
+                await client.get("http://test/")
+
+        assert calls == [pytest.approx(0.2, abs=0.01)]
@@ -1,5 +1,5 @@
 import pytest
-from httpx import ReadTimeout, Response, codes
+from httpx import AsyncClient, MockTransport, ReadTimeout, Response, codes
 from httpx_backoff.backoff_options import Constant
 from httpx_backoff.backoff_options.jitter import use_equal_jitter
 from httpx_backoff.clients.on_exception import ExceptionClient
@@ -134,3 +134,24 @@ class TestOnExceptionConstantClient:
                 await client.get(url=server.url.copy_with(path="/slow_response"))
 
         assert client.is_closed()
+
+    async def test_request_is_built_once_and_replayed(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) < 3:
+                raise ReadTimeout("timeout", request=request)
+            return Response(codes.OK)
+
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response = await client.put(url="http://test/items", json={"key": "value"}, params={"q": 1})
+
+            assert response.status_code == codes.OK
+            assert len(requests) == 3
+            assert all(request is requests[0] for request in requests)
+            assert str(requests[0].url) == "http://test/items?q=1"
@@ -134,3 +134,34 @@ class TestOnExceptionExpoClient:
                 await client.get(url=server.url.copy_with(path="/slow_response"))
 
         assert client.is_closed()
+
+    async def test_backoff_option_is_not_shared_between_requests(self, async_client, server):
+        async_client.timeout = 0.2
+        backoff_option = Expo()
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=async_client,
+            backoff_option=backoff_option,
+            attempts=3,
+            jitter=None,
+        ) as client:
+            with pytest.raises(ReadTimeout):
+                await client.get(url=server.url.copy_with(path="/slow_response"))
+
+            assert 1 == next(backoff_option)
+
+        assert client.is_closed()
+
+    async def test_success_request_with_retries_using_factory(self, async_client, server):
+        async_client.timeout = 0.2
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=async_client,
+            backoff_option=lambda: Expo(factor=0.1),
+        ) as client:
+            response: Response = await client.get(url=server.url.copy_with(path="/sometimes_slow_response"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter > 1
+
+        assert client.is_closed()
@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.hedging import HedgePolicy
+from httpx_backoff.limiter import ConcurrencyLimiter
+
+
+def slow_first_transport(calls, slow=0.5):
+    async def handler(request):
+        calls.append(request)
+        number = len(calls)
+        if number == 1:
+            await asyncio.sleep(slow)
+        return Response(codes.OK, json={"attempt": number})
+
+    return MockTransport(handler)
+
+
+class TestHedgePolicy:
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            HedgePolicy()
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=120)
+
+    def test_invalid_burst(self):
+        with pytest.raises(ValueError):
+            HedgePolicy(delay=1.0, max_burst=0.5)
+
+    def test_percentile_delay(self):
+        policy = HedgePolicy(delay=1.0, percentile=50, min_samples=4)
+
+        for latency in (0.1, 0.2, 0.3):
+            policy._observe(latency)
+        assert policy._hedge_delay() == 1.0
+
+        policy._observe(0.4)
+        assert policy._hedge_delay() == 0.3
+
+
+@pytest.mark.asyncio
+class TestHedgePolicyClients:
+    async def test_hedge_wins(self):
+        calls = []
+        hedge = HedgePolicy(delay=0.05, max_ratio=1)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=slow_first_transport(calls)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.json() == {"attempt": 2}
+        assert len(calls) == 2
+        assert (hedge.requests, hedge.hedges, hedge.wins) == (1, 1, 1)
+
+    async def test_fast_attempt_is_not_hedged(self):
+        calls = []
+        hedge = HedgePolicy(delay=0.05, max_ratio=1)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=slow_first_transport(calls, slow=0)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.json() == {"attempt": 1}
+        assert hedge.hedges == 0
+
+    async def test_non_idempotent_method_is_not_hedged(self):
+        calls = []
+        hedge = HedgePolicy(delay=0.05, max_ratio=1)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=slow_first_transport(calls, slow=0.2)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            response = await client.post(url="http://test/", json={})
+
+        assert response.json() == {"attempt": 1}
+        assert (hedge.requests, hedge.hedges) == (0, 0)
+
+    async def test_hedge_ratio_is_capped(self):
+        calls = []
+        hedge = HedgePolicy(delay=0.01, max_ratio=0.5, max_burst=1)
+
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return Response(codes.OK)
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            for _ in range(4):
+                await client.get(url="http://test/")
+
+        assert hedge.requests == 4
+        assert hedge.hedges == 2
+
+    async def test_burst_after_quiet_period_is_capped(self):
+        async def fast():
+            return Response(codes.OK)
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return Response(codes.OK)
+
+        hedge = HedgePolicy(delay=0.01, max_ratio=0.1, max_burst=2)
+        for _ in range(1000):
+            await hedge.send(fast, "GET")
+        await asyncio.gather(*(hedge.send(slow, "GET") for _ in range(20)))
+
+        # the fast requests filled the bucket only up to max_burst
+        assert hedge.requests == 1020
+        assert 1 <= hedge.hedges <= 2 + 20 * 0.1
+
+    async def test_failed_attempt_waits_for_the_other(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                await asyncio.sleep(0.05)
+                raise ConnectError("refused", request=request)
+            await asyncio.sleep(0.1)
+            return Response(codes.OK)
+
+        hedge = HedgePolicy(delay=0.01, max_ratio=1)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=1,
+            hedge=hedge,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.OK
+        assert hedge.wins == 1
+
+    async def test_loser_is_awaited(self):
+        calls, finished = [], []
+
+        async def handler(request):
+            calls.append(request)
+            try:
+                if len(calls) == 1:
+                    await asyncio.sleep(0.5)
+                return Response(codes.OK)
+            finally:
+                finished.append(len(calls))
+
+        hedge = HedgePolicy(delay=0.05, max_ratio=1)
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            await client.get(url="http://test/")
+            # the cancelled original attempt is done before the response is returned
+            assert len(finished) == 2
+
+    async def test_winning_hedge_is_not_observed(self):
+        calls = []
+        hedge = HedgePolicy(delay=0.05, percentile=50, max_ratio=1)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=slow_first_transport(calls)),
+            backoff_option=Constant(interval=0),
+            hedge=hedge,
+        ) as client:
+            await client.get(url="http://test/")
+            await client.get(url="http://test/")
+
+        # only the second request, which wasn't hedged, is observed
+        assert hedge.wins == 1
+        assert hedge._samples == 1
+
+    async def test_hedge_holds_its_own_slot(self):
+        calls = []
+        limiter = ConcurrencyLimiter(initial_limit=1, max_wait=0)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=slow_first_transport(calls)),
+            backoff_option=Constant(interval=0),
+            hedge=HedgePolicy(delay=0.05, max_ratio=1),
+            limiter=limiter,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        # the only slot is taken by the slow attempt, so the hedge is rejected instead of overshooting the limit
+        assert response.json() == {"attempt": 1}
+        assert len(calls) == 1
+        assert limiter.snapshot()["test"]["rejected"] == 1
+        assert limiter.snapshot()["test"]["in_flight"] == 0
@@ -0,0 +1,104 @@
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.hooks import RetryEvent
+from httpx_backoff.transport import RetryTransport
+
+
+def flaky_transport(failures, status=codes.SERVICE_UNAVAILABLE):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return Response(status)
+        return Response(codes.OK)
+
+    return MockTransport(handler)
+
+
+def recorder():
+    events = {"attempt": [], "backoff": [], "giveup": [], "success": []}
+    hooks = {f"on_{name}": events[name].append for name in events}
+    return events, hooks
+
+
+@pytest.mark.asyncio
+class TestHooks:
+    async def test_predicate_client_success_after_retries(self):
+        events, hooks = recorder()
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=flaky_transport(2)),
+            backoff_option=Constant(interval=0),
+            jitter=None,
+            **hooks,
+        ) as client:
+            await client.get(url="http://test/path")
+
+        assert [event.attempt for event in events["attempt"]] == [1, 2, 3]
+        assert [event.status_code for event in events["backoff"]] == [503, 503]
+        assert all(event.wait == 0 for event in events["backoff"])
+        assert events["giveup"] == []
+        (success,) = events["success"]
+        assert success.attempt == 3
+        assert success.method == "GET"
+        assert str(success.url) == "http://test/path"
+
+    async def test_predicate_client_giveup(self):
+        events, hooks = recorder()
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=flaky_transport(5)),
+            backoff_option=Constant(interval=0),
+            attempts=2,
+            **hooks,
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert len(events["backoff"]) == 1
+        (giveup,) = events["giveup"]
+        assert giveup.attempt == 2
+        assert giveup.status_code == codes.SERVICE_UNAVAILABLE
+
+    async def test_exception_client_async_hooks(self):
+        events = []
+
+        async def on_giveup(event: RetryEvent):
+            events.append(event)
+
+        def handler(request):
+            raise ConnectError("refused", request=request)
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=3,
+            on_giveup=[on_giveup],
+        ) as client:
+            with pytest.raises(ConnectError):
+                await client.get(url="http://test/")
+
+        (giveup,) = events
+        assert giveup.attempt == 3
+        assert isinstance(giveup.exception, ConnectError)
+        assert giveup.status_code is None
+
+    async def test_transport_hooks(self):
+        events, hooks = recorder()
+        async with AsyncClient(
+            transport=RetryTransport(
+                flaky_transport(1),
+                predicate=lambda res: res.status_code != codes.OK,
+                backoff_option=Constant(interval=0),
+                **hooks,
+            )
+        ) as client:
+            await client.get("http://test/")
+
+        assert len(events["attempt"]) == 2
+        assert len(events["backoff"]) == 1
+        assert len(events["success"]) == 1
@@ -0,0 +1,212 @@
+import pytest
+from httpx import AsyncClient, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.cache import CacheEntry, HTTPCache, MemoryCacheBackend, SQLiteCacheBackend
+from httpx_backoff.clients.base import CustomClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+
+def caching_transport(calls, headers, *, unavailable=0):
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= unavailable:
+            return Response(codes.SERVICE_UNAVAILABLE)
+        if request.headers.get("if-none-match") == '"v1"':
+            return Response(codes.NOT_MODIFIED, headers={"etag": '"v1"', "x-revalidated": "yes"})
+        return Response(codes.OK, headers={"etag": '"v1"', **headers}, text=f"body of {request.url.path}")
+
+    return MockTransport(handler)
+
+
+def client_with_cache(calls, headers, cache, predicate=None, **kwargs):
+    return PredicateClient(
+        predicate=predicate or (lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR),
+        client=AsyncClient(transport=caching_transport(calls, headers, **kwargs)),
+        backoff_option=Constant(interval=0),
+        cache=cache,
+    )
+
+
+def entry(content: bytes) -> CacheEntry:
+    return CacheEntry(status_code=200, headers=(("etag", '"v1"'),), content=content, stored_at=0.0)
+
+
+@pytest.mark.asyncio
+class TestHTTPCache:
+    async def test_fresh_response_is_served_from_cache(self):
+        calls, cache = [], HTTPCache()
+        async with client_with_cache(calls, {"cache-control": "max-age=60"}, cache) as client:
+            first = await client.get(url="http://test/a")
+            second = await client.get(url="http://test/a")
+            other = await client.get(url="http://test/b")
+
+        assert first.text == second.text == "body of /a"
+        assert other.text == "body of /b"
+        assert len(calls) == 2
+        assert (cache.hits, cache.misses, cache.revalidations) == (1, 2, 0)
+
+    async def test_stale_response_is_revalidated(self):
+        calls, cache = [], HTTPCache()
+        async with client_with_cache(calls, {"cache-control": "max-age=60", "age": "61"}, cache) as client:
+            await client.get(url="http://test/a")
+            response = await client.get(url="http://test/a")
+
+        assert response.status_code == codes.OK
+        assert response.text == "body of /a"
+        assert response.headers["x-revalidated"] == "yes"
+        assert calls[1].headers["if-none-match"] == '"v1"'
+        assert (cache.hits, cache.misses, cache.revalidations) == (0, 1, 1)
+
+    async def test_revalidation_is_not_retried(self):
+        calls, cache = [], HTTPCache()
+        async with client_with_cache(
+            calls,
+            {"cache-control": "max-age=60", "age": "61"},
+            cache,
+            predicate=lambda res: res.status_code != codes.OK,
+        ) as client:
+            await client.get(url="http://test/a")
+            response = await client.get(url="http://test/a")
+
+        assert response.status_code == codes.OK
+        assert response.text == "body of /a"
+        assert len(calls) == 2
+        assert cache.revalidations == 1
+
+    async def test_retried_response_is_cached(self):
+        calls, cache = [], HTTPCache()
+        async with client_with_cache(calls, {"cache-control": "max-age=60"}, cache, unavailable=2) as client:
+            await client.get(url="http://test/a")
+            await client.get(url="http://test/a")
+
+        assert len(calls) == 3
+        assert cache.hits == 1
+
+    @pytest.mark.parametrize(
+        "response_headers, request_headers",
+        [
+            ({"cache-control": "no-store"}, {}),
+            ({"cache-control": "max-age=60"}, {"cache-control": "no-store"}),
+        ],
+    )
+    async def test_no_store(self, response_headers, request_headers):
+        calls = []
+        async with client_with_cache(calls, response_headers, HTTPCache()) as client:
+            await client.get(url="http://test/a", headers=request_headers)
+            await client.get(url="http://test/a", headers=request_headers)
+
+        assert len(calls) == 2
+        assert "if-none-match" not in calls[1].headers
+
+    async def test_vary(self):
+        calls = []
+        async with client_with_cache(calls, {"cache-control": "max-age=60", "vary": "Accept"}, HTTPCache()) as client:
+            await client.get(url="http://test/a", headers={"accept": "application/json"})
+            await client.get(url="http://test/a", headers={"accept": "application/json"})
+            await client.get(url="http://test/a", headers={"accept": "text/html"})
+
+        assert len(calls) == 2
+
+    async def test_variants_are_stored_side_by_side(self):
+        calls, backend = [], MemoryCacheBackend()
+        headers = {"cache-control": "max-age=60", "vary": "Accept-Language"}
+        async with client_with_cache(calls, headers, HTTPCache(backend)) as client:
+            for _ in range(3):
+                for language in ("en", "ru"):
+                    await client.get(url="http://test/a", headers={"accept-language": language})
+
+            assert len(calls) == 2
+            # the index and two variants
+            assert len(backend) == 3
+
+            await client.post(url="http://test/a", json={})
+
+        assert len(backend) == 0
+
+    async def test_unsafe_request_invalidates(self):
+        calls = []
+        async with client_with_cache(calls, {"cache-control": "max-age=60"}, HTTPCache()) as client:
+            await client.get(url="http://test/a")
+            await client.post(url="http://test/a", json={})
+            await client.get(url="http://test/a")
+
+        assert [request.method for request in calls] == ["GET", "POST", "GET"]
+
+    async def test_shared_cache_skips_private(self):
+        calls = []
+        async with client_with_cache(calls, {"cache-control": "private, max-age=60"}, HTTPCache(shared=True)) as client:
+            await client.get(url="http://test/a")
+            await client.get(url="http://test/a")
+
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("kwargs", [{"auth": ("alice", "a")}, {"cookies": {"session": "alice"}}])
+    async def test_credentials_bypass_shared_cache(self, kwargs):
+        calls, cache = [], HTTPCache(shared=True)
+        async with client_with_cache(calls, {"cache-control": "max-age=60"}, cache) as client:
+            await client.get(url="http://test/a", **kwargs)
+            await client.get(url="http://test/a", auth=("bob", "b"))
+            await client.get(url="http://test/a")
+
+        # the anonymous request isn't served the response of alice
+        assert len(calls) == 3
+        assert cache.hits == 0
+
+
+class TestBackends:
+    def test_memory_lru_eviction(self):
+        backend = MemoryCacheBackend(max_bytes=entry(b"x" * 100).size * 2)
+        backend.set("a", entry(b"a" * 100))
+        backend.set("b", entry(b"b" * 100))
+        backend.get("a")
+        backend.set("c", entry(b"c" * 100))
+
+        assert backend.get("b") is None
+        assert backend.get("a").content == b"a" * 100
+        assert len(backend) == 2
+        assert backend.size == entry(b"x" * 100).size * 2
+
+    def test_memory_max_entries(self):
+        backend = MemoryCacheBackend(max_entries=1)
+        backend.set("a", entry(b"a"))
+        backend.set("b", entry(b"b"))
+
+        assert backend.get("a") is None
+        assert len(backend) == 1
+
+    def test_sqlite(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        backend = SQLiteCacheBackend(path, max_bytes=entry(b"x" * 100).size * 2)
+        backend.set("a", entry(b"a" * 100))
+        backend.set("b", entry(b"b" * 100))
+        backend.get("a")
+        backend.set("c", entry(b"c" * 100))
+        backend.close()
+
+        backend = SQLiteCacheBackend(path)
+        assert backend.get("b") is None
+        assert backend.get("a") == entry(b"a" * 100)
+        assert len(backend) == 2
+
+        backend.delete("a")
+        assert backend.get("a") is None
+        backend.close()
+
+
+@pytest.mark.asyncio
+class TestCustomClient:
+    async def test_subclass_without_cache(self):
+        class Client(CustomClient):
+            async def _request(self, url, **kwargs):
+                return Response(codes.OK, text=url)
+
+            def is_closed(self):
+                return False
+
+            async def __aexit__(self, *_):
+                pass
+
+        async with Client() as client:
+            response = await client.get(url="http://test/")
+
+        assert response.text == "http://test/"
@@ -0,0 +1,142 @@
+import pytest
+from httpx import (
+    AsyncClient,
+    Client,
+    ConnectError,
+    MockTransport,
+    ReadTimeout,
+    Request,
+    Response,
+    TransportError,
+    codes,
+)
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.clients.sync_on_exception import SyncExceptionClient
+from httpx_backoff.idempotency import IdempotencyPolicy
+from httpx_backoff.transport import RetryTransport
+
+
+def failing_handler(calls, error):
+    def handler(request):
+        calls.append(request)
+        if len(calls) < 3:
+            raise error("failed", request=request)
+        return Response(codes.OK)
+
+    return handler
+
+
+def exception_client(calls, error, policy):
+    return ExceptionClient(
+        exception=(TransportError,),
+        client=AsyncClient(transport=MockTransport(failing_handler(calls, error))),
+        backoff_option=Constant(interval=0),
+        idempotency=policy,
+    )
+
+
+class TestIdempotencyPolicy:
+    @pytest.mark.parametrize(
+        "method, failure, headers, expected",
+        [
+            ("GET", ReadTimeout("timeout"), {}, True),
+            ("PUT", ReadTimeout("timeout"), {}, True),
+            ("POST", ConnectError("refused"), {}, True),
+            ("POST", ReadTimeout("timeout"), {}, False),
+            ("PATCH", Response(codes.SERVICE_UNAVAILABLE), {}, False),
+            ("POST", ReadTimeout("timeout"), {"Idempotency-Key": "key"}, True),
+        ],
+    )
+    def test_is_retryable(self, method, failure, headers, expected):
+        request = Request(method, "http://test/", headers=headers)
+        assert IdempotencyPolicy().is_retryable(request, failure) is expected
+
+    def test_prepare(self):
+        policy = IdempotencyPolicy(generate_key=True, key_factory=lambda: "generated")
+        post, get, own = (
+            Request("POST", "http://test/"),
+            Request("GET", "http://test/"),
+            Request("POST", "http://test/", headers={"Idempotency-Key": "own"}),
+        )
+        for request in (post, get, own):
+            policy.prepare(request)
+
+        assert post.headers["idempotency-key"] == "generated"
+        assert "idempotency-key" not in get.headers
+        assert own.headers["idempotency-key"] == "own"
+
+
+@pytest.mark.asyncio
+class TestIdempotencyClients:
+    async def test_post_is_not_retried_after_read_failure(self):
+        calls = []
+        async with exception_client(calls, ReadTimeout, IdempotencyPolicy()) as client:
+            with pytest.raises(ReadTimeout):
+                await client.post(url="http://test/orders", json={})
+
+        assert len(calls) == 1
+
+    async def test_post_is_retried_after_connect_failure(self):
+        calls = []
+        async with exception_client(calls, ConnectError, IdempotencyPolicy()) as client:
+            response = await client.post(url="http://test/orders", json={})
+
+        assert response.status_code == codes.OK
+        assert len(calls) == 3
+
+    async def test_generated_key_is_reused(self):
+        calls = []
+        async with exception_client(calls, ReadTimeout, IdempotencyPolicy(generate_key=True)) as client:
+            response = await client.post(url="http://test/orders", json={})
+
+        assert response.status_code == codes.OK
+        assert len({request.headers["idempotency-key"] for request in calls}) == 1
+
+    async def test_predicate_client(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return Response(codes.SERVICE_UNAVAILABLE)
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=3,
+            idempotency=IdempotencyPolicy(),
+        ) as client:
+            await client.patch(url="http://test/orders/1", json={})
+            await client.patch(url="http://test/orders/1", json={}, headers={"Idempotency-Key": "key"})
+
+        assert len(calls) == 4
+
+    async def test_transport(self):
+        calls = []
+        transport = RetryTransport(
+            MockTransport(failing_handler(calls, ReadTimeout)),
+            exception=(TransportError,),
+            backoff_option=Constant(interval=0),
+            idempotency=IdempotencyPolicy(),
+        )
+        async with AsyncClient(transport=transport) as client:
+            with pytest.raises(ReadTimeout):
+                await client.post("http://test/orders")
+
+        assert len(calls) == 1
+
+
+def test_sync_client():
+    calls = []
+    with SyncExceptionClient(
+        exception=(TransportError,),
+        client=Client(transport=MockTransport(failing_handler(calls, ReadTimeout))),
+        backoff_option=Constant(interval=0),
+        idempotency=IdempotencyPolicy(generate_key=True),
+    ) as client:
+        response = client.post(url="http://test/orders", json={})
+
+    assert response.status_code == codes.OK
+    assert len(calls) == 3
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport, ReadTimeout, Request, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.exceptions import ConcurrencyLimitError
+from httpx_backoff.limiter import ConcurrencyLimiter
+from httpx_backoff.transport import RetryTransport
+
+
+def counting_transport(stats, latency=0.02, status=codes.OK):
+    async def handler(request):
+        stats["in_flight"] += 1
+        stats["peak"] = max(stats["peak"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        return Response(status)
+
+    return MockTransport(handler)
+
+
+async def respond(status=codes.OK, latency=0.0):
+    await asyncio.sleep(latency)
+    return Response(status)
+
+
+async def time_out(request):
+    raise ReadTimeout("timed out", request=request)
+
+
+@pytest.mark.asyncio
+class TestConcurrencyLimiter:
+    async def test_limits_concurrency(self):
+        stats = {"in_flight": 0, "peak": 0}
+        limiter = ConcurrencyLimiter(initial_limit=3, max_limit=3, max_wait=5)
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=counting_transport(stats)),
+            backoff_option=Constant(interval=0),
+            limiter=limiter,
+        ) as client:
+            responses = await asyncio.gather(*(client.get(url="http://test/") for _ in range(10)))
+
+        assert all(response.status_code == codes.OK for response in responses)
+        assert stats["peak"] == 3
+        assert limiter.snapshot()["test"]["accepted"] == 10
+        assert limiter.snapshot()["test"]["in_flight"] == 0
+
+    async def test_fails_fast_beyond_wait(self):
+        limiter = ConcurrencyLimiter(initial_limit=1, max_wait=0.05)
+        request = Request("GET", "http://test/")
+        slow = asyncio.ensure_future(limiter.send(request, respond(latency=0.3)))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ConcurrencyLimitError) as info:
+            await limiter.send(request, respond())
+        assert info.value.host == "test"
+        assert info.value.limit == 1
+        assert info.value.waited >= 0.05
+
+        await slow
+        assert limiter.snapshot()["test"]["rejected"] == 1
+
+    async def test_bounded_queue(self):
+        limiter = ConcurrencyLimiter(initial_limit=1, max_wait=5, max_queue=1)
+        request = Request("GET", "http://test/")
+        first = asyncio.ensure_future(limiter.send(request, respond(latency=0.05)))
+        second = asyncio.ensure_future(limiter.send(request, respond()))
+        await asyncio.sleep(0)
+
+        assert limiter.snapshot()["test"]["queued"] == 1
+        with pytest.raises(ConcurrencyLimitError):
+            await limiter.send(request, respond())
+        assert (await first).status_code == (await second).status_code == codes.OK
+
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = ConcurrencyLimiter(initial_limit=1, max_wait=5)
+        request = Request("GET", "http://test/")
+        first = asyncio.ensure_future(limiter.send(request, respond(latency=0.05)))
+        second = asyncio.ensure_future(limiter.send(request, respond()))
+        await asyncio.sleep(0)
+        second.cancel()
+
+        await first
+        assert (await limiter.send(request, respond())).status_code == codes.OK
+        snapshot = limiter.snapshot()["test"]
+        assert snapshot["in_flight"] == snapshot["queued"] == 0
+
+    async def test_multiplicative_decrease(self):
+        limiter = ConcurrencyLimiter(initial_limit=20, decrease=0.5)
+        request = Request("GET", "http://test/")
+        await limiter.send(request, respond(codes.TOO_MANY_REQUESTS))
+        assert limiter.limit("test") == 10
+
+        with pytest.raises(ReadTimeout):
+            await limiter.send(request, time_out(request))
+        assert limiter.limit("test") == 5
+        assert limiter.snapshot()["test"]["overloads"] == 2
+
+    async def test_additive_increase(self):
+        limiter = ConcurrencyLimiter(initial_limit=4, increase=1)
+        request = Request("GET", "http://test/")
+        for _ in range(5):
+            await asyncio.gather(*(limiter.send(request, respond(latency=0.01)) for _ in range(4)))
+
+        grown = limiter.limit("test")
+        assert 4 < grown < 8
+        # an idle host doesn't raise its limit
+        for _ in range(20):
+            await limiter.send(request, respond())
+        assert limiter.limit("test") == grown
+
+    async def test_gradient_shrinks_on_latency(self):
+        limiter = ConcurrencyLimiter(algorithm="gradient", initial_limit=10, max_limit=100)
+        request = Request("GET", "http://test/")
+        for _ in range(5):
+            await asyncio.gather(*(limiter.send(request, respond(latency=0.01)) for _ in range(10)))
+        grown = limiter.limit("test")
+        assert grown > 10
+
+        for _ in range(5):
+            await asyncio.gather(*(limiter.send(request, respond(latency=0.1)) for _ in range(grown)))
+        assert limiter.limit("test") < grown
+
+    async def test_validation(self):
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(initial_limit=0)
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(decrease=1)
+        with pytest.raises(ValueError):
+            ConcurrencyLimiter(algorithm="unknown")
+
+
+@pytest.mark.asyncio
+class TestConcurrencyLimiterClients:
+    async def test_overload_retries_shrink_limit(self):
+        stats = {"in_flight": 0, "peak": 0}
+        limiter = ConcurrencyLimiter(initial_limit=8, decrease=0.5)
+        async with PredicateClient(
+            predicate=lambda response: response.status_code == codes.SERVICE_UNAVAILABLE,
+            client=AsyncClient(transport=counting_transport(stats, status=codes.SERVICE_UNAVAILABLE)),
+            backoff_option=Constant(interval=0),
+            attempts=3,
+            limiter=limiter,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.SERVICE_UNAVAILABLE
+        assert limiter.limit("test") == 1
+        assert limiter.snapshot()["test"]["overloads"] == 3
+
+    async def test_transport(self):
+        stats = {"in_flight": 0, "peak": 0}
+        limiter = ConcurrencyLimiter(initial_limit=2, max_limit=2, max_wait=5)
+        transport = RetryTransport(
+            counting_transport(stats),
+            exception=(ReadTimeout,),
+            backoff_option=Constant(interval=0),
+            limiter=limiter,
+        )
+        async with AsyncClient(transport=transport) as client:
+            await asyncio.gather(*(client.get("http://test/") for _ in range(6)))
+
+        assert stats["peak"] == 2
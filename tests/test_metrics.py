@@ -0,0 +1,91 @@
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.metrics import Histogram, RetryMetrics
+
+
+class TestHistogram:
+    def test_observe(self):
+        histogram = Histogram([1, 0.1])
+
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        assert histogram.snapshot() == {
+            "buckets": {0.1: 2, 1: 3, float("inf"): 4},
+            "sum": 3.65,
+            "count": 4,
+        }
+
+
+@pytest.mark.asyncio
+class TestRetryMetrics:
+    async def test_collects_per_host_and_method(self):
+        metrics = RetryMetrics()
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) % 3:
+                return Response(codes.SERVICE_UNAVAILABLE)
+            return Response(codes.OK)
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            jitter=None,
+            **metrics.hooks(),
+        ) as client:
+            await client.get(url="http://first/")
+            await client.post(url="http://second/")
+
+        snapshot = metrics.snapshot()
+        first = snapshot[("first", "GET")]
+        assert first["requests"] == 1
+        assert first["retries"] == {"503": 2}
+        assert first["giveups"] == 0
+        assert first["attempts"]["sum"] == 3
+        assert first["latency"]["count"] == 1
+        assert snapshot[("second", "POST")]["requests"] == 1
+
+    async def test_giveups_by_exception(self):
+        metrics = RetryMetrics()
+
+        def handler(request):
+            raise ConnectError("refused", request=request)
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=2,
+            **metrics.hooks(),
+        ) as client:
+            with pytest.raises(ConnectError):
+                await client.get(url="http://test/")
+
+        stats = metrics.snapshot()[("test", "GET")]
+        assert stats["giveups"] == 1
+        assert stats["retries"] == {"ConnectError": 1}
+
+    async def test_render_prometheus(self):
+        metrics = RetryMetrics(latency_buckets=(1.0,), attempts_buckets=(1, 2))
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(lambda _: Response(codes.OK))),
+            backoff_option=Constant(interval=0),
+            **metrics.hooks(),
+        ) as client:
+            await client.get(url="http://test/")
+
+        text = metrics.render_prometheus()
+
+        assert "# TYPE httpx_backoff_requests_total counter" in text
+        assert 'httpx_backoff_requests_total{host="test",method="GET"} 1' in text
+        assert 'httpx_backoff_attempts_bucket{host="test",method="GET",le="1.0"} 1' in text
+        assert 'httpx_backoff_request_duration_seconds_bucket{host="test",method="GET",le="+Inf"} 1' in text
+        assert text.endswith("\n")
@@ -0,0 +1,107 @@
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, ReadTimeout, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_policy import PolicyClient
+from httpx_backoff.policy import RetryPolicy, RetryRule
+
+
+def scripted_transport(calls, outcomes):
+    def handler(request):
+        calls.append(request)
+        outcome = outcomes[min(len(calls), len(outcomes)) - 1]
+        if isinstance(outcome, type):
+            raise outcome("failed", request=request)
+        return Response(outcome)
+
+    return MockTransport(handler)
+
+
+def policy_client(calls, outcomes, rules, **kwargs):
+    return PolicyClient(
+        rules,
+        client=AsyncClient(transport=scripted_transport(calls, outcomes)),
+        backoff_option=Constant(interval=0),
+        **kwargs,
+    )
+
+
+RULES = (
+    RetryRule(exceptions=(ConnectError,), attempts=3),
+    RetryRule(statuses=range(500, 600)),
+    RetryRule(predicate=lambda response: response.status_code == codes.TOO_MANY_REQUESTS),
+)
+
+
+class TestRetryPolicy:
+    def test_classify(self):
+        policy = RetryPolicy(RULES + (RetryRule(statuses=(503, 404)),))
+
+        assert policy.exceptions == (ConnectError,)
+        assert policy.classify_exception(ConnectError("refused")) == 0
+        assert policy.classify_response(Response(codes.SERVICE_UNAVAILABLE)) == 1
+        assert policy.classify_response(Response(codes.NOT_FOUND)) == 3
+        assert policy.classify_response(Response(codes.TOO_MANY_REQUESTS)) == 2
+        assert policy.classify_response(Response(codes.OK)) is None
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(())
+
+    @pytest.mark.parametrize("status", [-1, 1000, 5030])
+    def test_invalid_status(self, status):
+        with pytest.raises(ValueError, match=str(status)):
+            RetryPolicy([RetryRule(statuses=[503, status])])
+
+
+@pytest.mark.asyncio
+class TestPolicyClient:
+    async def test_mixed_failures_share_attempts(self):
+        calls = []
+        outcomes = [ConnectError, codes.BAD_GATEWAY, codes.TOO_MANY_REQUESTS, ConnectError, codes.OK]
+        async with policy_client(calls, outcomes, RULES) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.OK
+        assert len(calls) == 5
+
+    async def test_shared_attempt_limit(self):
+        calls = []
+        outcomes = [ConnectError, codes.BAD_GATEWAY, codes.TOO_MANY_REQUESTS, codes.OK]
+        async with policy_client(calls, outcomes, RULES, attempts=3) as client:
+            response = await client.get(url="http://test/")
+
+        assert response.status_code == codes.TOO_MANY_REQUESTS
+        assert len(calls) == 3
+
+    async def test_rule_attempt_limit(self):
+        calls = []
+        async with policy_client(calls, [ConnectError], RULES, attempts=10) as client:
+            with pytest.raises(ConnectError):
+                await client.get(url="http://test/")
+
+        assert len(calls) == 3
+
+    async def test_unmatched_exception_is_raised(self):
+        calls = []
+        async with policy_client(calls, [ReadTimeout], RULES) as client:
+            with pytest.raises(ReadTimeout):
+                await client.get(url="http://test/")
+
+        assert len(calls) == 1
+
+    async def test_rule_schedule(self):
+        waits = []
+        rules = (
+            RetryRule(statuses=(codes.SERVICE_UNAVAILABLE,), backoff_option=Constant(interval=0.01)),
+            RetryRule(statuses=(codes.BAD_GATEWAY,)),
+        )
+        async with policy_client(
+            [],
+            [codes.SERVICE_UNAVAILABLE, codes.BAD_GATEWAY, codes.OK],
+            rules,
+            jitter=None,
+            on_backoff=lambda event: waits.append((event.status_code, event.wait)),
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert waits == [(codes.SERVICE_UNAVAILABLE, 0.01), (codes.BAD_GATEWAY, 0)]
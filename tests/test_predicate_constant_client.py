@@ -1,5 +1,5 @@
 import pytest
-from httpx import Response, codes
+from httpx import AsyncClient, MockTransport, Response, codes
 from httpx_backoff.backoff_options import Constant
 from httpx_backoff.backoff_options.jitter import use_equal_jitter
 from httpx_backoff.clients.on_predicate import PredicateClient
@@ -117,3 +117,22 @@ class TestPredicateConstantClient:
             assert server.config.app.counter == attempts
 
         assert client.is_closed()
+
+    async def test_request_is_built_once_and_replayed(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return Response(codes.BAD_REQUEST if len(requests) < 3 else codes.OK)
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response = await client.post(url="http://test/items", json={"key": "value"}, follow_redirects=True)
+
+            assert response.status_code == codes.OK
+            assert len(requests) == 3
+            assert all(request is requests[0] for request in requests)
+            assert requests[0].content == b'{"key": "value"}'
@@ -117,3 +117,20 @@ class TestPredicateExpoClient:
             assert server.config.app.counter == attempts
 
         assert client.is_closed()
+
+    async def test_backoff_option_is_not_shared_between_requests(self, async_client, server):
+        backoff_option = Expo(factor=0.1)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=async_client,
+            backoff_option=backoff_option,
+            attempts=3,
+            jitter=None,
+        ) as client:
+            response = await client.get(url=server.url.copy_with(path="/bad_request"))
+
+            assert response.status_code == codes.BAD_REQUEST
+            assert server.config.app.counter == 3
+            assert 0.1 == next(backoff_option)
+
+        assert client.is_closed()
@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant, Expo, RetryAfter
+from httpx_backoff.backoff_options.jitter import use_full_jitter
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+
+@pytest.mark.asyncio
+class TestPredicateRetryAfterClient:
+    async def test_retry_after_is_not_jittered(self):
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) < 2:
+                return Response(codes.TOO_MANY_REQUESTS, headers={"Retry-After": "0.3"})
+            return Response(codes.OK)
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=RetryAfter(Expo(factor=10)),
+            jitter=use_full_jitter,
+        ) as client:
+            response = await client.get(url="http://test/")
+
+            assert response.status_code == codes.OK
+            assert calls[1] - calls[0] >= 0.3
+
+    async def test_retry_after_beyond_timeout_gives_up(self):
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            return Response(codes.SERVICE_UNAVAILABLE, headers={"Retry-After": "120"})
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=RetryAfter(),
+            timeout=0.2,
+        ) as client:
+            start = time.monotonic()
+            response = await client.get(url="http://test/")
+
+            # sleeping until the deadline would leave no time for the next attempt
+            assert response.status_code == codes.SERVICE_UNAVAILABLE
+            assert len(calls) == 1
+            assert time.monotonic() - start < 0.1
+
+    @pytest.mark.parametrize("value", ["nan", "inf"])
+    async def test_non_finite_retry_after_does_not_hang(self, value):
+        def handler(request):
+            return Response(codes.SERVICE_UNAVAILABLE, headers={"Retry-After": value})
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=RetryAfter(Constant(interval=0)),
+            attempts=3,
+            timeout=0.5,
+        ) as client:
+            response = await asyncio.wait_for(client.get(url="http://test/"), 1)
+
+        assert response.status_code == codes.SERVICE_UNAVAILABLE
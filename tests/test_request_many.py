@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+
+def tracking_transport(state, delay=0.0, delays=None):
+    async def handler(request):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep((delays or {}).get(request.url.path, delay))
+            if request.url.path == "/fail":
+                raise ConnectError("refused", request=request)
+            return Response(codes.OK, text=request.url.path)
+        finally:
+            state["in_flight"] -= 1
+
+    return MockTransport(handler)
+
+
+@pytest.mark.asyncio
+class TestRequestMany:
+    async def test_bounded_concurrency(self):
+        state = {"in_flight": 0, "max_in_flight": 0}
+        consumed = []
+
+        def specs():
+            for number in range(30):
+                consumed.append(number)
+                yield {"url": f"http://test/{number}"}
+
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=tracking_transport(state, delay=0.01)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            results = []
+            async for result in client.request_many(specs(), concurrency=4):
+                # the input is consumed lazily
+                assert len(consumed) <= len(results) + 1 + 4
+                results.append(result)
+
+        assert state["max_in_flight"] == 4
+        assert sorted(result.index for result in results) == list(range(30))
+        assert all(result.response.text == f"/{result.index}" for result in results)
+
+    async def test_async_iterable_and_failures(self):
+        state = {"in_flight": 0, "max_in_flight": 0}
+
+        async def specs():
+            for path in ("/a", "/fail", "/b"):
+                yield {"url": f"http://test{path}"}
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=tracking_transport(state)),
+            backoff_option=Constant(interval=0),
+            attempts=2,
+        ) as client:
+            results = {result.index: result async for result in client.request_many(specs())}
+
+        assert isinstance(results[1].exception, ConnectError)
+        assert results[1].response is None
+        assert results[0].response.text == "/a"
+        assert results[2].spec == {"url": "http://test/b"}
+
+    async def test_cancel_on_error(self):
+        state = {"in_flight": 0, "max_in_flight": 0}
+        specs = [{"url": "http://test/fail"}] + [{"url": f"http://test/{number}"} for number in range(10)]
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=tracking_transport(state, delay=0.5, delays={"/fail": 0.01})),
+            backoff_option=Constant(interval=0),
+            attempts=1,
+        ) as client:
+            with pytest.raises(ConnectError):
+                async for _ in client.request_many(specs, concurrency=2, cancel_on_error=True):
+                    pass
+
+            # the cancelled request is finished when the error is raised
+            assert state["in_flight"] == 0
+
+    async def test_early_break(self):
+        state = {"in_flight": 0, "max_in_flight": 0}
+        specs = [{"url": f"http://test/{number}"} for number in range(10)]
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=tracking_transport(state, delay=0.5, delays={"/0": 0.01})),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            results = client.request_many(specs, concurrency=3)
+            async for _ in results:
+                break
+            await results.aclose()
+
+            assert state["in_flight"] == 0
+
+    async def test_deadline(self):
+        state = {"in_flight": 0, "max_in_flight": 0}
+        specs = [{"url": f"http://test/{number}"} for number in range(10)]
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=tracking_transport(state, delay=0.05)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            results = []
+            with pytest.raises(asyncio.TimeoutError):
+                async for result in client.request_many(specs, concurrency=2, timeout=0.12):
+                    results.append(result)
+
+        await asyncio.sleep(0)
+        assert 2 <= len(results) < 10
+        assert state["in_flight"] == 0
@@ -0,0 +1,128 @@
+import pytest
+from httpx import AsyncClient, MockTransport, ReadTimeout, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+
+class OneDelay(Constant):
+    """
+    Schedule which allows a single retry.
+    """
+
+    def __init__(self, interval=0):
+        super().__init__(interval)
+        self.sent = 0
+
+    def send(self, value):
+        self.sent += 1
+        if self.sent > 1:
+            raise StopIteration
+        return super().send(value)
+
+
+class TestRetryBudget:
+    def test_withdraw_until_exhausted(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+
+        assert budget.try_withdraw()
+        assert budget.try_withdraw()
+        assert not budget.try_withdraw()
+        assert budget.withdrawals == 2
+        assert budget.rejections == 1
+
+    def test_deposit_refills_up_to_max_tokens(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+        budget.try_withdraw()
+        budget.try_withdraw()
+
+        budget.deposit()
+        assert not budget.try_withdraw()
+
+        for _ in range(10):
+            budget.deposit()
+
+        assert budget.tokens == 2
+        assert budget.deposits == 11
+
+    @pytest.mark.parametrize("kwargs", [{"ratio": -1}, {"max_tokens": 0.5}])
+    def test_invalid_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            RetryBudget(**kwargs)
+
+
+@pytest.mark.asyncio
+class TestRetryBudgetClients:
+    async def test_budget_is_shared_between_clients(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return Response(codes.SERVICE_UNAVAILABLE)
+
+        budget = RetryBudget(ratio=0.1, max_tokens=3)
+        clients = [
+            PredicateClient(
+                predicate=lambda res: res.status_code != codes.OK,
+                client=AsyncClient(transport=MockTransport(handler)),
+                backoff_option=Constant(interval=0),
+                budget=budget,
+            )
+            for _ in range(2)
+        ]
+
+        for client in clients:
+            response = await client.get(url="http://test/")
+            assert response.status_code == codes.SERVICE_UNAVAILABLE
+
+        # 2 first attempts and only 3 retries allowed by the budget
+        assert len(calls) == 5
+        assert budget.rejections == 2
+
+    async def test_exception_client_gives_up_when_budget_is_exhausted(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise ReadTimeout("timeout", request=request)
+
+        budget = RetryBudget(max_tokens=1)
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            budget=budget,
+        ) as client:
+            with pytest.raises(ReadTimeout):
+                await client.get(url="http://test/")
+
+        assert len(calls) == 2
+
+    async def test_success_deposits(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=1)
+        budget.try_withdraw()
+
+        async with ExceptionClient(
+            exception=(ReadTimeout,),
+            client=AsyncClient(transport=MockTransport(lambda _: Response(codes.OK))),
+            backoff_option=Constant(interval=0),
+            budget=budget,
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert budget.deposits == 1
+        assert budget.tokens == 0.5
+
+    async def test_no_withdrawal_when_schedule_stops(self):
+        budget = RetryBudget(max_tokens=5)
+        async with PredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=AsyncClient(transport=MockTransport(lambda _: Response(codes.SERVICE_UNAVAILABLE))),
+            backoff_option=lambda: OneDelay(interval=0),
+            budget=budget,
+        ) as client:
+            await client.get(url="http://test/")
+
+        assert budget.withdrawals == 1
+        assert budget.tokens == 4
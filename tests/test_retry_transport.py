@@ -0,0 +1,83 @@
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.transport import RetryTransport
+
+
+@pytest.mark.asyncio
+class TestRetryTransport:
+    async def test_success_request_without_retries(self, server):
+        async with AsyncClient(
+            transport=RetryTransport(
+                predicate=lambda res: res.status_code != codes.OK,
+                backoff_option=Constant(interval=0),
+            )
+        ) as client:
+            response = await client.get(server.url.copy_with(path="/ping"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter == 1
+
+    async def test_stream_is_retried_on_predicate(self, server):
+        async with AsyncClient(
+            transport=RetryTransport(
+                predicate=lambda res: res.status_code != codes.OK,
+                backoff_option=Constant(interval=0),
+            )
+        ) as client:
+            async with client.stream("GET", server.url.copy_with(path="/sometimes_error")) as response:
+                body = await response.aread()
+
+            assert response.status_code == codes.OK
+            assert body == b"body"
+            assert server.config.app.counter == 3
+
+    @pytest.mark.parametrize("attempts", [1, 2, 4])
+    async def test_failed_request_by_attempts(self, server, attempts):
+        async with AsyncClient(
+            transport=RetryTransport(
+                predicate=lambda res: res.status_code != codes.OK,
+                backoff_option=Constant(interval=0),
+                attempts=attempts,
+            )
+        ) as client:
+            response = await client.get(server.url.copy_with(path="/bad_request"))
+
+            assert response.status_code == codes.BAD_REQUEST
+            assert server.config.app.counter == attempts
+
+    async def test_retry_on_exception(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                raise ConnectError("refused", request=request)
+            return Response(codes.OK, json={"calls": len(calls)})
+
+        async with AsyncClient(
+            transport=RetryTransport(
+                MockTransport(handler),
+                exception=(ConnectError,),
+                backoff_option=Constant(interval=0),
+            )
+        ) as client:
+            response = await client.post("http://test/items", json={"key": "value"})
+
+            assert response.json() == {"calls": 3}
+            assert all(request.content == b'{"key": "value"}' for request in calls)
+
+    async def test_failed_request_by_exception(self):
+        def handler(request):
+            raise ConnectError("refused", request=request)
+
+        async with AsyncClient(
+            transport=RetryTransport(
+                MockTransport(handler),
+                exception=(ConnectError,),
+                backoff_option=Constant(interval=0),
+                attempts=2,
+            )
+        ) as client:
+            with pytest.raises(ConnectError):
+                await client.get("http://test/items")
@@ -0,0 +1,175 @@
+import multiprocessing
+import time
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.circuit_breaker import CircuitState
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.exceptions import CircuitOpenError
+from httpx_backoff.shared_state import SharedCircuitBreaker, SharedRetryBudget, SharedState
+
+KEY = ("http", "test", 80)
+
+
+def withdraw_all(path, results):
+    state = SharedState(path)
+    budget = SharedRetryBudget(state, ratio=0, max_tokens=10)
+    results.put(sum(budget.try_withdraw() for _ in range(10)))
+    state.close()
+
+
+def open_circuit(path):
+    state = SharedState(path)
+    breaker = SharedCircuitBreaker(state, failure_threshold=1)
+    breaker.record_failure(KEY)
+    state.close()
+
+
+class TestSharedState:
+    def test_file_is_reused(self, tmp_path):
+        path = tmp_path / "state"
+        SharedState(path, slots=8).close()
+
+        state = SharedState(path, slots=1024)
+        assert state._slots == 8
+        state.close()
+
+    def test_foreign_file(self, tmp_path):
+        path = tmp_path / "state"
+        path.write_bytes(b"not a state file")
+
+        with pytest.raises(ValueError):
+            SharedState(path)
+
+    def test_full(self, tmp_path):
+        state = SharedState(tmp_path / "state", slots=2)
+        SharedRetryBudget(state, name="first")
+        SharedRetryBudget(state, name="second")
+
+        with pytest.raises(RuntimeError):
+            SharedRetryBudget(state, name="third")
+        state.close()
+
+
+class TestSharedRetryBudget:
+    def test_shared_between_instances(self, tmp_path):
+        state = SharedState(tmp_path / "state")
+        first = SharedRetryBudget(state, ratio=0.5, max_tokens=2)
+        second = SharedRetryBudget(state, ratio=0.5, max_tokens=2)
+        other = SharedRetryBudget(state, name="other", ratio=0.5, max_tokens=2)
+
+        assert first.try_withdraw()
+        assert second.try_withdraw()
+        assert not first.try_withdraw()
+        second.deposit()
+        second.deposit()
+
+        assert first.tokens == 1
+        assert (first.deposits, first.withdrawals, first.rejections) == (2, 2, 1)
+        assert other.tokens == 2
+        state.close()
+
+    def test_shared_between_processes(self, tmp_path):
+        path = tmp_path / "state"
+        SharedState(path).close()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=withdraw_all, args=(path, results)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        withdrawn = [results.get(timeout=10) for _ in processes]
+        for process in processes:
+            process.join()
+
+        assert sum(withdrawn) == 10
+
+
+class TestSharedCircuitBreaker:
+    def test_opened_by_another_process(self, tmp_path):
+        path = tmp_path / "state"
+        state = SharedState(path)
+        breaker = SharedCircuitBreaker(state, failure_threshold=1)
+        breaker.acquire(KEY)
+
+        process = multiprocessing.Process(target=open_circuit, args=(path,))
+        process.start()
+        process.join()
+
+        assert breaker.state("http://test/") == CircuitState.OPEN
+        assert breaker.is_open(KEY)
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire(KEY)
+        state.close()
+
+    def test_half_open_probe(self, tmp_path):
+        state = SharedState(tmp_path / "state")
+        breaker = SharedCircuitBreaker(state, failure_threshold=1, recovery_timeout=0.05)
+        other = SharedCircuitBreaker(state, failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(KEY)
+        time.sleep(0.06)
+
+        breaker.acquire(KEY)
+
+        assert other.state("http://test/") == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            other.acquire(KEY)
+        other.record_success(KEY)
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+        state.close()
+
+    def test_failure_rate_window(self, tmp_path):
+        state = SharedState(tmp_path / "state")
+        breaker = SharedCircuitBreaker(state, failure_threshold=None, failure_rate=0.5, window=4, min_calls=4)
+
+        for failure in (False, False, False, True, False, True):
+            breaker.record_failure(KEY) if failure else breaker.record_success(KEY)
+        assert breaker.state("http://test/") == CircuitState.OPEN
+
+        with pytest.raises(ValueError):
+            SharedCircuitBreaker(state, window=65)
+        state.close()
+
+    def test_pause(self, tmp_path):
+        state = SharedState(tmp_path / "state")
+        breaker = SharedCircuitBreaker(state)
+        SharedCircuitBreaker(state).pause("http://test/", 0.05)
+
+        assert breaker.is_open(KEY)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.acquire(KEY)
+        assert 0 < exc_info.value.retry_after <= 0.05
+        assert breaker.state("http://test/") == CircuitState.CLOSED
+
+        time.sleep(0.06)
+        breaker.acquire(KEY)
+        assert not breaker.is_open(KEY)
+        state.close()
+
+
+@pytest.mark.asyncio
+class TestSharedStateClients:
+    async def test_circuit_is_shared_by_clients(self, tmp_path):
+        state = SharedState(tmp_path / "state")
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise ConnectError("refused", request=request)
+
+        clients = [
+            ExceptionClient(
+                exception=(ConnectError,),
+                client=AsyncClient(transport=MockTransport(handler)),
+                backoff_option=Constant(interval=0),
+                circuit_breaker=SharedCircuitBreaker(state, failure_threshold=2),
+                budget=SharedRetryBudget(state),
+            )
+            for _ in range(2)
+        ]
+        with pytest.raises(ConnectError):
+            await clients[0].get(url="http://test/")
+        with pytest.raises(CircuitOpenError):
+            await clients[1].get(url="http://test/")
+
+        assert len(calls) == 2
+        state.close()
@@ -0,0 +1,86 @@
+import pytest
+from httpx_backoff.backoff_options import Constant, Expo, Fibo
+from httpx_backoff.backoff_options.jitter import use_equal_jitter, use_full_jitter
+from httpx_backoff.simulation import FailureModel, compare, lognormal_outage, simulate
+
+np = pytest.importorskip("numpy")
+
+
+class TestSimulate:
+    def test_no_failures(self):
+        result = simulate(Expo(), FailureModel(latency=0.1), clients=1000, seed=0)
+
+        assert result.clients == 1000
+        assert result.success_rate == 1.0
+        assert result.amplification == 1.0
+        assert result.mean_completion == pytest.approx(0.1)
+        # all clients arrive at once
+        assert result.peak_rate == pytest.approx(1000 / 0.1)
+
+    def test_outage_without_jitter(self):
+        model = FailureModel(outage=3.5, latency=0.0)
+        result = simulate(Expo(), model, jitter=None, clients=100, attempts=5, seed=0)
+
+        # attempts at 0, 1, 3 fail, the attempt at 7 succeeds
+        assert result.success_rate == 1.0
+        assert result.amplification == 4.0
+        assert result.p50_completion == pytest.approx(7.0)
+
+    def test_attempts_are_exhausted(self):
+        result = simulate(Constant(interval=1), FailureModel(outage=100), jitter=None, clients=10, attempts=3)
+
+        assert result.success_rate == 0.0
+        assert result.amplification == 3.0
+        assert result.mean_completion == pytest.approx(2 + 3 * 0.05)
+
+    def test_timeout(self):
+        model = FailureModel(outage=100, latency=0.0)
+        result = simulate(Expo(), model, jitter=None, clients=10, attempts=10, timeout=5)
+
+        # attempts at 0, 1 and 3, the next one at 7 would start after the timeout
+        assert result.amplification == 3.0
+        assert result.p999_completion == pytest.approx(3.0)
+
+    def test_failure_probability(self):
+        model = FailureModel(failure_probability=0.5, latency=0.0)
+        result = simulate(Constant(interval=0), model, clients=100_000, attempts=2, seed=1)
+
+        assert result.success_rate == pytest.approx(0.75, abs=0.01)
+        assert result.amplification == pytest.approx(1.5, abs=0.01)
+
+    def test_jitter_spreads_load(self):
+        model = FailureModel(outage=30, latency=0.01)
+        plain = simulate(Expo(max_value=8), model, jitter=None, clients=10_000, attempts=8, seed=0)
+        jittered = simulate(Expo(max_value=8), model, jitter=use_full_jitter, clients=10_000, attempts=8, seed=0)
+        custom = simulate(Expo(max_value=8), model, jitter=lambda value: value, clients=100, attempts=8, seed=0)
+
+        # without jitter the clients retry and complete in lockstep
+        assert plain.peak_rate == 10_000 / 0.1
+        assert plain.p50_completion == plain.p999_completion
+        assert jittered.p99_completion - jittered.p50_completion > 1
+        unjittered = simulate(Expo(max_value=8), model, jitter=None, clients=100, attempts=8)
+        assert custom.amplification == unjittered.amplification
+
+    def test_outage_distribution(self):
+        model = FailureModel(outage=lognormal_outage(5, sigma=0.5), arrival=1)
+        result = simulate(Fibo(max_value=10), model, runs=50, clients=200, attempts=10, seed=0)
+
+        assert result.clients == 10_000
+        assert 0 < result.success_rate <= 1
+        assert result.p50_completion <= result.p99_completion <= result.p999_completion
+
+    def test_compare(self):
+        results = compare(
+            {"expo": (Expo(), use_full_jitter), "fibo": (Fibo, use_equal_jitter), "constant": (Constant(2), None)},
+            FailureModel(outage=10),
+            clients=1000,
+            attempts=6,
+            seed=0,
+        )
+
+        assert set(results) == {"expo", "fibo", "constant"}
+        assert results["constant"].amplification == 6.0
+
+    def test_validation(self):
+        with pytest.raises(ValueError):
+            simulate(Expo(), FailureModel(), clients=0)
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.single_flight import SingleFlight
+
+
+def slow_transport(calls, *, delay=0.05, unavailable=0, fail=False):
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(delay)
+        if fail:
+            raise ConnectError("refused", request=request)
+        if len(calls) <= unavailable:
+            return Response(codes.SERVICE_UNAVAILABLE)
+        user = request.headers.get("authorization") or request.headers.get("accept")
+        return Response(codes.OK, text=f"{request.url.path} {user}")
+
+    return MockTransport(handler)
+
+
+def predicate_client(transport, single_flight):
+    return PredicateClient(
+        predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+        client=AsyncClient(transport=transport),
+        backoff_option=Constant(interval=0),
+        single_flight=single_flight,
+    )
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    async def test_identical_requests_share_retried_request(self):
+        calls, single_flight = [], SingleFlight()
+        async with predicate_client(slow_transport(calls, unavailable=2), single_flight) as client:
+            responses = await asyncio.gather(*(client.get(url="http://test/hot") for _ in range(100)))
+
+        assert len(calls) == 3
+        assert all(response is responses[0] for response in responses)
+        assert responses[0].status_code == codes.OK
+        assert (single_flight.requests, single_flight.coalesced, single_flight.in_flight) == (100, 99, 0)
+
+    async def test_different_requests_are_not_coalesced(self):
+        calls = []
+        async with predicate_client(slow_transport(calls), SingleFlight()) as client:
+            responses = await asyncio.gather(
+                client.get(url="http://test/a"),
+                client.get(url="http://test/a", params={"page": 2}),
+                client.get(url="http://test/a", headers={"accept": "text/html"}),
+                client.post(url="http://test/a"),
+                client.post(url="http://test/a"),
+            )
+
+        assert len(calls) == 5
+        assert responses[2].text == "/a text/html"
+
+    async def test_different_auth_is_not_coalesced(self):
+        calls = []
+        async with predicate_client(slow_transport(calls), SingleFlight()) as client:
+            alice, bob = await asyncio.gather(
+                client.get(url="http://test/a", auth=("alice", "a")),
+                client.get(url="http://test/a", auth=("bob", "b")),
+            )
+
+        assert len(calls) == 2
+        assert alice.text != bob.text
+
+    async def test_request_kwargs_are_not_coalesced(self):
+        calls = []
+        async with predicate_client(slow_transport(calls), SingleFlight()) as client:
+            await asyncio.gather(
+                client.get(url="http://test/a", cookies={"session": "alice"}),
+                client.get(url="http://test/a", timeout=1),
+                client.get(url="http://test/a", follow_redirects=True),
+                client.get(url="http://test/a", extensions={"trace": None}),
+                client.get(url="http://test/a"),
+            )
+
+        assert len(calls) == 5
+
+    async def test_exception_is_shared(self):
+        calls = []
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=slow_transport(calls, fail=True)),
+            backoff_option=Constant(interval=0),
+            attempts=2,
+            single_flight=SingleFlight(),
+        ) as client:
+            requests = (client.get(url="http://test/a") for _ in range(10))
+            results = await asyncio.gather(*requests, return_exceptions=True)
+
+        assert len(calls) == 2
+        assert all(isinstance(result, ConnectError) for result in results)
+
+    async def test_cancelled_waiter_leaves_flight(self):
+        calls = []
+        async with predicate_client(slow_transport(calls, delay=0.1), SingleFlight()) as client:
+            first = asyncio.ensure_future(client.get(url="http://test/a"))
+            second = asyncio.ensure_future(client.get(url="http://test/a"))
+            await asyncio.sleep(0.02)
+            first.cancel()
+
+            response = await second
+
+        assert first.cancelled()
+        assert response.status_code == codes.OK
+        assert len(calls) == 1
+
+    async def test_request_is_cancelled_without_waiters(self):
+        calls, single_flight = [], SingleFlight()
+        async with predicate_client(slow_transport(calls, delay=0.1), single_flight) as client:
+            waiters = [asyncio.ensure_future(client.get(url="http://test/a")) for _ in range(3)]
+            await asyncio.sleep(0.02)
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+            assert single_flight.in_flight == 0
+            # a new request starts a new flight
+            response = await client.get(url="http://test/a")
+
+        assert response.status_code == codes.OK
+        assert len(calls) == 2
@@ -0,0 +1,237 @@
+import asyncio
+import io
+
+import pytest
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    BaseTransport,
+    Client,
+    ConnectError,
+    MockTransport,
+    Request,
+    Response,
+    StreamConsumed,
+    TransportError,
+    codes,
+)
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.clients.sync_on_exception import SyncExceptionClient
+from httpx_backoff.hedging import HedgePolicy
+from httpx_backoff.spooling import SpooledByteStream
+from httpx_backoff.transport import RetryTransport
+
+BODY = b"".join(bytes([index]) * 1000 for index in range(100))
+
+
+async def upload():
+    for start in range(0, len(BODY), 7000):
+        yield BODY[start : start + 7000]
+
+
+async def read_file(path):
+    with open(path, "rb") as file:
+        while chunk := file.read(7000):
+            yield chunk
+
+
+class Upstream(AsyncBaseTransport):
+    """
+    Reads the request stream like a real transport does, fails the first attempts
+    after the given number of bytes.
+    """
+
+    def __init__(self, failures=2, fail_after=None, status=None):
+        self.bodies = []
+        self.streams = []
+        self._failures = failures
+        self._fail_after = fail_after
+        self._status = status
+
+    async def handle_async_request(self, request):
+        self.streams.append(request.stream)
+        body = b""
+        failing = len(self.bodies) < self._failures
+        async for chunk in request.stream:
+            body += chunk
+            if failing and self._fail_after is not None and len(body) >= self._fail_after:
+                self.bodies.append(body)
+                raise ConnectError("connection reset", request=request)
+
+        self.bodies.append(body)
+        if failing:
+            if self._status is not None:
+                return Response(self._status)
+            raise ConnectError("connection reset", request=request)
+        return Response(codes.OK)
+
+
+class SyncUpstream(BaseTransport):
+    def __init__(self, failures=2):
+        self.bodies = []
+        self._failures = failures
+
+    def handle_request(self, request):
+        self.bodies.append(b"".join(request.stream))
+        if len(self.bodies) <= self._failures:
+            raise ConnectError("connection reset", request=request)
+        return Response(codes.OK)
+
+
+def exception_client(upstream, **kwargs):
+    return ExceptionClient(
+        exception=(TransportError,),
+        client=AsyncClient(transport=upstream),
+        backoff_option=Constant(interval=0),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+class TestSpooling:
+    async def test_generator_is_replayed(self):
+        upstream = Upstream()
+
+        async with exception_client(upstream) as client:
+            response = await client.request("http://test/upload", method="POST", content=upload())
+
+        assert response.status_code == codes.OK
+        assert upstream.bodies == [BODY] * 3
+
+    async def test_file_is_replayed(self, tmp_path):
+        path = tmp_path / "upload.bin"
+        path.write_bytes(BODY)
+        upstream = Upstream()
+
+        async with exception_client(upstream) as client:
+            response = await client.request("http://test/upload", method="PUT", content=read_file(path))
+
+        assert response.status_code == codes.OK
+        assert upstream.bodies == [BODY] * 3
+
+    async def test_interrupted_upload_is_replayed(self):
+        upstream = Upstream(fail_after=20_000)
+
+        async with exception_client(upstream) as client:
+            await client.request("http://test/upload", method="POST", content=upload())
+
+        assert [len(body) for body in upstream.bodies] == [21_000, 21_000, len(BODY)]
+        assert upstream.bodies[-1] == BODY
+
+    async def test_predicate_client(self):
+        upstream = Upstream(status=codes.SERVICE_UNAVAILABLE)
+
+        async with PredicateClient(
+            predicate=lambda response: response.status_code == codes.SERVICE_UNAVAILABLE,
+            client=AsyncClient(transport=upstream),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response = await client.request("http://test/upload", method="POST", content=upload())
+
+        assert response.status_code == codes.OK
+        assert upstream.bodies == [BODY] * 3
+
+    async def test_retry_transport(self):
+        upstream = Upstream()
+        transport = RetryTransport(upstream, exception=(TransportError,), backoff_option=Constant(interval=0))
+
+        async with AsyncClient(transport=transport) as client:
+            response = await client.post("http://test/upload", content=upload())
+
+        assert response.status_code == codes.OK
+        assert upstream.bodies == [BODY] * 3
+
+    async def test_large_body_is_spooled_to_disk(self):
+        upstream = Upstream()
+
+        async with exception_client(upstream, spool_threshold=10_000) as client:
+            await client.request("http://test/upload", method="POST", content=upload())
+
+        stream = upstream.streams[0]
+        assert isinstance(stream, SpooledByteStream)
+        assert stream.size == len(BODY)
+        assert stream._spool._rolled
+        assert upstream.bodies == [BODY] * 3
+
+    async def test_small_body_stays_in_memory(self):
+        upstream = Upstream(failures=1)
+
+        async with exception_client(upstream) as client:
+            await client.request("http://test/upload", method="POST", content=upload())
+
+        assert not upstream.streams[0]._spool._rolled
+
+    async def test_bytes_are_not_spooled(self):
+        upstream = Upstream(failures=1)
+
+        async with exception_client(upstream) as client:
+            await client.request("http://test/upload", method="POST", content=BODY)
+
+        assert not isinstance(upstream.streams[0], SpooledByteStream)
+        assert upstream.bodies == [BODY] * 2
+
+    async def test_spool_is_closed(self):
+        upstream = Upstream(failures=1)
+
+        async with exception_client(upstream) as client:
+            await client.request("http://test/upload", method="POST", content=upload())
+
+        assert upstream.streams[0]._spool.closed
+
+    async def test_spool_is_closed_on_giveup(self):
+        upstream = Upstream(failures=5)
+        transport = RetryTransport(
+            upstream, exception=(TransportError,), backoff_option=Constant(interval=0), attempts=2
+        )
+
+        async with AsyncClient(transport=transport) as client:
+            with pytest.raises(ConnectError):
+                await client.post("http://test/upload", content=upload())
+
+        assert upstream.streams[0]._spool.closed
+
+    async def test_streamed_body_is_not_hedged(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(b"".join([chunk async for chunk in request.stream]))
+            await asyncio.sleep(0.1)
+            return Response(codes.OK)
+
+        hedge = HedgePolicy(delay=0.01, max_ratio=1)
+        async with exception_client(MockTransport(handler), hedge=hedge) as client:
+            response = await client.request("http://test/upload", method="PUT", content=upload())
+
+        assert response.status_code == codes.OK
+        assert calls == [BODY]
+        assert hedge.hedges == 0
+
+    async def test_disabled(self):
+        upstream = Upstream(failures=1)
+
+        async with exception_client(upstream, spool_threshold=None) as client:
+            with pytest.raises(StreamConsumed):
+                await client.request("http://test/upload", method="POST", content=upload())
+
+
+class TestSyncSpooling:
+    def test_file_is_replayed(self):
+        upstream = SyncUpstream()
+
+        with SyncExceptionClient(
+            exception=(TransportError,),
+            client=Client(transport=upstream),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response = client.request("http://test/upload", method="PUT", content=io.BytesIO(BODY))
+
+        assert response.status_code == codes.OK
+        assert upstream.bodies == [BODY] * 3
+
+    def test_stream_is_replayed_any_number_of_times(self):
+        stream = SpooledByteStream(Request("POST", "http://test/", content=iter([b"a", b"b", b"c"])).stream)
+
+        assert [b"".join(stream) for _ in range(3)] == [b"abc"] * 3
+        stream.close()
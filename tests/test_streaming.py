@@ -0,0 +1,141 @@
+import pytest
+from httpx import AsyncByteStream, AsyncClient, ConnectError, MockTransport, ReadError, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+DATA = bytes(range(256)) * 100
+
+
+class BrokenStream(AsyncByteStream):
+    def __init__(self, data: bytes, break_at: int = None):
+        self._data = data
+        self._break_at = break_at
+
+    async def __aiter__(self):
+        for offset in range(0, len(self._data), 1000):
+            if self._break_at is not None and offset >= self._break_at:
+                raise ReadError("connection reset")
+            yield self._data[offset : offset + 1000]
+
+
+def ranged_transport(calls, *, breaks=(10_000,), accept_ranges=True, etag='"v1"', unavailable=0):
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= unavailable:
+            return Response(codes.SERVICE_UNAVAILABLE)
+
+        number = len(calls) - unavailable - 1
+        break_at = breaks[number] if number < len(breaks) else None
+        headers = {"etag": etag}
+        if accept_ranges:
+            headers["accept-ranges"] = "bytes"
+
+        range_header = request.headers.get("range")
+        if range_header is None or request.headers.get("if-range") != '"v1"':
+            return Response(codes.OK, headers=headers, stream=BrokenStream(DATA, break_at))
+
+        start = int(range_header.removeprefix("bytes=").rstrip("-"))
+        headers["content-range"] = f"bytes {start}-{len(DATA) - 1}/{len(DATA)}"
+        return Response(codes.PARTIAL_CONTENT, headers=headers, stream=BrokenStream(DATA[start:], break_at))
+
+    return MockTransport(handler)
+
+
+@pytest.mark.asyncio
+class TestStreaming:
+    async def test_body_is_resumed(self):
+        calls = []
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport(calls, breaks=(10_000, 5_000))),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                body = await response.aread()
+
+                assert response.status_code == codes.PARTIAL_CONTENT
+                assert response.resumes == 2
+
+        assert body == DATA
+        assert [request.headers.get("range") for request in calls] == [None, "bytes=10000-", "bytes=15000-"]
+        assert all(request.headers.get("if-range") == '"v1"' for request in calls[1:])
+
+    async def test_connection_is_retried(self):
+        calls = []
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport(calls, breaks=(), unavailable=2)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+
+        assert body == DATA
+        assert len(calls) == 3
+
+    async def test_connect_error_is_retried(self):
+        calls = []
+        transport = ranged_transport([], breaks=())
+
+        async def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise ConnectError("refused", request=request)
+            return await transport.handle_async_request(request)
+
+        async with ExceptionClient(
+            exception=(ConnectError,),
+            client=AsyncClient(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                assert await response.aread() == DATA
+
+    async def test_not_resumable_without_accept_ranges(self):
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport([], accept_ranges=False)),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                with pytest.raises(ReadError):
+                    await response.aread()
+
+    async def test_changed_resource_is_not_resumed(self):
+        calls = []
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport(calls, etag='"v2"')),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                with pytest.raises(ReadError):
+                    await response.aread()
+
+        assert len(calls) == 2
+
+    async def test_weak_etag_is_not_used(self):
+        calls = []
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport(calls, etag='W/"v1"')),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object") as response:
+                with pytest.raises(ReadError):
+                    await response.aread()
+
+        assert len(calls) == 1
+
+    async def test_max_resumes(self):
+        async with PredicateClient(
+            predicate=lambda res: res.status_code >= codes.INTERNAL_SERVER_ERROR,
+            client=AsyncClient(transport=ranged_transport([], breaks=(1_000, 1_000, 1_000))),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            async with client.stream("http://test/object", max_resumes=1) as response:
+                with pytest.raises(ReadError):
+                    await response.aread()
+
+                assert response.resumes == 1
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+from httpx import Client, ConnectError, MockTransport, ReadTimeout, Response, codes
+from httpx_backoff.backoff_options import Constant, Expo
+from httpx_backoff.budget import RetryBudget
+from httpx_backoff.circuit_breaker import CircuitBreaker, CircuitState, _circuit_key
+from httpx_backoff.clients.sync_on_exception import SyncExceptionClient
+
+
+class TestSyncExceptionClient:
+    def test_success_request_without_retries(self, server):
+        with SyncExceptionClient(
+            exception=(ReadTimeout,),
+            client=Client(timeout=20),
+            backoff_option=Expo(),
+        ) as client:
+            response: Response = client.get(url=server.url.copy_with(path="/ping"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter == 1
+
+        assert client.is_closed()
+
+    def test_success_request_with_retries(self, server):
+        with SyncExceptionClient(
+            exception=(ReadTimeout,),
+            client=Client(timeout=0.2),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response: Response = client.get(url=server.url.copy_with(path="/sometimes_slow_response"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter > 1
+
+        assert client.is_closed()
+
+    @pytest.mark.parametrize("attempts", [2, 3])
+    def test_failed_request_by_attempts(self, attempts):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise ConnectError("refused", request=request)
+
+        budget = RetryBudget()
+        with SyncExceptionClient(
+            exception=(ConnectError,),
+            client=Client(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=attempts,
+            budget=budget,
+        ) as client:
+            with pytest.raises(ConnectError):
+                client.post(url="http://test/", json={"key": "value"})
+
+        assert len(calls) == attempts
+        assert budget.withdrawals == attempts - 1
+
+    def test_map(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if request.url.path == "/fail":
+                raise ConnectError("refused", request=request)
+            return Response(codes.OK, text=request.url.path)
+
+        specs = [{"url": f"http://test/{number}"} for number in range(50)]
+        specs.insert(10, {"url": "http://test/fail"})
+
+        with SyncExceptionClient(
+            exception=(ConnectError,),
+            client=Client(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            attempts=2,
+        ) as client:
+            results = list(client.map(iter(specs), max_workers=4, return_exceptions=True))
+
+            assert isinstance(results[10], ConnectError)
+            del results[10]
+            assert [result.text for result in results] == [f"/{number}" for number in range(50)]
+            assert len(calls) == 52
+
+            with pytest.raises(ConnectError):
+                list(client.map(specs, max_workers=4))
+
+    def test_circuit_probe_is_released_on_unexpected_error(self):
+        def handler(request):
+            raise ValueError("broken handler")
+
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        breaker.record_failure(_circuit_key("http://test/"))
+        time.sleep(0.06)
+
+        with SyncExceptionClient(
+            exception=(ConnectError,),
+            client=Client(transport=MockTransport(handler)),
+            backoff_option=Constant(interval=0),
+            circuit_breaker=breaker,
+        ) as client:
+            with pytest.raises(ValueError):
+                client.get(url="http://test/")
+
+        assert breaker.state("http://test/") == CircuitState.HALF_OPEN
+        breaker.acquire(_circuit_key("http://test/"))
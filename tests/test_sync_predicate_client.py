@@ -0,0 +1,61 @@
+import pytest
+from httpx import Client, Response, codes
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.sync_on_predicate import SyncPredicateClient
+from httpx_backoff.metrics import RetryMetrics
+
+
+class TestSyncPredicateClient:
+    def test_success_request_without_retries(self, server):
+        with SyncPredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=Client(),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            response: Response = client.get(url=server.url.copy_with(path="/ping"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter == 1
+
+        assert client.is_closed()
+
+    def test_success_request_with_retry(self, server):
+        metrics = RetryMetrics()
+        with SyncPredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=Client(),
+            backoff_option=Constant(interval=0),
+            **metrics.hooks(),
+        ) as client:
+            response = client.get(url=server.url.copy_with(path="/sometimes_error"))
+
+            assert response.status_code == codes.OK
+            assert server.config.app.counter == 3
+
+        stats = metrics.snapshot()[(server.url.host, "GET")]
+        assert stats["retries"] == {"400": 2}
+
+    @pytest.mark.parametrize("attempts", [2, 4])
+    def test_failed_request_by_attempts(self, server, attempts):
+        with SyncPredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=Client(),
+            backoff_option=Constant(interval=0),
+            attempts=attempts,
+        ) as client:
+            response = client.get(url=server.url.copy_with(path="/bad_request"))
+
+            assert response.status_code == codes.BAD_REQUEST
+            assert server.config.app.counter == attempts
+
+    def test_map_shares_connection_pool(self, server):
+        with SyncPredicateClient(
+            predicate=lambda res: res.status_code != codes.OK,
+            client=Client(),
+            backoff_option=Constant(interval=0),
+        ) as client:
+            specs = ({"url": server.url.copy_with(path="/ping")} for _ in range(20))
+            responses = list(client.map(specs, max_workers=5))
+
+        assert all(response.status_code == codes.OK for response in responses)
+        assert server.config.app.counter == 20